@@ -4,12 +4,12 @@
 {
     "name": "Manufacturing Analytic Items",
     "summary": "Consuming raw materials and operations generated Analytic Items",
-    "version": "14.0.1.0.1",
+    "version": "14.0.1.1.0",
     "category": "Manufacturing",
     "author": "Open Source Integrators, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/manufacture",
     "license": "AGPL-3",
-    "depends": ["mrp_analytic"],
+    "depends": ["mrp_analytic", "mrp_analytic_posting"],
     "data": [
         "views/account_analytic_line_view.xml",
     ],
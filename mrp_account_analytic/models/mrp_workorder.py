@@ -27,20 +27,25 @@ class MrpWorkcenterProductivity(models.Model):
 
     def generate_mrp_work_analytic_line(self):
         AnalyticLine = self.env["account.analytic.line"].sudo()
-        for timelog in self:
-            line_vals = timelog._prepare_mrp_workorder_analytic_item()
-            analytic_line = AnalyticLine.create(line_vals)
-            analytic_line.on_change_unit_amount()
-
-    @api.model
-    def create(self, vals):
-        timelog = super().create(vals)
-        if vals.get("date_end"):
-            timelog.generate_mrp_work_analytic_line()
-        return timelog
+        vals_list = [timelog._prepare_mrp_workorder_analytic_item() for timelog in self]
+        AnalyticLine.create(AnalyticLine._mrp_analytic_prepare_amounts(vals_list))
+
+    def _post_mrp_work_analytic_line(self):
+        self.env["account.analytic.line"]._mrp_analytic_post(
+            self, "generate_mrp_work_analytic_line"
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        timelogs = super().create(vals_list)
+        ended = timelogs.browse(
+            [log.id for log, vals in zip(timelogs, vals_list) if vals.get("date_end")]
+        )
+        ended._post_mrp_work_analytic_line()
+        return timelogs
 
     def write(self, vals):
         res = super().write(vals)
         if vals.get("date_end"):
-            self.generate_mrp_work_analytic_line()
+            self._post_mrp_work_analytic_line()
         return res
@@ -114,3 +114,24 @@ class TestMRP(common.TransactionCase):
         self.assertEqual(
             analytic_amount, -14.00, "Expected Analytic Items total amount"
         )
+
+    def test_120_deferred_posting(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_analytic_posting.deferred_posting", "True"
+        )
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 1})
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 4})
+        self.mo_lemonade.workorder_ids.write({"duration": 15})
+        domain = [("manufacturing_order_id", "=", self.mo_lemonade.id)]
+        analytic_items = self.env["account.analytic.line"].search(domain)
+        self.assertFalse(analytic_items, "Analytic Items are posted on commit")
+
+        self.env.cr.precommit.run()
+        analytic_items = self.env["account.analytic.line"].search(domain)
+        self.assertEqual(len(analytic_items), 2, "One Analytic Item per record")
+        analytic_qty = sum(analytic_items.mapped("unit_amount"))
+        self.assertEqual(analytic_qty, 4.25, "Expected Analytic Items total quantity")
+        analytic_amount = sum(analytic_items.mapped("amount"))
+        self.assertEqual(
+            analytic_amount, -14.00, "Expected Analytic Items total amount"
+        )
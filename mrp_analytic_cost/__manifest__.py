@@ -4,7 +4,7 @@
 {
     "name": "Manufacturing Materials Analytic Costs",
     "summary": "Track manufacturing costs in real time, using Analytic Items",
-    "version": "14.0.1.1.0",
+    "version": "14.0.1.2.0",
     "category": "Manufacturing",
     "author": "Open Source Integrators, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/manufacture",
@@ -13,6 +13,7 @@
         "mrp_analytic",
         "analytic_activity_based_cost",
         "account_analytic_wip",
+        "mrp_analytic_posting",
     ],
     "data": [
         "views/account_analytic_line_view.xml",
@@ -1,6 +1,8 @@
 # Copyright (C) 2020 Open Source Integrators
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import api, fields, models
 
 
@@ -48,31 +50,42 @@ class MRPWorkorder(models.Model):
         workorders = self.filtered("workcenter_id.analytic_product_id").filtered(
             "production_id.analytic_account_id"
         )
-        existing_items = workorders and AnalyticLine.search(
-            [("workorder_id", "in", self.ids)]
-        )
+        existing_items = AnalyticLine.search([("workorder_id", "in", workorders.ids)])
+        items_by_workorder = defaultdict(list)
+        for item in existing_items:
+            items_by_workorder[item.workorder_id.id].append(item.id)
+        to_write = []
+        vals_list = []
         for workorder in workorders:
-            line_vals = self._prepare_mrp_workorder_analytic_item()
-            analytic_lines = existing_items.filtered(
-                lambda x: x.workorder_id == workorder
-            )
-            if analytic_lines:
-                for analytic_line in analytic_lines:
-                    analytic_line.write(line_vals)
-                    analytic_line.on_change_unit_amount()
+            line_vals = workorder._prepare_mrp_workorder_analytic_item()
+            item_ids = items_by_workorder.get(workorder.id)
+            if item_ids:
+                to_write.append((item_ids, line_vals))
             else:
-                analytic_line = AnalyticLine.create(line_vals)
-                analytic_line.on_change_unit_amount()
+                vals_list.append(line_vals)
+        AnalyticLine._mrp_analytic_prepare_amounts(
+            vals_list + [line_vals for item_ids, line_vals in to_write]
+        )
+        for item_ids, line_vals in to_write:
+            AnalyticLine.browse(item_ids).write(line_vals)
+        AnalyticLine.create(vals_list)
 
-    @api.model
-    def create(self, vals):
-        res = super().create(vals)
-        if vals.get("duration"):
-            res.generate_mrp_work_analytic_line()
-        return res
+    def _post_mrp_work_analytic_line(self):
+        self.env["account.analytic.line"]._mrp_analytic_post(
+            self, "generate_mrp_work_analytic_line"
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        workorders = super().create(vals_list)
+        worked = workorders.browse(
+            [wo.id for wo, vals in zip(workorders, vals_list) if vals.get("duration")]
+        )
+        worked._post_mrp_work_analytic_line()
+        return workorders
 
     def write(self, vals):
         res = super().write(vals)
         if vals.get("duration"):
-            self.generate_mrp_work_analytic_line()
+            self._post_mrp_work_analytic_line()
         return res
@@ -1,6 +1,8 @@
 # Copyright (C) 2021 Open Source Integrators
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import api, models
 
 
@@ -28,49 +30,67 @@ class StockMove(models.Model):
         # FIXME: consumed products coming from child MOs
         # should not generate Analytic Items, to avoid duplicating costs!
         AnalyticLine = self.env["account.analytic.line"].sudo()
-        existing_items = AnalyticLine.search([("stock_move_id", "in", self.ids)])
-        for move in self.filtered("raw_material_production_id.analytic_account_id"):
+        moves = self.filtered("raw_material_production_id.analytic_account_id")
+        existing_items = AnalyticLine.search([("stock_move_id", "in", moves.ids)])
+        items_by_move = defaultdict(list)
+        for item in existing_items:
+            items_by_move[item.stock_move_id.id].append(item.id)
+        to_write = []
+        vals_list = []
+        for move in moves:
             line_vals = move._prepare_mrp_raw_material_analytic_line()
-            if move in existing_items.mapped("stock_move_id"):
-                analytic_line = existing_items.filtered(
-                    lambda x: x.stock_move_id == move
-                )
-                analytic_line.write(line_vals)
-                analytic_line.on_change_unit_amount()
+            item_ids = items_by_move.get(move.id)
+            if item_ids:
+                to_write.append((item_ids, line_vals))
             elif line_vals.get("unit_amount"):
-                analytic_line = AnalyticLine.create(line_vals)
-                analytic_line.on_change_unit_amount()
+                vals_list.append(line_vals)
+        AnalyticLine._mrp_analytic_prepare_amounts(
+            vals_list + [line_vals for item_ids, line_vals in to_write]
+        )
+        for item_ids, line_vals in to_write:
+            AnalyticLine.browse(item_ids).write(line_vals)
+        AnalyticLine.create(vals_list)
+
+    def _post_mrp_raw_analytic_line(self):
+        self.env["account.analytic.line"]._mrp_analytic_post(
+            self, "generate_mrp_raw_analytic_line"
+        )
 
     def write(self, vals):
         """When material is consumed, generate Analytic Items"""
         res = super().write(vals)
         if vals.get("qty_done"):
-            self.generate_mrp_raw_analytic_line()
+            self._post_mrp_raw_analytic_line()
         return res
 
-    @api.model
-    def create(self, vals):
-        qty_done = vals.get("qty_done")
-        res = super().create(vals)
-        if qty_done:
-            res.generate_mrp_raw_analytic_line()
-        return res
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super().create(vals_list)
+        consumed_moves = moves.browse(
+            [move.id for move, vals in zip(moves, vals_list) if vals.get("qty_done")]
+        )
+        consumed_moves._post_mrp_raw_analytic_line()
+        return moves
 
 
 class StockMoveLine(models.Model):
     _inherit = "stock.move.line"
 
     def write(self, vals):
-        qty_done = vals.get("qty_done")
         res = super().write(vals)
-        if qty_done:
-            self.mapped("move_id").generate_mrp_raw_analytic_line()
+        if vals.get("qty_done"):
+            self.move_id._post_mrp_raw_analytic_line()
         return res
 
-    @api.model
-    def create(self, vals):
-        qty_done = vals.get("qty_done")
-        res = super().create(vals)
-        if qty_done:
-            res.mapped("move_id").generate_mrp_raw_analytic_line()
-        return res
+    @api.model_create_multi
+    def create(self, vals_list):
+        move_lines = super().create(vals_list)
+        consumed_lines = move_lines.browse(
+            [
+                line.id
+                for line, vals in zip(move_lines, vals_list)
+                if vals.get("qty_done")
+            ]
+        )
+        consumed_lines.move_id._post_mrp_raw_analytic_line()
+        return move_lines
@@ -0,0 +1,124 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo.tests import Form, common
+
+
+class TestMrpAnalyticCost(common.TransactionCase):
+    """
+    Create a Manufacturing Order, with Raw Materials and two Operations.
+    Consuming raw materials and working on Operations generates or updates
+    Analytic Items, valued at the standard cost of the product or cost type.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.analytic_1 = self.env["account.analytic.account"].create({"name": "Job 1"})
+        # Cost Types and Work Centers
+        self.cost_assembly = self._create_product(
+            "Assembly Hour", 40, is_cost_type=True
+        )
+        self.cost_packing = self._create_product("Packing Hour", 20, is_cost_type=True)
+        self.workcenter_assembly = self.env["mrp.workcenter"].create(
+            {"name": "Assembly Line", "analytic_product_id": self.cost_assembly.id}
+        )
+        self.workcenter_packing = self.env["mrp.workcenter"].create(
+            {"name": "Packing Line", "analytic_product_id": self.cost_packing.id}
+        )
+        # Products and BoM
+        self.product_lemonade = self._create_product("Lemonade", 20, type="product")
+        self.product_lemon = self._create_product("Lemon", 1, type="product")
+        self.bom_lemonade = self.env["mrp.bom"].create(
+            {
+                "product_tmpl_id": self.product_lemonade.product_tmpl_id.id,
+                "operation_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "workcenter_id": self.workcenter_assembly.id,
+                            "name": "Squeeze Lemons",
+                            "time_cycle": 15,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "workcenter_id": self.workcenter_packing.id,
+                            "name": "Bottle Lemonade",
+                            "time_cycle": 30,
+                        },
+                    ),
+                ],
+                "bom_line_ids": [
+                    (0, 0, {"product_id": self.product_lemon.id, "product_qty": 4})
+                ],
+            }
+        )
+        # MO
+        mo_form = Form(self.env["mrp.production"])
+        mo_form.product_id = self.product_lemonade
+        mo_form.bom_id = self.bom_lemonade
+        mo_form.product_qty = 1
+        self.mo_lemonade = mo_form.save()
+        self.mo_lemonade.analytic_account_id = self.analytic_1
+        self.mo_lemonade.action_confirm()
+        self.analytic_items_domain = [
+            ("manufacturing_order_id", "=", self.mo_lemonade.id)
+        ]
+
+    def _create_product(self, name, cost, **vals):
+        return self.env["product.product"].create(
+            dict(vals, name=name, standard_price=cost)
+        )
+
+    def _get_analytic_items(self):
+        return self.env["account.analytic.line"].search(self.analytic_items_domain)
+
+    def test_100_consume_raw_materials(self):
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 1})
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 4})
+        analytic_items = self._get_analytic_items()
+        self.assertEqual(len(analytic_items), 1, "One Analytic Item per move")
+        self.assertEqual(analytic_items.product_id, self.product_lemon)
+        self.assertEqual(analytic_items.unit_amount, 4)
+        self.assertEqual(analytic_items.amount, -4.00)
+        self.assertEqual(analytic_items.product_uom_id, self.product_lemon.uom_po_id)
+
+    def test_110_work_several_operations(self):
+        # The values of each work order are prepared on the work order
+        workorders = self.mo_lemonade.workorder_ids
+        self.assertEqual(len(workorders), 2)
+        workorders.write({"duration": 30})
+        analytic_items = self._get_analytic_items()
+        self.assertEqual(len(analytic_items), 2, "One Analytic Item per work order")
+        for workorder in workorders:
+            item = analytic_items.filtered(lambda x: x.workorder_id == workorder)
+            self.assertEqual(
+                item.product_id, workorder.workcenter_id.analytic_product_id
+            )
+            self.assertEqual(item.unit_amount, 0.5)
+            self.assertEqual(
+                item.amount,
+                -0.5 * workorder.workcenter_id.analytic_product_id.standard_price,
+            )
+        # Expected (0.5 * 40.00) + (0.5 * 20.00) => 30.00
+        self.assertEqual(sum(analytic_items.mapped("amount")), -30.00)
+
+    def test_120_deferred_posting(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_analytic_posting.deferred_posting", "True"
+        )
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 1})
+        self.mo_lemonade.move_raw_ids.write({"quantity_done": 4})
+        self.mo_lemonade.workorder_ids.write({"duration": 15})
+        self.assertFalse(
+            self._get_analytic_items(), "Analytic Items are posted on commit"
+        )
+
+        self.env.cr.precommit.run()
+        analytic_items = self._get_analytic_items()
+        self.assertEqual(len(analytic_items), 3, "One Analytic Item per record")
+        # Expected (4 * 1.00) + (0.25 * 40.00) + (0.25 * 20.00) => 19.00
+        self.assertEqual(sum(analytic_items.mapped("unit_amount")), 4.5)
+        self.assertEqual(sum(analytic_items.mapped("amount")), -19.00)
@@ -0,0 +1,15 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+{
+    "name": "Manufacturing Analytic Items Posting",
+    "summary": "Batched and deferred posting of manufacturing Analytic Items",
+    "version": "14.0.1.0.0",
+    "category": "Manufacturing",
+    "author": "Odoo Community Association (OCA)",
+    "website": "https://github.com/OCA/manufacture",
+    "license": "AGPL-3",
+    "depends": ["account"],
+    "data": ["data/system_parameter.xml"],
+    "installable": True,
+    "development_status": "Beta",
+}
@@ -0,0 +1,77 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+from odoo.tools import str2bool
+
+
+class AccountAnalyticLine(models.Model):
+    _inherit = "account.analytic.line"
+
+    @api.model
+    def _mrp_analytic_deferred(self):
+        return str2bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_analytic_posting.deferred_posting", "False")
+        )
+
+    @api.model
+    def _mrp_analytic_post(self, records, method):
+        """Call ``method`` on ``records`` to generate their Analytic Items.
+        With deferred posting, the records are queued instead, and the method
+        is called once for all of them when the transaction is committed."""
+        if not records:
+            return
+        if not self._mrp_analytic_deferred():
+            return getattr(records, method)()
+        key = "mrp_analytic_posting.%s.%s" % (records._name, method)
+        queue = self.env.cr.precommit.data.get(key)
+        if queue is None:
+            queue = self.env.cr.precommit.data[key] = set()
+            model = records.browse()
+
+            def post():
+                ids = self.env.cr.precommit.data.pop(key, ())
+                getattr(model.browse(sorted(ids)).exists(), method)()
+                self.flush()
+
+            self.env.cr.precommit.add(post)
+        queue.update(records.ids)
+
+    @api.model
+    def _mrp_analytic_prepare_amounts(self, vals_list):
+        """Complete the values of Analytic Items with a product, like
+        ``on_change_unit_amount`` does: the amount, the general account and the
+        unit of measure. The cost of each product is read once per company.
+        :param vals_list: List of dicts, updated in place
+        :return: The updated list
+        """
+        costs = {}
+        for vals in vals_list:
+            product = self.env["product.product"].browse(vals.get("product_id"))
+            if not product:
+                continue
+            company = (
+                self.env["res.company"].browse(vals.get("company_id"))
+                or self.env.company
+            )
+            key = (product.id, company.id)
+            if key not in costs:
+                unit = product.uom_po_id
+                cost = product.with_company(company).price_compute(
+                    "standard_price", uom=unit
+                )[product.id]
+                accounts = product.product_tmpl_id.with_company(
+                    company
+                )._get_product_accounts()
+                costs[key] = (cost, unit, accounts["expense"])
+            cost, unit, account = costs[key]
+            amount = cost * vals.get("unit_amount", 0.0)
+            vals.update(
+                {
+                    "amount": -company.currency_id.round(amount),
+                    "general_account_id": account.id,
+                    "product_uom_id": unit.id,
+                }
+            )
+        return vals_list
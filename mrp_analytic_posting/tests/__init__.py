@@ -0,0 +1 @@
+from . import test_mrp_analytic_posting
@@ -0,0 +1,38 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo.tests import common
+
+
+class TestMrpAnalyticPosting(common.TransactionCase):
+    def setUp(self):
+        super().setUp()
+        self.analytic_line_model = self.env["account.analytic.line"]
+        self.product = self.env["product.product"].create(
+            {"name": "Lemon", "standard_price": 1.5}
+        )
+
+    def test_prepare_amounts(self):
+        vals_list = [
+            {"product_id": self.product.id, "unit_amount": 4},
+            {"product_id": self.product.id, "unit_amount": 2},
+            {"unit_amount": 1, "amount": -10},
+        ]
+        self.analytic_line_model._mrp_analytic_prepare_amounts(vals_list)
+        self.assertEqual([vals["amount"] for vals in vals_list], [-6.0, -3.0, -10])
+        self.assertEqual(vals_list[0]["product_uom_id"], self.product.uom_po_id.id)
+        self.assertNotIn("product_uom_id", vals_list[2])
+
+    def test_deferred_post(self):
+        self.analytic_line_model._mrp_analytic_post(self.product, "action_archive")
+        self.assertFalse(self.product.active, "Posted at once by default")
+        self.product.action_unarchive()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_analytic_posting.deferred_posting", "True"
+        )
+        other_product = self.product.copy()
+        products = self.product | other_product
+        self.analytic_line_model._mrp_analytic_post(self.product, "action_archive")
+        self.analytic_line_model._mrp_analytic_post(products, "action_archive")
+        self.assertTrue(all(products.mapped("active")), "Posted on commit")
+        self.env.cr.precommit.run()
+        self.assertFalse(any(products.mapped("active")))
@@ -9,21 +9,26 @@ class MrpBom(models.Model):
 
     @api.model
     def _get_components_ids(self, product_tmpl=None, product=None, recursive=False):
-        """Gets an objet with the ids of the components, within two arrays:
-        'product_template_ids' and 'product_product_ids'.
+        """Gets the ids of the components of the BoM of the product.
         Set recursive to get ids of child boms."""
-        product_ids = []
         bom = super()._bom_find(product_tmpl=product_tmpl, product=product)
-        for bom_line_id in bom.bom_line_ids:
-            product_ids.append(bom_line_id.product_id.id)
-            if recursive:
-                subcomponents = self._get_components_ids(
-                    product_tmpl=bom_line_id.product_id.product_tmpl_id,
-                    product=bom_line_id.product_id,
-                    recursive=recursive,
-                )
-                product_ids.extend(subcomponents)
-        return product_ids
+        return bom._get_component_products(recursive=recursive).ids
+
+    def _get_component_products(self, recursive=False):
+        """Returns the components of the BoMs, and of their child BoMs if
+        recursive. The products already found are not walked again, so that
+        the BoM of a shared sub-assembly is searched once and cycles end."""
+        products = self.env["product.product"]
+        boms = self
+        while boms:
+            components = boms.mapped("bom_line_ids.product_id") - products
+            products |= components
+            if not recursive:
+                break
+            boms = self.browse()
+            for component in components:
+                boms |= self._bom_find(product=component)
+        return products
 
     def action_see_bom_documents(self):
         product_ids = self._get_components_ids(
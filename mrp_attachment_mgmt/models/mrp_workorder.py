@@ -9,13 +9,20 @@ class MrpWorkorder(models.Model):
     _inherit = "mrp.workorder"
 
     def action_see_workorder_attachments(self):
-        error = []
-        for product in self.mapped("product_id"):
-            if (
-                product.message_attachment_count == 0
-                and product.product_tmpl_id.message_attachment_count == 0
-            ):
-                error.append(product.display_name)
+        products = self.mapped("product_id")
+        groups = self.env["ir.attachment"].read_group(
+            products._get_attachments_domain(),
+            ["res_model", "res_id"],
+            ["res_model", "res_id"],
+            lazy=False,
+        )
+        with_attachments = {(group["res_model"], group["res_id"]) for group in groups}
+        error = [
+            product.display_name
+            for product in products
+            if ("product.product", product.id) not in with_attachments
+            and ("product.template", product.product_tmpl_id.id) not in with_attachments
+        ]
         if error:
             raise UserError(
                 _("%d Product(s) without drawing:\n%s") % (len(error), "\n".join(error))
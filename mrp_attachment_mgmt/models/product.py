@@ -17,11 +17,11 @@ class ProductProduct(models.Model):
     def action_see_bom_documents(self):
         return fields.first(self.bom_ids).action_see_bom_documents()
 
-    def _action_show_attachments(self):
-        """Returns the action to show the attachments linked to the products
+    def _get_attachments_domain(self):
+        """Returns the domain of the attachments linked to the products
         recordset or to their templates.
         """
-        domain = [
+        return [
             "|",
             "&",
             ("res_model", "=", "product.product"),
@@ -30,6 +30,12 @@ class ProductProduct(models.Model):
             ("res_model", "=", "product.template"),
             ("res_id", "in", self.product_tmpl_id.ids),
         ]
+
+    def _action_show_attachments(self):
+        """Returns the action to show the attachments linked to the products
+        recordset or to their templates.
+        """
+        domain = self._get_attachments_domain()
         action = self.env["ir.actions.actions"]._for_xml_id("base.action_attachment")
         action.update({"domain": domain})
         return action
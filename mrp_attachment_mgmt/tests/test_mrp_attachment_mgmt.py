@@ -38,3 +38,29 @@ class TestMrpAttachmentMgmt(TestMrpAttachmentMgmtBase):
         attachment = self._create_attachment(self.product)
         action = self.mrp_production.action_show_attachments()
         self.assertIn(attachment.id, self.attachment_model.search(action["domain"]).ids)
+
+    def test_multi_level_bom_documents(self):
+        component_d = self.env["product.product"].create(
+            {"name": "Test Component D", "type": "product"}
+        )
+        # Component D is a shared sub-component of A and B
+        self._create_mrp_bom(self.component_a, [(component_d, 1)])
+        self._create_mrp_bom(self.component_b, [(component_d, 2)])
+        product_ids = self.env["mrp.bom"]._get_components_ids(
+            self.product.product_tmpl_id, self.product, recursive=True
+        )
+        self.assertEqual(
+            sorted(product_ids),
+            sorted(
+                (
+                    self.component_a + self.component_b + self.component_c + component_d
+                ).ids
+            ),
+        )
+        product_ids = self.env["mrp.bom"]._get_components_ids(
+            self.product.product_tmpl_id, self.product
+        )
+        self.assertNotIn(component_d.id, product_ids)
+        attachment_d = self._create_attachment(component_d)
+        action = self.bom.action_see_bom_documents()
+        self.assertIn(attachment_d, self.attachment_model.search(action["domain"]))
@@ -1,4 +1,5 @@
 import logging
+from collections import deque
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
@@ -186,23 +187,8 @@ class MrpBom(models.Model):
         divided by the number created by the BoM
         and converted into its UoM
         """
-        from collections import defaultdict
-
-        graph = defaultdict(list)
-        V = set()
-
-        def check_cycle(v, visited, recStack, graph):
-            visited[v] = True
-            recStack[v] = True
-            for neighbour in graph[v]:
-                if visited[neighbour] is False:
-                    if check_cycle(neighbour, visited, recStack, graph) is True:
-                        return True
-                elif recStack[neighbour] is True:
-                    return True
-            recStack[v] = False
-            return False
-
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            self = self.with_context(bom_attribute_match_cache={})
         product_ids = set()
         product_boms = {}
 
@@ -220,6 +206,11 @@ class MrpBom(models.Model):
             for product in products:
                 product_boms.setdefault(product, self.env["mrp.bom"])
 
+        def get_line_product(bom_line):
+            return self._get_component_template_product(
+                bom_line, product, bom_line.product_id
+            )
+
         boms_done = [
             (
                 self,
@@ -232,72 +223,72 @@ class MrpBom(models.Model):
             )
         ]
         lines_done = []
-        V |= {product.product_tmpl_id.id}
 
-        bom_lines = []
+        # Each line carries the templates of the products exploded above it,
+        # a component found among them means the BoM graph has a cycle.
+        parent_templates = frozenset([product.product_tmpl_id.id])
+        bom_lines = deque()
         for bom_line in self.bom_line_ids:
-            product_id = bom_line.product_id
-            V |= {product_id.product_tmpl_id.id}
-            graph[product.product_tmpl_id.id].append(product_id.product_tmpl_id.id)
-            bom_lines.append((bom_line, product, quantity, False))
-            product_ids.add(product_id.id)
+            bom_lines.append((bom_line, product, quantity, False, parent_templates))
+            line_product = get_line_product(bom_line)
+            if line_product:
+                product_ids.add(line_product.id)
         update_product_boms()
         product_ids.clear()
         while bom_lines:
-            current_line, current_product, current_qty, parent_line = bom_lines[0]
-            bom_lines = bom_lines[1:]
+            (
+                current_line,
+                current_product,
+                current_qty,
+                parent_line,
+                parent_templates,
+            ) = bom_lines.popleft()
 
             if current_line._skip_bom_line(current_product):
                 continue
 
+            line_product = get_line_product(current_line)
+            if not line_product:
+                # component_template_id is set, but no attribute value match.
+                continue
+            if parent_line and line_product.product_tmpl_id.id in parent_templates:
+                raise UserError(
+                    _(
+                        "Recursion error!  A product with a Bill of Material "
+                        "should not have itself in its BoM or child BoMs!"
+                    )
+                )
+            if current_line.component_template_id:
+                # Expose the matching variant to the callers reading
+                # `bom_line.product_id`, without writing it to the database.
+                self.env.cache.set(
+                    current_line, current_line._fields["product_id"], line_product.id
+                )
+
             line_quantity = current_qty * current_line.product_qty
-            if current_line.product_id not in product_boms:
+            if line_product not in product_boms:
+                product_ids.add(line_product.id)
                 update_product_boms()
                 product_ids.clear()
-            # upd start
-            component_template_product = self._get_component_template_product(
-                current_line, product, current_line.product_id
-            )
-            if component_template_product:
-                # need to set product_id temporary
-                current_line.sudo().product_id = component_template_product
-            else:
-                # component_template_id is set, but no attribute value match.
-                continue
-            # upd end
-            bom = product_boms.get(current_line.product_id)
+            bom = product_boms.get(line_product)
             if bom:
                 converted_line_quantity = current_line.product_uom_id._compute_quantity(
                     line_quantity / bom.product_qty, bom.product_uom_id
                 )
-                bom_lines += [
-                    (
-                        line,
-                        current_line.product_id,
-                        converted_line_quantity,
-                        current_line,
-                    )
-                    for line in bom.bom_line_ids
-                ]
+                child_templates = parent_templates | {line_product.product_tmpl_id.id}
                 for bom_line in bom.bom_line_ids:
-                    graph[current_line.product_id.product_tmpl_id.id].append(
-                        bom_line.product_id.product_tmpl_id.id
-                    )
-                    if bom_line.product_id.product_tmpl_id.id in V and check_cycle(
-                        bom_line.product_id.product_tmpl_id.id,
-                        {key: False for key in V},
-                        {key: False for key in V},
-                        graph,
-                    ):
-                        raise UserError(
-                            _(
-                                "Recursion error!  A product with a Bill of Material "
-                                "should not have itself in its BoM or child BoMs!"
-                            )
+                    bom_lines.append(
+                        (
+                            bom_line,
+                            line_product,
+                            converted_line_quantity,
+                            current_line,
+                            child_templates,
                         )
-                    V |= {bom_line.product_id.product_tmpl_id.id}
-                    if bom_line.product_id not in product_boms:
-                        product_ids.add(bom_line.product_id.id)
+                    )
+                    child_product = get_line_product(bom_line)
+                    if child_product and child_product not in product_boms:
+                        product_ids.add(child_product.id)
                 boms_done.append(
                     (
                         bom,
@@ -333,43 +324,88 @@ class MrpBom(models.Model):
     def _get_component_template_product(
         self, bom_line, bom_product_id, line_product_id
     ):
-        if bom_line.component_template_id:
-            comp = bom_line.component_template_id
-            comp_attr_ids = (
-                comp.valid_product_template_attribute_line_ids.attribute_id.ids
+        if not bom_line.component_template_id:
+            return line_product_id
+        comp = bom_line.component_template_id
+        # Attribute values are specific to a product template, so they also
+        # identify the template of the finished product.
+        key = (
+            comp.id,
+            tuple(sorted(bom_product_id.product_template_attribute_value_ids.ids)),
+        )
+        cache = self.env.context.get("bom_attribute_match_cache")
+        if cache is not None and key in cache:
+            return self.env["product.product"].browse(cache[key])
+        product = self._match_component_template_product(comp, bom_product_id)
+        if cache is not None:
+            cache[key] = product.id
+        return product
+
+    def _get_attribute_match_tables(self, component_templates):
+        """Return, by component template id, its active variants by the set of
+        their attribute values (``product.attribute.value`` ids).
+
+        The tables are built for all the given templates at once, and kept in
+        the ``bom_attribute_match_cache`` of the context, which is required.
+        """
+        tables = self.env.context["bom_attribute_match_cache"].setdefault(
+            "attribute_match_tables", {}
+        )
+        missing = component_templates.filtered(lambda t: t.id not in tables)
+        for template in missing:
+            tables[template.id] = {}
+        for variant in missing.product_variant_ids:
+            value_ids = (
+                variant.product_template_attribute_value_ids.product_attribute_value_id
+            )
+            tables[variant.product_tmpl_id.id][frozenset(value_ids.ids)] = variant.id
+        return {template.id: tables[template.id] for template in component_templates}
+
+    def _match_component_template_product(self, component_template, bom_product):
+        """Return the variant of `component_template` having the same attribute
+        values as `bom_product`, or an empty recordset."""
+        comp_attrs = (
+            component_template.valid_product_template_attribute_line_ids.attribute_id
+        )
+        prod_attr_ids = (
+            bom_product.valid_product_template_attribute_line_ids.attribute_id.ids
+        )
+        # check attributes
+        if not all(item in prod_attr_ids for item in comp_attrs.ids):
+            _log.info(
+                "Component skipped. Component attributes must be included into "
+                "product attributes to use component_template_id."
             )
-            prod_attr_ids = (
-                bom_product_id.valid_product_template_attribute_line_ids.attribute_id.ids
+            return self.env["product.product"]
+        # find matching combination, ignoring the attributes not creating variants
+        match_attr_ids = comp_attrs.filtered(
+            lambda x: x.create_variant != "no_variant"
+        ).ids
+        value_ids = frozenset(
+            ptav.product_attribute_value_id.id
+            for ptav in bom_product.product_template_attribute_value_ids
+            if ptav.attribute_id.id in match_attr_ids
+        )
+        if not value_ids:
+            return self.env["product.product"]
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            # Without a cache to keep the table, only look for this variant
+            return self.env["product.product"].search(
+                [("product_tmpl_id", "=", component_template.id)]
+                + [
+                    (
+                        "product_template_attribute_value_ids.product_attribute_value_id",
+                        "=",
+                        value_id,
+                    )
+                    for value_id in value_ids
+                ],
+                limit=1,
             )
-            # check attributes
-            if not all(item in prod_attr_ids for item in comp_attr_ids):
-                _log.info(
-                    "Component skipped. Component attributes must be included into "
-                    "product attributes to use component_template_id."
-                )
-                return False
-            # find matching combination
-            combination = self.env["product.template.attribute.value"]
-            for ptav in bom_product_id.product_template_attribute_value_ids:
-                combination |= self.env["product.template.attribute.value"].search(
-                    [
-                        ("product_tmpl_id", "=", comp.id),
-                        ("attribute_id", "=", ptav.attribute_id.id),
-                        (
-                            "product_attribute_value_id",
-                            "=",
-                            ptav.product_attribute_value_id.id,
-                        ),
-                    ]
-                )
-            if len(combination) == 0:
-                return False
-            product_id = comp._get_variant_for_combination(combination)
-            if product_id and product_id.active:
-                return product_id
-            return False
-        else:
-            return line_product_id
+        table = self._get_attribute_match_tables(component_template)
+        return self.env["product.product"].browse(
+            table[component_template.id].get(value_ids)
+        )
 
     @api.constrains("product_tmpl_id", "product_id")
     def _check_component_attributes(self):
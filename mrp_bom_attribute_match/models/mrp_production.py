@@ -4,12 +4,18 @@ from odoo import api, models
 class MrpProduction(models.Model):
     _inherit = "mrp.production"
 
+    def _get_moves_raw_values(self):
+        # Share the matched component variants between the productions
+        return super(
+            MrpProduction, self.with_context(bom_attribute_match_cache={})
+        )._get_moves_raw_values()
+
     def action_confirm(self):
         res = super().action_confirm()
-        for bom_line in self.bom_id.bom_line_ids:
-            if bom_line.component_template_id:
-                # product_id was set in mrp.bom.explode for correct flow. Need to remove it.
-                bom_line.product_id = False
+        template_lines = self.bom_id.bom_line_ids.filtered("component_template_id")
+        # product_id was set in cache by mrp.bom.explode for correct flow.
+        # Need to remove it.
+        template_lines.invalidate_cache(["product_id"], template_lines.ids)
         return res
 
     @api.constrains("bom_id")
@@ -1,13 +1,35 @@
 # Copyright 2023 Camptocamp SA (https://www.camptocamp.com).
 # @author Iván Todorovich <ivan.todorovich@camptocamp.com>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
-from odoo import _, models
+from odoo import _, api, models
 from odoo.tools import float_round
 
 
 class ReportBomStructure(models.AbstractModel):
     _inherit = "report.mrp.report_bom_structure"
 
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        # Share the component variants matched during the report request
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            self = self.with_context(bom_attribute_match_cache={})
+        return super()._get_report_values(docids, data=data)
+
+    @api.model
+    def _get_report_data(self, bom_id, searchQty=0, searchVariant=False):
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            self = self.with_context(bom_attribute_match_cache={})
+        return super()._get_report_data(
+            bom_id, searchQty=searchQty, searchVariant=searchVariant
+        )
+
+    def _get_bom(
+        self, bom_id=False, product_id=False, line_qty=False, line_id=False, level=False
+    ):
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            self = self.with_context(bom_attribute_match_cache={})
+        return super()._get_bom(bom_id, product_id, line_qty, line_id, level)
+
     def _get_bom_lines(self, bom, bom_quantity, product, line_id, level):
         # OVERRIDE to fill in the `line.product_id` if a component template is used.
         # To avoid a complete override, we HACK the bom by replacing it with a virtual
@@ -16,6 +38,8 @@ class ReportBomStructure(models.AbstractModel):
             line.component_template_id for line in bom.bom_line_ids
         )
         if has_template_lines:
+            if bom.env.context.get("bom_attribute_match_cache") is not None:
+                bom._get_attribute_match_tables(bom.bom_line_ids.component_template_id)
             bom = bom.new(origin=bom)
             to_ignore_line_ids = []
             for line in bom.bom_line_ids:
@@ -45,7 +69,13 @@ class ReportBomStructure(models.AbstractModel):
         return components, total
 
     def _get_price(self, bom, factor, product):
-        """Replaced in order to implement component_template logic"""
+        """Replaced in order to implement component_template logic.
+
+        The variant of a component template is the one of the report lines,
+        having the same values as the product for the attributes creating
+        variants. A component template only matched on attributes not creating
+        variants has no variant to price, as it has no line.
+        """
         price = 0
         if bom.operation_ids:
             # routing are defined on a BoM and don't have a concept of quantity.
@@ -75,29 +105,19 @@ class ReportBomStructure(models.AbstractModel):
                 company = bom.company_id or self.env.company
                 # Modification start
                 if line.component_template_id:
-                    vals = product.product_template_attribute_value_ids.mapped(
-                        "product_attribute_value_id"
-                    ).ids
-                    match_found = False
-                    for prod in line.component_template_id.product_variant_ids:
-                        pavs = prod.product_template_attribute_value_ids.mapped(
-                            "product_attribute_value_id"
-                        )
-                        match = set(pavs.ids).issubset(set(vals))
-                        if match:
-                            match_found = True
-                            break
-                    if match_found:
-                        not_rounded_price = (
-                            prod.uom_id._compute_price(
-                                prod.with_company(company).standard_price,
-                                line.product_uom_id,
-                            )
-                            * prod_qty
-                        )
-                        price += company.currency_id.round(not_rounded_price)
-                    else:
+                    prod = bom._get_component_template_product(
+                        line, product, line.product_id
+                    )
+                    if not prod:
                         continue
+                    not_rounded_price = (
+                        prod.uom_id._compute_price(
+                            prod.with_company(company).standard_price,
+                            line.product_uom_id,
+                        )
+                        * prod_qty
+                    )
+                    price += company.currency_id.round(not_rounded_price)
                     # Modification end
                 else:
                     not_rounded_price = (
@@ -119,6 +139,8 @@ class ReportBomStructure(models.AbstractModel):
         unfolded=False,
     ):  # pylint: disable=dangerous-default-value
         """Override to tweak get_sub_lines and calculate product and child_bom"""
+        if self.env.context.get("bom_attribute_match_cache") is None:
+            self = self.with_context(bom_attribute_match_cache={})
 
         def get_sub_lines(bom, product_id, line_qty, line_id, level):
             data = self._get_bom(
@@ -104,6 +104,101 @@ class TestMrpAttachmentMgmt(TestMrpBomAttributeMatchBase):
         self.mo_sword = mo_form.save()
         self.mo_sword.action_confirm()
 
+    def test_manufacturing_order_variants(self):
+        template_line = self.bom_id.bom_line_ids.filtered("component_template_id")
+        productions = self.env["mrp.production"]
+        for sword in self.product_sword.product_variant_ids:
+            mo_form = Form(self.env["mrp.production"])
+            mo_form.product_id = sword
+            mo_form.bom_id = self.bom_id
+            mo_form.product_qty = 1
+            productions |= mo_form.save()
+        productions.action_confirm()
+        for production in productions:
+            self.assertIn(
+                production.product_id.product_template_attribute_value_ids.name,
+                production.move_raw_ids.filtered(
+                    lambda m: m.product_id.product_tmpl_id == self.product_plastic
+                ).product_id.display_name,
+            )
+        # The matching variant is never written on the BoM line
+        self.env["mrp.bom.line"].flush()
+        self.env.cr.execute(
+            "SELECT product_id FROM mrp_bom_line WHERE id = %s", (template_line.id,)
+        )
+        self.assertFalse(self.env.cr.fetchone()[0])
+        self.assertFalse(template_line.product_id)
+
+    def test_report_bom_structure_variants(self):
+        report = self.env[
+            "report.mrp.report_bom_structure"
+        ]._with_attribute_match_cache()
+        for price, plastic in enumerate(self.product_plastic.product_variant_ids, 1):
+            plastic.standard_price = price
+        for sword in self.product_sword.product_variant_ids:
+            plastic = self.product_plastic.product_variant_ids.filtered(
+                lambda p: p.product_template_attribute_value_ids.name
+                == sword.product_template_attribute_value_ids.name
+            )
+            self.assertEqual(
+                report._get_price(self.bom_id, 1, sword), plastic.standard_price
+            )
+            data = report._get_bom(bom_id=self.bom_id.id, product_id=sword.id)
+            self.assertIn(plastic.id, [line["prod_id"] for line in data["components"]])
+        # All the variants were resolved with a single lookup table
+        cache = report.env.context["bom_attribute_match_cache"]
+        self.assertEqual(
+            list(cache["attribute_match_tables"]), [self.product_plastic.id]
+        )
+
+    def test_match_without_cache(self):
+        # Without a cache, the variant is searched directly, with the same result
+        line = self.bom_id.bom_line_ids.filtered("component_template_id")
+        bom_cached = self.bom_id.with_context(bom_attribute_match_cache={})
+        for sword in self.product_sword.product_variant_ids:
+            product = self.bom_id._get_component_template_product(
+                line, sword, line.product_id
+            )
+            self.assertTrue(product)
+            self.assertEqual(
+                product,
+                bom_cached._get_component_template_product(
+                    line, sword, line.product_id
+                ),
+            )
+
+    def test_report_bom_structure_no_variant_component(self):
+        # A component template only matched on an attribute not creating
+        # variants has no matching variant: it is neither listed nor priced.
+        attribute = self.env["product.attribute"].create(
+            {
+                "name": "Engraving",
+                "create_variant": "no_variant",
+                "value_ids": [(0, 0, {"name": "Engraved"})],
+            }
+        )
+        attribute_line = {
+            "attribute_id": attribute.id,
+            "value_ids": [(6, 0, attribute.value_ids.ids)],
+        }
+        self.product_sword.attribute_line_ids = [(0, 0, attribute_line)]
+        plate = self.env["product.template"].create(
+            {
+                "name": "Engraving Plate",
+                "standard_price": 5,
+                "attribute_line_ids": [(0, 0, attribute_line)],
+            }
+        )
+        bom = self._create_bom(
+            self.product_sword,
+            [dict(component_template_id=plate.id, product_qty=1)],
+        )
+        report = self.env["report.mrp.report_bom_structure"]
+        for sword in self.product_sword.product_variant_ids:
+            self.assertEqual(report._get_price(bom, 1, sword), 0)
+            data = report._get_bom(bom_id=bom.id, product_id=sword.id)
+            self.assertFalse(data["components"])
+
     # def test_manufacturing_order_5(self):
     #     mo_form = Form(self.env["mrp.production"])
     #     mo_form.product_id = self.product_surf.product_variant_ids[0]
@@ -4,13 +4,14 @@
 {
     "name": "MRP BoM Hierarchy",
     "summary": "Make it easy to navigate through BoM hierarchy.",
-    "version": "14.0.1.0.0",
+    "version": "14.0.1.1.0",
     "author": "ForgeFlow, Odoo Community Association (OCA)",
     "category": "Manufacturing",
     "depends": ["mrp"],
     "website": "https://github.com/OCA/manufacture",
     "license": "AGPL-3",
     "data": [
+        "security/ir.model.access.csv",
         "view/mrp.xml",
     ],
     "installable": True,
@@ -1,10 +1,12 @@
 # Copyright 2015-22 ForgeFlow S.L. (https://www.forgeflow.com)
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
-import operator as py_operator
+from collections import defaultdict
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
+from .mrp_bom_link import FOUND_PARENT_QUERY
+
 
 class MrpBom(models.Model):
     _inherit = "mrp.bom"
@@ -12,61 +14,76 @@ class MrpBom(models.Model):
 
     @api.depends("bom_line_ids.bom_id", "product_id", "product_tmpl_id")
     def _compute_product_has_other_bom(self):
+        # Count the BoMs of each product and template, an active BoM counts
+        # itself.
+        bom_model = self.env["mrp.bom"]
+        product_counts = {
+            res["product_id"][0]: res["product_id_count"]
+            for res in bom_model.read_group(
+                [("product_id", "in", self.product_id.ids)],
+                ["product_id"],
+                ["product_id"],
+            )
+        }
+        template_counts = {
+            res["product_tmpl_id"][0]: res["product_tmpl_id_count"]
+            for res in bom_model.read_group(
+                [("product_tmpl_id", "in", self.product_tmpl_id.ids)],
+                ["product_tmpl_id"],
+                ["product_tmpl_id"],
+            )
+        }
         for bom in self:
             if bom.product_id:
-                bom_ids = self.env["mrp.bom"].search(
-                    [("product_id", "=", bom.product_id.id), ("id", "!=", bom.id)],
-                )
+                count = product_counts.get(bom.product_id.id, 0)
             else:
-                bom_ids = self.env["mrp.bom"].search(
-                    [
-                        ("product_tmpl_id", "=", bom.product_tmpl_id.id),
-                        ("id", "!=", bom.id),
-                    ],
-                )
-            if bom_ids:
-                bom.product_has_other_bom = True
-            else:
-                bom.product_has_other_bom = False
+                count = template_counts.get(bom.product_tmpl_id.id, 0)
+            bom.product_has_other_bom = count > (1 if bom._origin and bom.active else 0)
 
     @api.depends("bom_line_ids.bom_id", "product_id", "product_tmpl_id")
     def _compute_parent_bom_ids(self):
-        for bom in self:
-            parent_bom_line_ids = self.env["mrp.bom.line"]._bom_line_find(
-                product_tmpl=bom.product_id.product_tmpl_id or bom.product_tmpl_id,
-                product=bom.product_id,
+        parent_ids = defaultdict(list)
+        bom_ids = self._origin.ids
+        if bom_ids:
+            self.env.cr.execute(
+                """
+                SELECT DISTINCT child_bom_id, parent_bom_id
+                FROM mrp_bom_link
+                WHERE child_bom_id IN %s
+                """,
+                (tuple(bom_ids),),
             )
-            if parent_bom_line_ids:
-                bom.parent_bom_ids = parent_bom_line_ids.bom_id
-                bom.has_parent = True
-            else:
-                bom.parent_bom_ids = False
-                bom.has_parent = False
+            for child_id, parent_id in self.env.cr.fetchall():
+                parent_ids[child_id].append(parent_id)
+        for bom in self:
+            bom.parent_bom_ids = [(6, 0, parent_ids[bom._origin.id])]
+            bom.has_parent = bool(parent_ids[bom._origin.id])
 
     @api.depends("bom_line_ids.bom_id", "bom_line_ids.product_id")
     def _compute_child_bom_ids(self):
+        # Saved BoMs are resolved like the search on has_child, unsaved ones
+        # have no links yet.
+        saved_ids = [bom_id for bom_id in self.ids if isinstance(bom_id, int)]
+        parent_ids = self.env["mrp.bom.link"]._get_found_parent_ids(saved_ids)
         for bom in self:
             bom_line_ids = bom.bom_line_ids
             bom.child_bom_ids = bom_line_ids.child_bom_id
-            bom.has_child = bool(bom.child_bom_ids)
+            if isinstance(bom.id, int):
+                bom.has_child = bom.id in parent_ids
+            else:
+                bom.has_child = bool(bom.child_bom_ids)
 
     def _search_has_child(self, operator, value):
-        if operator not in ["=", "!="]:
-            raise UserError(_("This operator is not supported"))
-        if value == "True":
-            value = True
-        elif value == "False":
-            value = False
-        if not isinstance(value, bool):
-            raise UserError(_("Value should be True or False (not %s)") % value)
-        ops = {"=": py_operator.eq, "!=": py_operator.ne}
-        ids = []
-        for bom in self.search([]):
-            if ops[operator](value, bom.has_child):
-                ids.append(bom.id)
-        return [("id", "in", ids)]
+        self.env["mrp.bom.link"]._flush_found_parents()
+        return self._search_hierarchy_link(operator, value, FOUND_PARENT_QUERY)
 
     def _search_has_parent(self, operator, value):
+        return self._search_hierarchy_link(
+            operator, value, "SELECT child_bom_id FROM mrp_bom_link"
+        )
+
+    @api.model
+    def _search_hierarchy_link(self, operator, value, query):
         if operator not in ["=", "!="]:
             raise UserError(_("This operator is not supported"))
         if value == "True":
@@ -75,12 +92,47 @@ class MrpBom(models.Model):
             value = False
         if not isinstance(value, bool):
             raise UserError(_("Value should be True or False (not %s)") % value)
-        ops = {"=": py_operator.eq, "!=": py_operator.ne}
-        ids = []
-        for bom in self.search([]):
-            if ops[operator](value, bom.has_parent):
-                ids.append(bom.id)
-        return [("id", "in", ids)]
+        if (operator == "=") == value:
+            return [("id", "inselect", (query, []))]
+        return [("id", "not inselect", (query, []))]
+
+    def _get_where_used_boms(self):
+        """Return the BoMs using these BoMs, at any level."""
+        if not self:
+            return self
+        self.env.cr.execute(
+            """
+            WITH RECURSIVE parents(id) AS (
+                SELECT parent_bom_id FROM mrp_bom_link WHERE child_bom_id IN %s
+                UNION
+                SELECT k.parent_bom_id
+                FROM mrp_bom_link k
+                JOIN parents p ON k.child_bom_id = p.id
+            )
+            SELECT id FROM parents
+            """,
+            (tuple(self.ids),),
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _get_exploded_boms(self):
+        """Return the BoMs of the components of these BoMs, at any level."""
+        if not self:
+            return self
+        self.env.cr.execute(
+            """
+            WITH RECURSIVE children(id) AS (
+                SELECT child_bom_id FROM mrp_bom_link WHERE parent_bom_id IN %s
+                UNION
+                SELECT k.child_bom_id
+                FROM mrp_bom_link k
+                JOIN children c ON k.parent_bom_id = c.id
+            )
+            SELECT id FROM children
+            """,
+            (tuple(self.ids),),
+        )
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
 
     @api.depends(
         "product_id",
@@ -118,6 +170,20 @@ class MrpBom(models.Model):
         store="True",
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        boms = super().create(vals_list)
+        self.env["mrp.bom.link"]._update_child_boms(boms)
+        return boms
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "product_id" in vals or "product_tmpl_id" in vals:
+            self.env["mrp.bom.link"]._update_child_boms(self)
+        if {"active", "company_id", "picking_type_id"} & set(vals):
+            self.invalidate_cache(["has_child"])
+        return res
+
     def action_open_child_tree_view(self):
         self.ensure_one()
         res = self.env["ir.actions.actions"]._for_xml_id("mrp.mrp_bom_form_action")
@@ -180,6 +246,18 @@ class MrpBomLine(models.Model):
         for line in self:
             line.has_bom = bool(line.child_bom_id)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["mrp.bom.link"]._update_bom_lines(lines)
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "product_id" in vals or "bom_id" in vals:
+            self.env["mrp.bom.link"]._update_bom_lines(self)
+        return res
+
     def action_open_product_bom_tree_view(self):
         self.ensure_one()
         res = self.env["ir.actions.actions"]._for_xml_id("mrp.mrp_bom_form_action")
@@ -0,0 +1,124 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from odoo import api, fields, models
+from odoo.tools import sql
+
+# A BoM line links its BoM to every BoM of the line product: the BoMs of the
+# variant, and the BoMs of its template not restricted to a variant.
+LINK_QUERY = """
+    SELECT l.id, l.bom_id, b.id
+    FROM mrp_bom_line l
+    JOIN mrp_bom b ON b.product_id = l.product_id
+    WHERE {where}
+    UNION ALL
+    SELECT l.id, l.bom_id, b.id
+    FROM mrp_bom_line l
+    JOIN product_product p ON p.id = l.product_id
+    JOIN mrp_bom b ON b.product_id IS NULL AND b.product_tmpl_id = p.product_tmpl_id
+    WHERE {where}
+"""
+
+# The parent BoMs of the links to the BoMs that ``mrp.bom._bom_find`` resolves
+# for a line: active BoMs of a non service product, matching the company and
+# the operation type of the parent BoM when both are set.
+FOUND_PARENT_QUERY = """
+    SELECT k.parent_bom_id
+    FROM mrp_bom_link k
+    JOIN mrp_bom p ON p.id = k.parent_bom_id
+    JOIN mrp_bom c ON c.id = k.child_bom_id
+    JOIN mrp_bom_line l ON l.id = k.bom_line_id
+    JOIN product_product pp ON pp.id = l.product_id
+    JOIN product_template pt ON pt.id = pp.product_tmpl_id
+    WHERE c.active
+    AND pt.type != 'service'
+    AND (
+        p.company_id IS NULL
+        OR c.company_id IS NULL
+        OR c.company_id = p.company_id
+    )
+    AND (
+        p.picking_type_id IS NULL
+        OR c.picking_type_id IS NULL
+        OR c.picking_type_id = p.picking_type_id
+    )
+"""
+
+
+class MrpBomLink(models.Model):
+    _name = "mrp.bom.link"
+    _description = "BoM Hierarchy Link"
+    _log_access = False
+
+    bom_line_id = fields.Many2one(
+        "mrp.bom.line", required=True, index=True, ondelete="cascade"
+    )
+    parent_bom_id = fields.Many2one(
+        "mrp.bom", required=True, index=True, ondelete="cascade"
+    )
+    child_bom_id = fields.Many2one(
+        "mrp.bom", required=True, index=True, ondelete="cascade"
+    )
+
+    def init(self):
+        for table, column in [
+            ("mrp_bom", "product_id"),
+            ("mrp_bom", "product_tmpl_id"),
+            ("mrp_bom_line", "product_id"),
+        ]:
+            index_name = "mrp_bom_hierarchy_%s_%s_index" % (table, column)
+            if not sql.index_exists(self.env.cr, index_name):
+                sql.create_index(self.env.cr, index_name, table, [column])
+        # Rebuild the whole table, so that it is consistent after an update.
+        self.env.cr.execute("DELETE FROM mrp_bom_link")
+        self._insert_links("TRUE", ())
+
+    @api.model
+    def _insert_links(self, where, params):
+        self.env.cr.execute(
+            "INSERT INTO mrp_bom_link (bom_line_id, parent_bom_id, child_bom_id) "
+            + LINK_QUERY.format(where=where),
+            params + params,
+        )
+        self.invalidate_cache()
+        self.env["mrp.bom"].invalidate_cache(
+            ["parent_bom_ids", "has_parent", "has_child"]
+        )
+
+    @api.model
+    def _flush_found_parents(self):
+        """Flush the fields read by ``FOUND_PARENT_QUERY``."""
+        self.env["mrp.bom"].flush(["active", "company_id", "picking_type_id"])
+        self.env["mrp.bom.line"].flush(["product_id", "bom_id"])
+        self.env["product.template"].flush(["type"])
+
+    @api.model
+    def _get_found_parent_ids(self, bom_ids):
+        """Return the ids among ``bom_ids`` having a line with a child BoM."""
+        if not bom_ids:
+            return set()
+        self._flush_found_parents()
+        self.env.cr.execute(
+            FOUND_PARENT_QUERY + " AND k.parent_bom_id IN %s", (tuple(bom_ids),)
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _update_bom_lines(self, bom_lines):
+        """Refresh the links of the given BoM lines."""
+        if not bom_lines:
+            return
+        self.env["mrp.bom.line"].flush(["product_id", "bom_id"])
+        self.env.cr.execute(
+            "DELETE FROM mrp_bom_link WHERE bom_line_id IN %s", (tuple(bom_lines.ids),)
+        )
+        self._insert_links("l.id IN %s", (tuple(bom_lines.ids),))
+
+    @api.model
+    def _update_child_boms(self, boms):
+        """Refresh the links pointing to the given BoMs."""
+        if not boms:
+            return
+        self.env["mrp.bom"].flush(["product_id", "product_tmpl_id"])
+        self.env.cr.execute(
+            "DELETE FROM mrp_bom_link WHERE child_bom_id IN %s", (tuple(boms.ids),)
+        )
+        self._insert_links("b.id IN %s", (tuple(boms.ids),))
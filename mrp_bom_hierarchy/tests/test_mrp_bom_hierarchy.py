@@ -0,0 +1,103 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+
+from odoo.tests import common
+
+
+class TestMrpBomHierarchy(common.SavepointCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product_obj = cls.env["product.product"]
+        cls.bom_obj = cls.env["mrp.bom"]
+        cls.link_obj = cls.env["mrp.bom.link"]
+
+        # Create products:
+        cls.product_a = cls.product_obj.create({"name": "FP A", "type": "product"})
+        cls.product_b = cls.product_obj.create({"name": "SF B", "type": "product"})
+        cls.product_c = cls.product_obj.create({"name": "SF C", "type": "product"})
+        cls.product_d = cls.product_obj.create({"name": "RM D", "type": "product"})
+
+        # Create Bills of Materials, A > B > C > D:
+        cls.bom_a = cls._create_bom(cls.product_a, cls.product_b)
+        cls.bom_b = cls._create_bom(cls.product_b, cls.product_c)
+        cls.bom_c = cls._create_bom(cls.product_c, cls.product_d)
+
+    @classmethod
+    def _create_bom(cls, product, component):
+        return cls.bom_obj.create(
+            {
+                "product_tmpl_id": product.product_tmpl_id.id,
+                "bom_line_ids": [
+                    (0, 0, {"product_id": component.id, "product_qty": 1.0})
+                ],
+            }
+        )
+
+    def _get_child_boms(self, bom):
+        links = self.link_obj.search([("parent_bom_id", "=", bom.id)])
+        return links.child_bom_id
+
+    def _assert_has_child(self, boms, expected):
+        boms.invalidate_cache(["has_child"])
+        for bom in boms:
+            self.assertEqual(bom.has_child, bom in expected)
+        found = self.bom_obj.search([("id", "in", boms.ids), ("has_child", "=", True)])
+        self.assertEqual(found, expected)
+        not_found = self.bom_obj.search(
+            [("id", "in", boms.ids), ("has_child", "=", False)]
+        )
+        self.assertEqual(not_found, boms - expected)
+
+    def test_01_links_on_create(self):
+        self.assertEqual(self._get_child_boms(self.bom_a), self.bom_b)
+        self.assertEqual(self._get_child_boms(self.bom_b), self.bom_c)
+        self.assertFalse(self._get_child_boms(self.bom_c))
+        self.assertEqual(self.bom_b.parent_bom_ids, self.bom_a)
+        self.assertTrue(self.bom_b.has_parent)
+        self.assertFalse(self.bom_a.has_parent)
+        # A variant BoM is linked as well
+        bom_variant = self.bom_obj.create(
+            {
+                "product_tmpl_id": self.product_b.product_tmpl_id.id,
+                "product_id": self.product_b.id,
+            }
+        )
+        self.assertEqual(self._get_child_boms(self.bom_a), self.bom_b | bom_variant)
+
+    def test_02_links_on_line_write(self):
+        self.bom_a.bom_line_ids.product_id = self.product_c
+        self.assertEqual(self._get_child_boms(self.bom_a), self.bom_c)
+        self.assertFalse(self.bom_b.has_parent)
+        self.assertEqual(self.bom_c.parent_bom_ids, self.bom_a | self.bom_b)
+
+    def test_03_links_on_bom_write(self):
+        self.bom_b.product_tmpl_id = self.product_d.product_tmpl_id
+        self.assertFalse(self._get_child_boms(self.bom_a))
+        self.assertEqual(self._get_child_boms(self.bom_c), self.bom_b)
+
+    def test_04_links_on_unlink(self):
+        self.bom_b.bom_line_ids.unlink()
+        self.assertFalse(self._get_child_boms(self.bom_b))
+        self.assertFalse(self.bom_c.has_parent)
+        self.bom_b.unlink()
+        self.assertFalse(self._get_child_boms(self.bom_a))
+
+    def test_05_multi_level(self):
+        self.assertEqual(self.bom_a._get_exploded_boms(), self.bom_b | self.bom_c)
+        self.assertEqual(self.bom_b._get_exploded_boms(), self.bom_c)
+        self.assertFalse(self.bom_c._get_exploded_boms())
+        self.assertEqual(self.bom_c._get_where_used_boms(), self.bom_a | self.bom_b)
+        self.assertEqual(self.bom_b._get_where_used_boms(), self.bom_a)
+        self.assertFalse(self.bom_a._get_where_used_boms())
+
+    def test_06_has_child(self):
+        boms = self.bom_a | self.bom_b | self.bom_c
+        self._assert_has_child(boms, self.bom_a | self.bom_b)
+        # An archived BoM is not found for the line
+        self.bom_c.active = False
+        self._assert_has_child(boms, self.bom_a)
+        self.bom_c.active = True
+        # Nor is a BoM of another company
+        company = self.env["res.company"].create({"name": "Other Company"})
+        (self.bom_b | self.bom_c).write({"company_id": company.id})
+        self._assert_has_child(boms, self.bom_b)
@@ -4,7 +4,7 @@
 
 {
     "name": "MRP Multi Level",
-    "version": "14.0.1.15.0",
+    "version": "14.0.1.16.2",
     "development_status": "Production/Stable",
     "license": "LGPL-3",
     "author": "Ucamco, ForgeFlow, Odoo Community Association (OCA)",
@@ -26,6 +26,7 @@
         "views/mrp_inventory_views.xml",
         "views/mrp_move_views.xml",
         "views/mrp_planned_order_views.xml",
+        "views/mrp_run_views.xml",
         "wizards/mrp_multi_level_views.xml",
         "views/mrp_menuitem.xml",
         "data/mrp_multi_level_cron.xml",
@@ -8,3 +8,7 @@ from . import mrp_inventory
 from . import product_mrp_area
 from . import stock_rule
 from . import mrp_production
+from . import mrp_bom
+from . import purchase_order
+from . import stock_move
+from . import mrp_run
@@ -0,0 +1,55 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from odoo import api, models
+
+
+class MrpBom(models.Model):
+    _inherit = "mrp.bom"
+
+    def _get_mrp_net_change_products(self):
+        """Products whose explosion depends on these bills of materials."""
+        products = self.mapped("product_id")
+        for bom in self.filtered(lambda b: not b.product_id):
+            products |= bom.product_tmpl_id.product_variant_ids
+        return products
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        boms = super().create(vals_list)
+        boms._get_mrp_net_change_products()._mrp_mark_net_change()
+        return boms
+
+    def write(self, vals):
+        products = self._get_mrp_net_change_products()
+        res = super().write(vals)
+        (products | self._get_mrp_net_change_products())._mrp_mark_net_change()
+        return res
+
+    def unlink(self):
+        products = self._get_mrp_net_change_products()
+        res = super().unlink()
+        products._mrp_mark_net_change()
+        return res
+
+
+class MrpBomLine(models.Model):
+    _inherit = "mrp.bom.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.mapped("bom_id")._get_mrp_net_change_products()._mrp_mark_net_change()
+        return lines
+
+    def write(self, vals):
+        boms = self.mapped("bom_id")
+        res = super().write(vals)
+        (
+            boms | self.mapped("bom_id")
+        )._get_mrp_net_change_products()._mrp_mark_net_change()
+        return res
+
+    def unlink(self):
+        products = self.mapped("bom_id")._get_mrp_net_change_products()
+        res = super().unlink()
+        products._mrp_mark_net_change()
+        return res
@@ -67,6 +67,13 @@ class MrpMove(models.Model):
     parent_product_id = fields.Many2one(
         comodel_name="product.product", string="Parent Product", index=True
     )
+    exploded_from_id = fields.Many2one(
+        comodel_name="product.mrp.area",
+        string="Exploded From",
+        help="Product MRP Area whose planned supply generated this demand.",
+        index=True,
+        ondelete="set null",
+    )
     production_id = fields.Many2one(
         comodel_name="mrp.production", string="Manufacturing Order", index=True
     )
@@ -0,0 +1,393 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+
+import base64
+import cProfile
+import logging
+import marshal
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import str2bool
+
+_logger = logging.getLogger(__name__)
+
+MRP_RUN_TOP_PRODUCTS = 20
+# Tables of the MRP records counted in every phase
+MRP_RUN_COUNTED_TABLES = {
+    "mrp_move_count": "mrp_move",
+    "planned_order_count": "mrp_planned_order",
+    "mrp_inventory_count": "mrp_inventory",
+}
+
+
+class MrpRun(models.Model):
+    _name = "mrp.run"
+    _description = "MRP Run"
+    _order = "date_start desc, id desc"
+    _rec_name = "date_start"
+
+    date_start = fields.Datetime(string="Started", readonly=True)
+    date_end = fields.Datetime(string="Finished", readonly=True)
+    duration = fields.Float(string="Duration (s)", readonly=True)
+    user_id = fields.Many2one(comodel_name="res.users", string="User", readonly=True)
+    mrp_area_ids = fields.Many2many(
+        comodel_name="mrp.area", string="MRP Areas", readonly=True
+    )
+    net_change = fields.Boolean(readonly=True)
+    query_count = fields.Integer(string="SQL Queries", readonly=True)
+    phase_ids = fields.One2many(
+        comodel_name="mrp.run.phase", inverse_name="run_id", readonly=True
+    )
+    product_ids = fields.One2many(
+        comodel_name="mrp.run.product",
+        inverse_name="run_id",
+        string="Slowest Products",
+        readonly=True,
+    )
+    previous_run_id = fields.Many2one(
+        comodel_name="mrp.run", compute="_compute_previous_run_id"
+    )
+    previous_duration = fields.Float(
+        string="Previous Duration (s)", related="previous_run_id.duration"
+    )
+    profile_attachment_id = fields.Many2one(
+        comodel_name="ir.attachment", string="Profile", readonly=True
+    )
+    area_job_ids = fields.One2many(
+        comodel_name="mrp.run.area", inverse_name="run_id", readonly=True
+    )
+
+    def _compute_previous_run_id(self):
+        for rec in self:
+            rec.previous_run_id = self.search(
+                [("date_end", "!=", False), ("id", "<", rec.id)],
+                order="id desc",
+                limit=1,
+            )
+
+    @api.model
+    def _profiling_enabled(self):
+        return str2bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_multi_level.run_profile", "False")
+        )
+
+    @api.model
+    def _get_mrp_record_last_ids(self):
+        """Highest id of each counted table, read from the primary key index."""
+        last_ids = {}
+        for key, table in MRP_RUN_COUNTED_TABLES.items():
+            self.env.cr.execute("SELECT COALESCE(MAX(id), 0) FROM %s" % table)
+            last_ids[key] = self.env.cr.fetchone()[0]
+        return last_ids
+
+    @api.model
+    def _count_mrp_records_created(self, last_ids):
+        """Number of records created in each counted table since the given
+        highest ids."""
+        counts = {}
+        for key, table in MRP_RUN_COUNTED_TABLES.items():
+            self.env.cr.execute(
+                "SELECT COUNT(*) FROM %s WHERE id > %%s" % table, (last_ids[key],)
+            )
+            counts[key] = self.env.cr.fetchone()[0]
+        return counts
+
+    @contextmanager
+    def _profile_phase(self, name):
+        """Record the wall time, queries and MRP records created by the code
+        run in this context. Phases with the same name are accumulated."""
+        if not self:
+            yield
+            return
+        # Area jobs record their own phases, as they run at the same time
+        name = self.env.context.get("mrp_run_phase_prefix", "") + name
+        self.env["base"].flush()
+        last_ids = self._get_mrp_record_last_ids()
+        query_count = self.env.cr.sql_log_count
+        start = time.time()
+        yield
+        self.env["base"].flush()
+        vals = {
+            "duration": time.time() - start,
+            "query_count": self.env.cr.sql_log_count - query_count,
+        }
+        vals.update(self._count_mrp_records_created(last_ids))
+        phase = self.phase_ids.filtered(lambda p: p.name == name)
+        if phase:
+            phase.write({key: phase[key] + value for key, value in vals.items()})
+        else:
+            vals.update(run_id=self.id, name=name, sequence=len(self.phase_ids) * 10)
+            self.env["mrp.run.phase"].create(vals)
+
+    @contextmanager
+    def _profile_run(self):
+        """Time the whole run, and profile it if enabled."""
+        start = time.time()
+        query_count = self.env.cr.sql_log_count
+        profiler = cProfile.Profile() if self._profiling_enabled() else None
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+        if profiler:
+            profiler.create_stats()
+            self.profile_attachment_id = self.env["ir.attachment"].create(
+                {
+                    "name": "mrp_run_%s.prof" % self.id,
+                    "res_model": self._name,
+                    "res_id": self.id,
+                    "datas": base64.b64encode(marshal.dumps(profiler.stats)),
+                }
+            )
+        self.write(
+            {
+                "date_end": fields.Datetime.now(),
+                "duration": time.time() - start,
+                "query_count": self.env.cr.sql_log_count - query_count,
+            }
+        )
+
+    @api.model
+    def _get_retention_days(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_multi_level.run_retention_days", 30)
+        )
+
+    @api.autovacuum
+    def _gc_mrp_runs(self):
+        """Remove the runs older than the retention period, 0 keeping them
+        all."""
+        retention_days = self._get_retention_days()
+        if not retention_days:
+            return
+        runs = self.search(
+            [
+                (
+                    "date_start",
+                    "<",
+                    fields.Datetime.now() - timedelta(days=retention_days),
+                )
+            ]
+        )
+        runs.mapped("profile_attachment_id").unlink()
+        runs.unlink()
+
+    def _save_product_timings(self, timings):
+        """Keep the product MRP areas that took the longest to compute,
+        among the ones already saved by the other area jobs of the run."""
+        self.ensure_one()
+        slowest = sorted(timings.items(), key=lambda t: t[1], reverse=True)
+        run_product_obj = self.env["mrp.run.product"]
+        run_product_obj.create(
+            [
+                {
+                    "run_id": self.id,
+                    "product_mrp_area_id": product_mrp_area_id,
+                    "duration": duration,
+                }
+                for product_mrp_area_id, duration in slowest[:MRP_RUN_TOP_PRODUCTS]
+            ]
+        )
+        run_product_obj.search([("run_id", "=", self.id)])[
+            MRP_RUN_TOP_PRODUCTS:
+        ].unlink()
+
+    def _run_failed_area_jobs(self):
+        """Once all the area jobs of the run are over, run the failed ones
+        again one after the other, in case they failed because of the jobs
+        running at the same time. Only the worker locking the run does it."""
+        self.ensure_one()
+        self.env["mrp.run.area"].flush(["state", "rerun"])
+        self.env.cr.execute(
+            """
+            SELECT id FROM mrp_run WHERE id = %s
+            FOR NO KEY UPDATE SKIP LOCKED
+            """,
+            (self.id,),
+        )
+        if not self.env.cr.fetchone():
+            return
+        self.env.cr.execute(
+            """
+            SELECT id FROM mrp_run_area
+            WHERE run_id = %s AND state = 'pending' LIMIT 1
+            """,
+            (self.id,),
+        )
+        if self.env.cr.fetchone():
+            return
+        jobs = self.area_job_ids.filtered(
+            lambda job: job.state == "failed" and not job.rerun
+        )
+        jobs.write({"rerun": True})
+        for job in jobs:
+            _logger.info("Running MRP area %s again serially", job.mrp_area_id.name)
+            job._run_area_job()
+
+
+class MrpRunPhase(models.Model):
+    _name = "mrp.run.phase"
+    _description = "MRP Run Phase"
+    _order = "run_id, sequence, id"
+
+    run_id = fields.Many2one(
+        comodel_name="mrp.run", required=True, index=True, ondelete="cascade"
+    )
+    sequence = fields.Integer()
+    name = fields.Char(string="Phase", required=True)
+    duration = fields.Float(string="Duration (s)")
+    query_count = fields.Integer(string="SQL Queries")
+    mrp_move_count = fields.Integer(
+        string="MRP Moves", help="Number of records created in the phase."
+    )
+    planned_order_count = fields.Integer(
+        string="Planned Orders", help="Number of records created in the phase."
+    )
+    mrp_inventory_count = fields.Integer(
+        string="MRP Inventory", help="Number of records created in the phase."
+    )
+    previous_duration = fields.Float(
+        string="Previous Duration (s)", compute="_compute_previous"
+    )
+    duration_change = fields.Float(
+        string="Change (%)",
+        compute="_compute_previous",
+        help="Change of duration compared to the same phase of the previous run.",
+    )
+
+    def _compute_previous(self):
+        for rec in self:
+            previous = rec.run_id.previous_run_id.phase_ids.filtered(
+                lambda p: p.name == rec.name
+            )
+            rec.previous_duration = previous[:1].duration
+            rec.duration_change = (
+                (rec.duration - rec.previous_duration) / rec.previous_duration * 100
+                if rec.previous_duration
+                else 0.0
+            )
+
+
+class MrpRunProduct(models.Model):
+    _name = "mrp.run.product"
+    _description = "MRP Run Slowest Product"
+    _order = "run_id, duration desc, id"
+
+    run_id = fields.Many2one(
+        comodel_name="mrp.run", required=True, index=True, ondelete="cascade"
+    )
+    product_mrp_area_id = fields.Many2one(
+        comodel_name="product.mrp.area", ondelete="cascade"
+    )
+    duration = fields.Float(string="Duration (s)")
+
+
+class MrpRunArea(models.Model):
+    _name = "mrp.run.area"
+    _description = "MRP Run Area Job"
+    _order = "run_id, id"
+
+    run_id = fields.Many2one(
+        comodel_name="mrp.run", readonly=True, index=True, ondelete="cascade"
+    )
+    mrp_area_id = fields.Many2one(
+        comodel_name="mrp.area", required=True, readonly=True, ondelete="cascade"
+    )
+    lowest_llc = fields.Integer(string="Lowest Low Level Code", readonly=True)
+    state = fields.Selection(
+        selection=[("pending", "Pending"), ("done", "Done"), ("failed", "Failed")],
+        default="pending",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    duration = fields.Float(string="Duration (s)", readonly=True)
+    error = fields.Text(readonly=True)
+    rerun = fields.Boolean(
+        string="Run Again Serially",
+        readonly=True,
+        help="The area failed in parallel and was run again once the other "
+        "areas were done.",
+    )
+
+    @api.model
+    def _get_worker_crons(self, workers):
+        """Return the crons running the area jobs. A cron only runs in one
+        process at a time, so there is one of them for every worker, all
+        running the same code."""
+        cron = self.env.ref("mrp_multi_level.mrp_run_area_cron").sudo()
+        return cron.search(
+            [("model_id", "=", cron.model_id.id), ("code", "=", cron.code)],
+            order="id",
+            limit=workers,
+        )
+
+    @api.model
+    def _cron_run_area_jobs(self, auto_commit=True):
+        """Run the pending area jobs, committing after each of them. Every
+        job is locked by the worker running it, so that the other workers
+        take the next ones. The worker ending the last job of a run runs its
+        failed jobs again."""
+        while True:
+            self.flush(["state"])
+            self.env.cr.execute(
+                """
+                SELECT id FROM mrp_run_area WHERE state = 'pending'
+                ORDER BY id LIMIT 1 FOR UPDATE SKIP LOCKED
+                """
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job._run_area_job()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            if job.run_id:
+                job.run_id._run_failed_area_jobs()
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    def _run_area_job(self):
+        """Run the area in a savepoint, with the run in the context to record
+        its phases and slowest products. The net change flags of the area are
+        only cleared when it succeeds."""
+        self.ensure_one()
+        start = time.time()
+        timings = {}
+        # Every job has its own supply rule cache
+        wizard = self.env["mrp.multi.level"].with_context(
+            mrp_supply_rule_cache={},
+            mrp_run_id=self.run_id.id,
+            mrp_run_timings=timings,
+            mrp_run_phase_prefix="%s: " % self.mrp_area_id.name,
+        )
+        vals = {"state": "done", "error": False}
+        try:
+            with self.env.cr.savepoint():
+                wizard._mrp_run_area(self.mrp_area_id, self.lowest_llc)
+                wizard._mrp_clear_net_change(self.mrp_area_id)
+                if self.run_id:
+                    self.run_id._save_product_timings(timings)
+        except Exception:
+            _logger.exception("MRP run failed for area %s", self.mrp_area_id.name)
+            vals = {"state": "failed", "error": traceback.format_exc()}
+            self.env.clear()
+        vals["duration"] = time.time() - start
+        self.write(vals)
+
+    def action_retry(self):
+        self.filtered(lambda job: job.state == "failed").write(
+            {"state": "pending", "rerun": False}
+        )
+        self.env.ref("mrp_multi_level.mrp_run_area_cron").sudo()._trigger()
@@ -3,6 +3,7 @@
 # - Jordi Ballester Alomar <jordi.ballester@forgeflow.com>
 # - Lois Rilo Antelo <lois.rilo@forgeflow.com>
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from collections import defaultdict
 from math import ceil
 
 from odoo import _, api, fields, models
@@ -98,6 +99,15 @@ class ProductMRPArea(models.Model):
         readonly=True,
     )
     mrp_planner_id = fields.Many2one("res.users")
+    mrp_net_change = fields.Boolean(
+        string="Net Change Pending",
+        default=True,
+        index=True,
+        copy=False,
+        readonly=True,
+        help="Set when the moves, purchase order lines, bills of materials or "
+        "MRP parameters of this product changed since the last MRP run.",
+    )
 
     _sql_constraints = [
         (
@@ -128,6 +138,31 @@ class ProductMRPArea(models.Model):
             if any(v < 0 for v in rec.values()):
                 raise ValidationError(_("You cannot use a negative number."))
 
+    @api.model
+    def _get_net_change_fields(self):
+        """Changes in these fields are taken into account in the next net
+        change MRP run."""
+        return [
+            "active",
+            "location_proc_id",
+            "mrp_exclude",
+            "mrp_inspection_delay",
+            "mrp_maximum_order_qty",
+            "mrp_minimum_order_qty",
+            "mrp_minimum_stock",
+            "mrp_nbr_days",
+            "mrp_qty_multiple",
+            "mrp_transit_delay",
+            "distribution_lead_time",
+        ]
+
+    def write(self, vals):
+        if "mrp_net_change" not in vals and set(vals) & set(
+            self._get_net_change_fields()
+        ):
+            vals = dict(vals, mrp_net_change=True)
+        return super().write(vals)
+
     def name_get(self):
         return [
             (
@@ -174,36 +209,67 @@ class ProductMRPArea(models.Model):
             rec.mrp_lead_time = 0
 
     def _compute_qty_available(self):
-        for rec in self:
-            rec.qty_available = rec.product_id.with_context(
-                location=rec._get_locations().ids
-            ).qty_available
+        # Products sharing the same locations are computed together, with one
+        # grouped query on quants per location tree.
+        for location_ids, recs in self._group_by_locations().items():
+            products = recs.mapped("product_id").with_context(
+                location=list(location_ids)
+            )
+            qty_by_product = {p.id: p.qty_available for p in products}
+            for rec in recs:
+                rec.qty_available = qty_by_product[rec.product_id.id]
 
-    def _compute_supply_method(self):
+    def _get_supply_rule(self, location, values):
+        """Return the rule giving the supply method of the product.
+
+        Keep getting the rule for the product and the source location until the
+        action is "buy" or "manufacture". Or until the action is "Pull From" or
+        "Pull & Push" and the supply method is "Take from Stock".
+        """
+        self.ensure_one()
         group_obj = self.env["procurement.group"]
+        rule = group_obj._get_rule(self.product_id, location, values)
+        if not rule:
+            return rule
+        while rule.action not in ("buy", "manufacture") and rule.procure_method in (
+            "make_to_order",
+            "mts_else_mto",
+        ):
+            new_rule = group_obj._get_rule(
+                self.product_id, rule.location_src_id, values
+            )
+            if not new_rule:
+                break
+            rule = new_rule
+        return rule
+
+    def _get_supply_rule_key(self, location):
+        """Products with the same routes get the same rule at a location."""
+        self.ensure_one()
+        routes = self.product_id.route_ids | self.product_id.categ_id.total_route_ids
+        return (
+            frozenset(routes.ids),
+            location.id,
+            self.mrp_area_id.warehouse_id.id,
+            self.company_id.id,
+        )
+
+    def _compute_supply_method(self):
+        # An MRP run provides a cache shared by all its computations.
+        rule_cache = self.env.context.get("mrp_supply_rule_cache", {})
         for rec in self:
             proc_loc = rec.location_proc_id or rec.location_id
-            values = {
-                "warehouse_id": rec.mrp_area_id.warehouse_id,
-                "company_id": rec.company_id,
-            }
-            rule = group_obj._get_rule(rec.product_id, proc_loc, values)
+            key = rec._get_supply_rule_key(proc_loc)
+            if key not in rule_cache:
+                values = {
+                    "warehouse_id": rec.mrp_area_id.warehouse_id,
+                    "company_id": rec.company_id,
+                }
+                rule_cache[key] = rec._get_supply_rule(proc_loc, values).id
+            rule = self.env["stock.rule"].browse(rule_cache[key])
             if not rule:
                 rec.supply_method = "none"
                 continue
-            # Keep getting the rule for the product and the source location until the
-            # action is "buy" or "manufacture". Or until the action is "Pull From" or
-            # "Pull & Push" and the supply method is "Take from Stock".
-            while rule.action not in ("buy", "manufacture") and rule.procure_method in (
-                "make_to_order",
-                "mts_else_mto",
-            ):
-                new_rule = group_obj._get_rule(
-                    rec.product_id, rule.location_src_id, values
-                )
-                if not new_rule:
-                    break
-                rule = new_rule
             # Determine the supply method based on the final rule.
             boms = rec.product_id.product_tmpl_id.bom_ids.filtered(
                 lambda x: x.type in ["normal", "phantom"]
@@ -302,3 +368,13 @@ class ProductMRPArea(models.Model):
     def _get_locations(self):
         self.ensure_one()
         return self.mrp_area_id._get_locations()
+
+    def _group_by_locations(self):
+        """Return the records grouped by the ids of their locations."""
+        rec_ids_by_locations = defaultdict(list)
+        for rec in self:
+            rec_ids_by_locations[tuple(rec._get_locations().ids)].append(rec.id)
+        return {
+            location_ids: self.browse(rec_ids)
+            for location_ids, rec_ids in rec_ids_by_locations.items()
+        }
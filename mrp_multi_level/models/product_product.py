@@ -4,7 +4,9 @@
 
 import ast
 
-from odoo import fields, models
+from odoo import api, fields, models
+
+NET_CHANGE_QUEUE = "mrp_multi_level.net_change_product_ids"
 
 
 class Product(models.Model):
@@ -48,6 +50,42 @@ class Product(models.Model):
             parameters.write({"active": False})
         return res
 
+    def _mrp_mark_net_change(self):
+        """Flag the MRP parameters of the products to be computed again in
+        the next net change MRP run.
+
+        The products are only queued, the flags are set once for the whole
+        transaction, before commit or when an MRP run starts.
+        """
+        if not self:
+            return
+        data = self.env.cr.precommit.data
+        product_ids = data.get(NET_CHANGE_QUEUE)
+        if product_ids is None:
+            product_ids = data[NET_CHANGE_QUEUE] = set()
+            self.env.cr.precommit.add(self.env["product.product"]._mrp_flush_net_change)
+        product_ids.update(self.ids)
+
+    @api.model
+    def _mrp_flush_net_change(self):
+        """Set the net change flag of the MRP parameters of the queued
+        products."""
+        product_ids = self.env.cr.precommit.data.pop(NET_CHANGE_QUEUE, None)
+        if not product_ids:
+            return
+        parameters = self.env["product.mrp.area"]
+        parameters.flush(["product_id", "mrp_net_change"])
+        self.env.cr.execute(
+            """
+            UPDATE product_mrp_area SET mrp_net_change = TRUE
+            WHERE product_id IN %s AND mrp_net_change IS NOT TRUE
+            RETURNING id
+            """,
+            (tuple(product_ids),),
+        )
+        parameter_ids = [row[0] for row in self.env.cr.fetchall()]
+        parameters.invalidate_cache(["mrp_net_change"], parameter_ids)
+
     def action_view_mrp_area_parameters(self):
         self.ensure_one()
         xmlid = "mrp_multi_level.product_mrp_area_action"
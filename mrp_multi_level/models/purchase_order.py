@@ -0,0 +1,45 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from odoo import api, models
+
+NET_CHANGE_FIELDS = [
+    "date_planned",
+    "order_id",
+    "product_id",
+    "product_qty",
+    "product_uom",
+    "product_uom_qty",
+]
+
+
+class PurchaseOrder(models.Model):
+    _inherit = "purchase.order"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "state" in vals or "picking_type_id" in vals:
+            self.mapped("order_line.product_id")._mrp_mark_net_change()
+        return res
+
+
+class PurchaseOrderLine(models.Model):
+    _inherit = "purchase.order.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.mapped("product_id")._mrp_mark_net_change()
+        return lines
+
+    def write(self, vals):
+        if not set(vals) & set(NET_CHANGE_FIELDS):
+            return super().write(vals)
+        products = self.mapped("product_id")
+        res = super().write(vals)
+        (products | self.mapped("product_id"))._mrp_mark_net_change()
+        return res
+
+    def unlink(self):
+        products = self.mapped("product_id")
+        res = super().unlink()
+        products._mrp_mark_net_change()
+        return res
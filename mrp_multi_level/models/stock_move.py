@@ -0,0 +1,36 @@
+# License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+from odoo import api, models
+
+NET_CHANGE_FIELDS = [
+    "date",
+    "location_dest_id",
+    "location_id",
+    "product_id",
+    "product_uom",
+    "product_uom_qty",
+    "state",
+]
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super().create(vals_list)
+        moves.mapped("product_id")._mrp_mark_net_change()
+        return moves
+
+    def write(self, vals):
+        if not set(vals) & set(NET_CHANGE_FIELDS):
+            return super().write(vals)
+        products = self.mapped("product_id")
+        res = super().write(vals)
+        (products | self.mapped("product_id"))._mrp_mark_net_change()
+        return res
+
+    def unlink(self):
+        products = self.mapped("product_id")
+        res = super().unlink()
+        products._mrp_mark_net_change()
+        return res
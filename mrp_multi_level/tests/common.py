@@ -612,3 +612,47 @@ class TestMrpMultiLevelCommon(SavepointCase):
         # Confirm the MO to generate stock moves:
         mo.action_confirm()
         return mo
+
+    @classmethod
+    def _get_mrp_results(cls):
+        """Return a comparable snapshot of the last MRP run."""
+        moves = sorted(
+            (
+                move.product_mrp_area_id.id,
+                move.mrp_date,
+                move.mrp_type,
+                move.mrp_qty,
+                move.mrp_origin,
+                move.name,
+                move.origin,
+                tuple(move.planned_order_up_ids.mapped("product_mrp_area_id").ids),
+            )
+            for move in cls.mrp_move_obj.search([])
+        )
+        planned_orders = sorted(
+            (
+                order.product_mrp_area_id.id,
+                order.due_date,
+                order.order_release_date,
+                order.mrp_qty,
+                order.mrp_action,
+                order.name,
+                order.origin,
+                len(order.mrp_move_down_ids),
+            )
+            for order in cls.planned_order_obj.search([])
+        )
+        inventories = sorted(
+            (
+                inv.product_mrp_area_id.id,
+                inv.date,
+                inv.demand_qty,
+                inv.supply_qty,
+                inv.initial_on_hand_qty,
+                inv.final_on_hand_qty,
+                inv.running_availability,
+                inv.to_procure,
+            )
+            for inv in cls.mrp_inventory_obj.search([])
+        )
+        return moves, planned_orders, inventories
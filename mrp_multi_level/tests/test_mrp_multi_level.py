@@ -1,9 +1,13 @@
 # Copyright 2018-19 ForgeFlow S.L. (https://www.forgeflow.com)
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
 
+import sys
 from datetime import date, datetime, timedelta
+from unittest.mock import patch
 
 from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tools import mute_logger
 
 from .common import TestMrpMultiLevelCommon
 
@@ -18,6 +22,29 @@ class TestMrpMultiLevel(TestMrpMultiLevelCommon):
         self.assertEqual(self.pp_1.llc, 2)
         self.assertEqual(self.pp_2.llc, 2)
 
+    def test_01b_llc_graph(self):
+        """LLC is the longest path in the BoM graph and cycles are broken."""
+        wizard = self.mrp_multi_level_wiz
+        llc, cycles = wizard._compute_llc({1: {2, 3}, 2: {3}, 3: set(), 4: set()})
+        self.assertEqual(llc, {1: 0, 2: 1, 3: 2, 4: 0})
+        self.assertFalse(cycles)
+        llc, cycles = wizard._compute_llc({1: {2}, 2: {3}, 3: {1, 4}, 4: set(), 5: {1}})
+        self.assertEqual(cycles, [[1, 2, 3, 1]])
+        self.assertEqual(llc, {1: 1, 2: 2, 3: 3, 4: 4, 5: 0})
+        # Nothing to update when the BoMs did not change:
+        current_llc, components = wizard._get_llc_graph()
+        self.assertEqual(current_llc[self.pp_1.id], 2)
+        self.assertIn(self.sf_1.id, components[self.fp_2.id])
+        # The edges come from the BoM lines of active BoMs
+        lines = wizard._get_llc_bom_lines(self.fp_2.product_tmpl_id)
+        self.assertIn(self.sf_1.id, [line["product_id"] for line in lines])
+        self.env["mrp.bom"].search(
+            [("product_tmpl_id", "=", self.fp_2.product_tmpl_id.id)]
+        ).active = False
+        current_llc, components = wizard._get_llc_graph()
+        self.assertFalse(components[self.fp_2.id])
+        self.assertEqual(wizard._compute_llc(components)[0], current_llc)
+
     def test_02_product_mrp_area(self):
         """Tests that mrp products are generated correctly."""
         product_mrp_area = self.product_mrp_area_obj.search(
@@ -842,3 +869,283 @@ class TestMrpMultiLevel(TestMrpMultiLevelCommon):
                     f"unexpected value for {key}: {inv[key]} "
                     f"(expected {test_vals[key]} on {inv.date})",
                 )
+
+    def test_25_llc_tier_calculation(self):
+        """The LLC tier calculation gives the same results as the product by
+        product one."""
+        expected = self._get_mrp_results()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_multi_level.llc_tier_calculation", "True"
+        )
+        self.mrp_multi_level_wiz.create({}).run_mrp_multi_level()
+        self.assertEqual(self._get_mrp_results(), expected)
+
+    def test_26_mrp_run_area(self):
+        """Running the areas one by one gives the same results as running
+        them all together."""
+        expected = self._get_mrp_results()
+        wizard = self.mrp_multi_level_wiz.create({})
+        self.assertEqual(wizard._get_mrp_parallel_workers(self.mrp_area_obj), 0)
+        wizard._mrp_cleanup(self.mrp_area_obj)
+        mrp_lowest_llc = wizard._low_level_code_calculation()
+        wizard._calculate_mrp_applicable(self.mrp_area_obj)
+        for mrp_area in self.mrp_area_obj.search([]):
+            wizard._mrp_run_area(mrp_area, mrp_lowest_llc)
+        self.assertEqual(self._get_mrp_results(), expected)
+
+    def test_26_mrp_run_area_jobs(self):
+        """Areas run by worker jobs give the same results as the serial run."""
+        expected = self._get_mrp_results()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_multi_level.parallel_workers", "2"
+        )
+        mrp_areas = self.mrp_area_obj.search([])
+        self.assertGreater(len(mrp_areas), 2)
+        wizard = self.mrp_multi_level_wiz.create({})
+        self.assertEqual(wizard._get_mrp_parallel_workers(mrp_areas), 2)
+        fp_1_area = self.product_mrp_area_obj.search(
+            [("product_id", "=", self.fp_1.id), ("mrp_area_id", "=", self.mrp_area.id)]
+        )
+        fp_1_area.mrp_net_change = True
+        wizard.run_mrp_multi_level()
+        mrp_run = self.env["mrp.run"].search([], limit=1)
+        jobs = mrp_run.area_job_ids
+        self.assertEqual(jobs.mrp_area_id, mrp_areas)
+        self.assertEqual(set(jobs.mapped("state")), {"pending"})
+        # Nothing is computed until the jobs run
+        self.assertFalse(self.env["mrp.inventory"].search([]))
+        self.assertTrue(fp_1_area.mrp_net_change)
+        crons = jobs._get_worker_crons(2)
+        self.assertEqual(len(crons), 2)
+        self.assertEqual(
+            self.env["ir.cron.trigger"].search([("cron_id", "in", crons.ids)]).cron_id,
+            crons,
+        )
+        self.env["mrp.run.area"]._cron_run_area_jobs(auto_commit=False)
+        self.assertEqual(set(jobs.mapped("state")), {"done"})
+        self.assertEqual(self._get_mrp_results(), expected)
+        self.assertFalse(fp_1_area.mrp_net_change)
+        # The jobs record their phases and slowest products in the run
+        self.assertIn(
+            "%s: Initialisation" % self.mrp_area.name, mrp_run.phase_ids.mapped("name")
+        )
+        self.assertTrue(mrp_run.product_ids)
+
+    def test_26_mrp_run_area_jobs_failed(self):
+        """An area failing in parallel is run again once the other areas are
+        done, and keeps its net change flags until it succeeds."""
+        expected = self._get_mrp_results()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_multi_level.parallel_workers", "2"
+        )
+        fp_1_area = self.product_mrp_area_obj.search(
+            [("product_id", "=", self.fp_1.id), ("mrp_area_id", "=", self.mrp_area.id)]
+        )
+        fp_1_area.mrp_net_change = True
+        wizard = self.mrp_multi_level_wiz.create({})
+        wizard.run_mrp_multi_level()
+        mrp_run = self.env["mrp.run"].search([], limit=1)
+        job = mrp_run.area_job_ids.filtered(lambda j: j.mrp_area_id == self.mrp_area)
+        mrp_run_area = type(wizard)._mrp_run_area
+        failures = []
+
+        def _mrp_run_area(this, mrp_area, mrp_lowest_llc):
+            if mrp_area == self.mrp_area and not failures:
+                failures.append(mrp_area)
+                self.assertTrue(fp_1_area.mrp_net_change)
+                raise UserError("Concurrent update")
+            return mrp_run_area(this, mrp_area, mrp_lowest_llc)
+
+        with patch.object(type(wizard), "_mrp_run_area", _mrp_run_area):
+            with mute_logger("odoo.addons.mrp_multi_level.models.mrp_run"):
+                self.env["mrp.run.area"]._cron_run_area_jobs(auto_commit=False)
+        self.assertEqual(failures, [self.mrp_area])
+        self.assertEqual(job.state, "done")
+        self.assertTrue(job.rerun)
+        self.assertFalse(fp_1_area.mrp_net_change)
+        self.assertEqual(self._get_mrp_results(), expected)
+
+    def _get_mrp_quantities(self):
+        """Snapshot of the last MRP run ignoring descriptions, as the order
+        of same day demand may differ after a net change run."""
+        moves, planned_orders, inventories = self._get_mrp_results()
+        return (
+            sorted(move[:4] for move in moves),
+            sorted(order[:5] for order in planned_orders),
+            inventories,
+        )
+
+    def test_27_net_change(self):
+        """A net change run gives the same results as a full regeneration."""
+        self.assertFalse(
+            self.product_mrp_area_obj.search([("mrp_net_change", "=", True)])
+        )
+        self._create_picking_out(self.fp_1, 30.0, self.date_9)
+        fp_1_area = self.product_mrp_area_obj.search(
+            [("product_id", "=", self.fp_1.id), ("mrp_area_id", "=", self.mrp_area.id)]
+        )
+        # The flag is set before commit or when the next MRP run starts
+        self.env["product.product"]._mrp_flush_net_change()
+        self.assertTrue(fp_1_area.mrp_net_change)
+        self.mrp_multi_level_wiz.create({"net_change": True}).run_mrp_multi_level()
+        self.assertFalse(fp_1_area.mrp_net_change)
+        net_change_results = self._get_mrp_quantities()
+        self.mrp_multi_level_wiz.create({}).run_mrp_multi_level()
+        self.assertEqual(self._get_mrp_quantities(), net_change_results)
+        # Changing the MRP parameters is also taken into account:
+        fp_1_area.mrp_minimum_stock = 10.0
+        self.assertTrue(fp_1_area.mrp_net_change)
+        self.mrp_multi_level_wiz.create({"net_change": True}).run_mrp_multi_level()
+        net_change_results = self._get_mrp_quantities()
+        self.mrp_multi_level_wiz.create({}).run_mrp_multi_level()
+        self.assertEqual(self._get_mrp_quantities(), net_change_results)
+
+    def test_28_mrp_run_report(self):
+        """Each run is recorded with its phases and slowest products."""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_multi_level.run_profile", "True"
+        )
+        self.mrp_multi_level_wiz.create({}).run_mrp_multi_level()
+        mrp_run = self.env["mrp.run"].search([], limit=1)
+        self.assertTrue(mrp_run.date_end)
+        self.assertTrue(mrp_run.previous_run_id)
+        phases = mrp_run.phase_ids.mapped("name")
+        for phase in ("Cleanup", "Low Level Codes", "Initialisation"):
+            self.assertIn(phase, phases)
+        self.assertIn("Calculation LLC 0", phases)
+        self.assertIn("Final Process", phases)
+        initialisation = mrp_run.phase_ids.filtered(
+            lambda p: p.name == "Initialisation"
+        )
+        self.assertTrue(initialisation.query_count)
+        self.assertTrue(initialisation.mrp_move_count)
+        self.assertTrue(mrp_run.product_ids)
+        self.assertTrue(mrp_run.profile_attachment_id)
+
+    def test_29_mrp_run_autovacuum(self):
+        """Runs older than the retention period are removed."""
+        self.mrp_multi_level_wiz.create({}).run_mrp_multi_level()
+        mrp_run = self.env["mrp.run"].search([], limit=1)
+        self.env["mrp.run"]._gc_mrp_runs()
+        self.assertTrue(mrp_run.exists())
+        mrp_run.date_start = fields.Datetime.now() - timedelta(days=31)
+        self.env["mrp.run"]._gc_mrp_runs()
+        self.assertFalse(mrp_run.exists())
+
+    def test_30_mrp_run_profile_error(self):
+        """The profiler is stopped when the run fails."""
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_multi_level.run_profile", "True"
+        )
+        mrp_run = self.env["mrp.run"].create({"date_start": fields.Datetime.now()})
+        with self.assertRaises(ZeroDivisionError):
+            with mrp_run._profile_run():
+                1 / 0
+        self.assertIsNone(sys.getprofile())
+
+    def _get_mrp_inventory_snapshot(self):
+        return sorted(
+            (
+                inv.product_mrp_area_id.id,
+                inv.date,
+                inv.demand_qty,
+                inv.supply_qty,
+                inv.initial_on_hand_qty,
+                inv.final_on_hand_qty,
+                inv.running_availability,
+                tuple(sorted(inv.planned_order_ids.ids)),
+            )
+            for inv in self.mrp_inventory_obj.search([])
+        )
+
+    def test_31_mrp_inventory_batch(self):
+        """The inventory built in batch is the one built product by product."""
+        expected = self._get_mrp_inventory_snapshot()
+        inventories = self.mrp_inventory_obj.search([])
+        product_mrp_areas = inventories.mapped("product_mrp_area_id")
+        self.assertGreater(len(product_mrp_areas), 1)
+        inventories.unlink()
+        wizard = self.mrp_multi_level_wiz.create({})
+        for product_mrp_area in product_mrp_areas:
+            wizard._init_mrp_inventory(product_mrp_area)
+        self.assertEqual(self._get_mrp_inventory_snapshot(), expected)
+        # Same dates and quantities as the moves and planned orders read for
+        # every product MRP area.
+        for product_mrp_area in product_mrp_areas:
+            moves = self.mrp_move_obj.search(
+                [("product_mrp_area_id", "=", product_mrp_area.id)]
+            )
+            planned_orders = self.planned_order_obj.search(
+                [("product_mrp_area_id", "=", product_mrp_area.id)]
+            )
+            inventories = self.mrp_inventory_obj.search(
+                [("product_mrp_area_id", "=", product_mrp_area.id)]
+            )
+            self.assertEqual(
+                set(inventories.mapped("date")),
+                set(moves.mapped("mrp_date") + planned_orders.mapped("due_date")),
+            )
+            for inv in inventories:
+                date_moves = moves.filtered(lambda m, inv=inv: m.mrp_date == inv.date)
+                self.assertAlmostEqual(
+                    inv.demand_qty,
+                    abs(
+                        sum(
+                            date_moves.filtered(lambda m: m.mrp_type == "d").mapped(
+                                "mrp_qty"
+                            )
+                        )
+                    ),
+                )
+                self.assertAlmostEqual(
+                    inv.supply_qty,
+                    abs(
+                        sum(
+                            date_moves.filtered(lambda m: m.mrp_type == "s").mapped(
+                                "mrp_qty"
+                            )
+                        )
+                    ),
+                )
+                self.assertEqual(
+                    inv.planned_order_ids,
+                    planned_orders.filtered(lambda o, inv=inv: o.due_date == inv.date),
+                )
+
+    def test_32_product_mrp_area_batch_compute(self):
+        """On-hand quantities grouped by locations and supply methods from the
+        shared rule cache are the ones computed record by record."""
+        product_mrp_areas = self.product_mrp_area_obj.search([]).with_context(
+            mrp_supply_rule_cache={}
+        )
+        qty_available = {rec.id: rec.qty_available for rec in product_mrp_areas}
+        supply_method = {rec.id: rec.supply_method for rec in product_mrp_areas}
+        self.assertGreater(len(set(supply_method.values())), 1)
+        for rec in product_mrp_areas:
+            self.assertEqual(
+                qty_available[rec.id],
+                rec.product_id.with_context(
+                    location=rec._get_locations().ids
+                ).qty_available,
+            )
+            # Computed alone, without any cache
+            product_mrp_areas.invalidate_cache(["qty_available", "supply_method"])
+            single = self.product_mrp_area_obj.browse(rec.id)
+            self.assertEqual(single.qty_available, qty_available[rec.id])
+            self.assertEqual(single.supply_method, supply_method[rec.id])
+
+    def test_33_stock_moves_by_product_mrp_area(self):
+        """Stock moves read in bulk are the ones of the domain hooks of every
+        product MRP area."""
+        product_mrp_areas = self.product_mrp_area_obj.search([])
+        wizard = self.mrp_multi_level_wiz.create({})
+        moves = wizard._get_stock_moves_by_product_mrp_area(product_mrp_areas)
+        move_obj = self.env["stock.move"]
+        found = False
+        for rec in product_mrp_areas:
+            in_moves = move_obj.search(rec._in_stock_moves_domain())
+            out_moves = move_obj.search(rec._out_stock_moves_domain())
+            self.assertEqual(moves[rec]["in"], list(in_moves))
+            self.assertEqual(moves[rec]["out"], list(out_moves))
+            found = found or in_moves or out_moves
+        self.assertTrue(found)
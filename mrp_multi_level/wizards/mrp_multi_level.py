@@ -5,13 +5,66 @@
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
 
 import logging
+import time
+from collections import defaultdict
 from datetime import date, timedelta
 
 from odoo import _, api, exceptions, fields, models
-from odoo.tools import float_is_zero, mute_logger
+from odoo.osv import expression
+from odoo.tools import float_is_zero, mute_logger, split_every, str2bool
 
 logger = logging.getLogger(__name__)
 
+MRP_INVENTORY_BATCH_SIZE = 1000
+STOCK_MOVE_DOMAIN_BATCH_SIZE = 200
+
+
+class PendingPlannedOrder:
+    """Planned order waiting to be created at the end of an LLC tier.
+
+    It exposes the values used by the explosion (``origin``) so it can be
+    passed around instead of a ``mrp.planned.order`` record.
+    """
+
+    def __init__(self, vals):
+        self.vals = vals
+        self.origin = vals.get("origin")
+        self.record = None
+
+
+class LlcTierBuffer:
+    """Collects the planned orders and exploded demand of a whole LLC tier so
+    they can be written with one batched create each."""
+
+    def __init__(self):
+        self.planned_orders = []
+        self.moves = []
+        self.product_mrp_areas = {}
+
+    def add_planned_order(self, vals):
+        pending = PendingPlannedOrder(vals)
+        self.planned_orders.append(pending)
+        return pending
+
+    def add_move(self, vals, planned_order=None):
+        self.moves.append((vals, planned_order))
+
+    def flush(self, env):
+        orders = env["mrp.planned.order"].create(
+            [pending.vals for pending in self.planned_orders]
+        )
+        for pending, order in zip(self.planned_orders, orders):
+            pending.record = order
+        move_vals = []
+        for vals, pending in self.moves:
+            if isinstance(pending, PendingPlannedOrder):
+                vals = dict(vals, planned_order_up_ids=[(4, pending.record.id)])
+            move_vals.append(vals)
+        moves = env["mrp.move"].create(move_vals)
+        self.planned_orders = []
+        self.moves = []
+        return orders, moves
+
 
 class MultiLevelMrp(models.TransientModel):
     _name = "mrp.multi.level"
@@ -22,6 +75,11 @@ class MultiLevelMrp(models.TransientModel):
         string="MRP Areas to run",
         help="If empty, all areas will be computed.",
     )
+    net_change = fields.Boolean(
+        help="Only recompute the products whose stock moves, purchase order "
+        "lines, bills of materials or MRP parameters changed since the last "
+        "run, and the components whose demand changes as a consequence.",
+    )
 
     @api.model
     def _prepare_mrp_move_data_from_stock_move(
@@ -146,6 +204,7 @@ class MultiLevelMrp(models.TransientModel):
             "mrp_origin": "mrp",
             "mrp_order_number": None,
             "parent_product_id": bom.product_id.id,
+            "exploded_from_id": product.id,
             "name": (
                 "Demand Bom Explosion: %s"
                 % (name or product.product_id.default_code or product.product_id.name)
@@ -229,6 +288,10 @@ class MultiLevelMrp(models.TransientModel):
                 action,
                 values,
             )
+            tier_buffer = self.env.context.get("mrp_llc_tier_buffer")
+            if tier_buffer is not None:
+                tier_buffer.add_move(move_data, action)
+                continue
             mrpmove_id2 = self.env["mrp.move"].create(move_data)
             if hasattr(action, "mrp_move_down_ids"):
                 action.mrp_move_down_ids = [(4, mrpmove_id2.id)]
@@ -266,6 +329,7 @@ class MultiLevelMrp(models.TransientModel):
 
         qty_ordered = values.get("qty_ordered", 0.0) if values else 0.0
         qty_to_order = mrp_qty
+        tier_buffer = self.env.context.get("mrp_llc_tier_buffer")
         while qty_ordered < mrp_qty:
             qty = product_mrp_area_id._adjust_qty_to_order(qty_to_order)
             qty_to_order -= qty
@@ -275,7 +339,10 @@ class MultiLevelMrp(models.TransientModel):
             # Do not create planned order for products that are Kits
             planned_order = False
             if not product_mrp_area_id.supply_method == "phantom":
-                planned_order = self.env["mrp.planned.order"].create(order_data)
+                if tier_buffer is not None:
+                    planned_order = tier_buffer.add_planned_order(order_data)
+                else:
+                    planned_order = self.env["mrp.planned.order"].create(order_data)
             qty_ordered = qty_ordered + qty
 
             if product_mrp_area_id._to_be_exploded():
@@ -312,23 +379,122 @@ class MultiLevelMrp(models.TransientModel):
         logger.info("End MRP Cleanup")
         return True
 
-    def _domain_bom_lines_by_llc(self, llc, product_templates):
+    @api.model
+    def _domain_llc_bom_lines(self, product_templates):
+        """Domain of the BoM lines making the edges of the low level codes
+        graph, from the given product templates to their components."""
         return [
-            ("product_id.llc", "=", llc),
             ("bom_id.product_tmpl_id", "in", product_templates.ids),
             ("bom_id.active", "=", True),
         ]
 
+    @api.model
+    def _get_llc_bom_lines(self, product_templates):
+        """Return the BoM lines making the edges of the low level codes
+        graph, as dicts with the parent template and component ids."""
+        return (
+            self.env["mrp.bom.line"]
+            .search(self._domain_llc_bom_lines(product_templates))
+            .read(["parent_product_tmpl_id", "product_id"], load=None)
+        )
+
+    def _domain_bom_lines_by_llc(self, llc, product_templates):
+        """Deprecated, the low level codes are computed from the whole BoM
+        graph: override ``_domain_llc_bom_lines`` instead."""
+        logger.warning(
+            "_domain_bom_lines_by_llc is deprecated, use _domain_llc_bom_lines"
+        )
+        return [("product_id.llc", "=", llc)] + self._domain_llc_bom_lines(
+            product_templates
+        )
+
     def _get_bom_lines_by_llc(self, llc, product_templates):
+        """Deprecated, the low level codes are computed from the whole BoM
+        graph: override ``_get_llc_bom_lines`` instead."""
+        logger.warning("_get_bom_lines_by_llc is deprecated, use _get_llc_bom_lines")
         return self.env["mrp.bom.line"].search(
             self._domain_bom_lines_by_llc(llc, product_templates)
         )
 
+    @api.model
+    def _get_llc_graph(self):
+        """Return the current LLC of the active products and the components
+        of each of them, read from the BoM lines of ``_get_llc_bom_lines``."""
+        products = self.env["product.product"].search([])
+        current_llc = {}
+        variants_by_tmpl = {}
+        for product in products.read(["product_tmpl_id", "llc"], load=None):
+            current_llc[product["id"]] = product["llc"]
+            variants_by_tmpl.setdefault(product["product_tmpl_id"], []).append(
+                product["id"]
+            )
+        components = {product_id: set() for product_id in current_llc}
+        for line in self._get_llc_bom_lines(products.product_tmpl_id):
+            component_id = line["product_id"]
+            if component_id not in current_llc:
+                continue
+            for product_id in variants_by_tmpl.get(line["parent_product_tmpl_id"], []):
+                components[product_id].add(component_id)
+        return current_llc, components
+
+    @api.model
+    def _find_llc_cycle(self, components, nodes):
+        """Return a chain of products closing a cycle among the given nodes.
+
+        Every node left by the topological sort has a parent among them, so
+        walking up the parents always ends in a cycle.
+        """
+        parents = {}
+        for node in nodes:
+            for child in components[node]:
+                if child in nodes:
+                    parents.setdefault(child, []).append(node)
+        path = []
+        position = {}
+        node = next(iter(nodes))
+        while node not in position:
+            position[node] = len(path)
+            path.append(node)
+            node = parents[node][0]
+        return list(reversed(path[position[node] :] + [node]))
+
+    @api.model
+    def _compute_llc(self, components):
+        """Compute the low level codes as the longest path from a top level
+        product in the bills of materials graph.
+
+        :param components: dict with the set of component ids of every product
+        :return: the LLC of every product and the product chains found in
+            cycles. The edge closing each cycle is ignored.
+        """
+        components = {node: set(children) for node, children in components.items()}
+        cycles = []
+        while True:
+            indegree = dict.fromkeys(components, 0)
+            for children in components.values():
+                for child in children:
+                    indegree[child] += 1
+            queue = [node for node, degree in indegree.items() if not degree]
+            llc = dict.fromkeys(components, 0)
+            visited = 0
+            while queue:
+                node = queue.pop()
+                visited += 1
+                for child in components[node]:
+                    llc[child] = max(llc[child], llc[node] + 1)
+                    indegree[child] -= 1
+                    if not indegree[child]:
+                        queue.append(child)
+            if visited == len(components):
+                return llc, cycles
+            remaining = {node for node, degree in indegree.items() if degree}
+            cycle = self._find_llc_cycle(components, remaining)
+            cycles.append(cycle)
+            components[cycle[-2]].discard(cycle[-1])
+
     @api.model
     def _low_level_code_calculation(self):
         logger.info("Start low level code calculation")
-        counter = 999999
-        llc = 0
         llc_recursion_limit = (
             int(
                 self.env["ir.config_parameter"]
@@ -337,30 +503,31 @@ class MultiLevelMrp(models.TransientModel):
             )
             or 1000
         )
-        self.env["product.product"].search([]).write({"llc": llc})
-        products = self.env["product.product"].search([("llc", "=", llc)])
-        if products:
-            counter = len(products)
-        log_msg = "Low level code 0 finished - Nbr. products: %s" % counter
-        logger.info(log_msg)
-
-        while counter:
-            llc += 1
-            products = self.env["product.product"].search([("llc", "=", llc - 1)])
-            p_templates = products.mapped("product_tmpl_id")
-            bom_lines = self._get_bom_lines_by_llc(llc - 1, p_templates)
-            products = bom_lines.mapped("product_id")
-            products.write({"llc": llc})
-            counter = self.env["product.product"].search_count([("llc", "=", llc)])
-            log_msg = "Low level code {} finished - Nbr. products: {}".format(
-                llc, counter
+        current_llc, components = self._get_llc_graph()
+        llc_by_product, cycles = self._compute_llc(components)
+        for cycle in cycles:
+            chain = self.env["product.product"].browse(cycle)
+            logger.error(
+                "Cycle found in the bills of materials during LLC calculation: %s",
+                " -> ".join(chain.mapped("display_name")),
             )
-            logger.info(log_msg)
-            if llc > llc_recursion_limit:
-                logger.error("Recursion limit reached during LLC calculation.")
-                break
-
-        mrp_lowest_llc = llc
+        if any(llc > llc_recursion_limit for llc in llc_by_product.values()):
+            logger.error("Recursion limit reached during LLC calculation.")
+            llc_by_product = {
+                product_id: min(llc, llc_recursion_limit)
+                for product_id, llc in llc_by_product.items()
+            }
+        to_update = {}
+        for product_id, llc in llc_by_product.items():
+            if current_llc[product_id] != llc:
+                to_update.setdefault(llc, []).append(product_id)
+        for llc, product_ids in to_update.items():
+            self.env["product.product"].browse(product_ids).write({"llc": llc})
+        mrp_lowest_llc = max(llc_by_product.values(), default=0) + 1
+        log_msg = "Low level codes computed - Nbr. levels: {} - Nbr. updated: {}"
+        logger.info(
+            log_msg.format(mrp_lowest_llc, sum(len(ids) for ids in to_update.values()))
+        )
         logger.info("End low level code calculation")
         return mrp_lowest_llc
 
@@ -395,29 +562,52 @@ class MultiLevelMrp(models.TransientModel):
         return True
 
     @api.model
-    def _init_mrp_move_from_stock_move(self, product_mrp_area):
+    def _get_stock_moves_by_product_mrp_area(self, product_mrp_areas):
+        """Return the open incoming and outgoing stock moves of each product
+        MRP area.
+
+        The domains of the product MRP areas sharing the same locations are
+        combined, giving one query per direction and batch of them. The moves
+        found are then dispatched to the product MRP areas by product.
+        """
+        moves_by_product_mrp_area = {
+            product_mrp_area: {"in": [], "out": []}
+            for product_mrp_area in product_mrp_areas
+        }
         move_obj = self.env["stock.move"]
-        mrp_move_obj = self.env["mrp.move"]
-        in_domain = product_mrp_area._in_stock_moves_domain()
-        in_moves = move_obj.search(in_domain)
-        out_domain = product_mrp_area._out_stock_moves_domain()
-        out_moves = move_obj.search(out_domain)
+        for group in product_mrp_areas._group_by_locations().values():
+            for ids in split_every(STOCK_MOVE_DOMAIN_BATCH_SIZE, group.ids):
+                batch = group.browse(ids)
+                by_product = defaultdict(list)
+                for product_mrp_area in batch:
+                    by_product[product_mrp_area.product_id.id].append(product_mrp_area)
+                for direction, domains in (
+                    ("in", [rec._in_stock_moves_domain() for rec in batch]),
+                    ("out", [rec._out_stock_moves_domain() for rec in batch]),
+                ):
+                    for move in move_obj.search(expression.OR(domains)):
+                        for product_mrp_area in by_product[move.product_id.id]:
+                            moves_by_product_mrp_area[product_mrp_area][
+                                direction
+                            ].append(move)
+        return moves_by_product_mrp_area
+
+    @api.model
+    def _init_mrp_move_from_stock_move(self, product_mrp_areas):
+        moves_by_product_mrp_area = self._get_stock_moves_by_product_mrp_area(
+            product_mrp_areas
+        )
         move_vals = []
-        if in_moves:
-            for move in in_moves:
-                move_data = self._prepare_mrp_move_data_from_stock_move(
-                    product_mrp_area, move, direction="in"
-                )
-                if move_data:
-                    move_vals.append(move_data)
-        if out_moves:
-            for move in out_moves:
-                move_data = self._prepare_mrp_move_data_from_stock_move(
-                    product_mrp_area, move, direction="out"
-                )
-                if move_data:
-                    move_vals.append(move_data)
-        mrp_move_obj.create(move_vals)
+        for product_mrp_area in product_mrp_areas:
+            moves = moves_by_product_mrp_area[product_mrp_area]
+            for direction in ("in", "out"):
+                for move in moves[direction]:
+                    move_data = self._prepare_mrp_move_data_from_stock_move(
+                        product_mrp_area, move, direction=direction
+                    )
+                    if move_data:
+                        move_vals.append(move_data)
+        self.env["mrp.move"].create(move_vals)
         return True
 
     @api.model
@@ -445,54 +635,70 @@ class MultiLevelMrp(models.TransientModel):
         }
 
     @api.model
-    def _init_mrp_move_from_purchase_order(self, product_mrp_area):
-        location_ids = product_mrp_area._get_locations()
-        picking_types = self.env["stock.picking.type"].search(
-            [("default_location_dest_id", "child_of", location_ids.ids)]
-        )
-        picking_type_ids = [ptype.id for ptype in picking_types]
-        orders = self.env["purchase.order"].search(
-            [
-                ("picking_type_id", "in", picking_type_ids),
-                ("state", "in", ["draft", "sent", "to approve"]),
-            ]
-        )
-        po_lines = self.env["purchase.order.line"].search(
-            [
-                ("order_id", "in", orders.ids),
-                ("product_qty", ">", 0.0),
-                ("product_id", "=", product_mrp_area.product_id.id),
-            ]
-        )
-
+    def _init_mrp_move_from_purchase_order(self, product_mrp_areas):
         mrp_move_vals = []
-        for line in po_lines:
-            mrp_move_data = self._prepare_mrp_move_data_from_purchase_order(
-                line, product_mrp_area
+        grouped = product_mrp_areas._group_by_locations()
+        for location_ids, group in grouped.items():
+            picking_types = self.env["stock.picking.type"].search(
+                [("default_location_dest_id", "child_of", location_ids)]
+            )
+            orders = self.env["purchase.order"].search(
+                [
+                    ("picking_type_id", "in", picking_types.ids),
+                    ("state", "in", ["draft", "sent", "to approve"]),
+                ]
             )
-            mrp_move_vals.append(mrp_move_data)
+            po_lines = self.env["purchase.order.line"].search(
+                [
+                    ("order_id", "in", orders.ids),
+                    ("product_qty", ">", 0.0),
+                    ("product_id", "in", group.mapped("product_id").ids),
+                ]
+            )
+            lines_by_product = defaultdict(list)
+            for line in po_lines:
+                lines_by_product[line.product_id.id].append(line)
+            for product_mrp_area in group:
+                for line in lines_by_product[product_mrp_area.product_id.id]:
+                    mrp_move_vals.append(
+                        self._prepare_mrp_move_data_from_purchase_order(
+                            line, product_mrp_area
+                        )
+                    )
         if mrp_move_vals:
             self.env["mrp.move"].create(mrp_move_vals)
 
     @api.model
     def _get_product_mrp_area_from_product_and_area(self, product, mrp_area):
-        return self.env["product.mrp.area"].search(
+        tier_buffer = self.env.context.get("mrp_llc_tier_buffer")
+        key = (product.id, mrp_area.id)
+        if tier_buffer is not None and key in tier_buffer.product_mrp_areas:
+            return tier_buffer.product_mrp_areas[key]
+        product_mrp_area = self.env["product.mrp.area"].search(
             [("product_id", "=", product.id), ("mrp_area_id", "=", mrp_area.id)],
             limit=1,
         )
+        if tier_buffer is not None:
+            tier_buffer.product_mrp_areas[key] = product_mrp_area
+        return product_mrp_area
 
     @api.model
-    def _init_mrp_move(self, product_mrp_area):
-        self._init_mrp_move_from_forecast(product_mrp_area)
-        self._init_mrp_move_from_stock_move(product_mrp_area)
-        self._init_mrp_move_from_purchase_order(product_mrp_area)
+    def _init_mrp_move(self, product_mrp_areas):
+        """Create the MRP moves of the given product MRP areas.
+
+        Stock moves and purchase order lines are read for all of them at once
+        and their MRP moves created in one batch.
+        """
+        for product_mrp_area in product_mrp_areas:
+            self._init_mrp_move_from_forecast(product_mrp_area)
+        self._init_mrp_move_from_stock_move(product_mrp_areas)
+        self._init_mrp_move_from_purchase_order(product_mrp_areas)
 
     @api.model
     def _exclude_from_mrp(self, product, mrp_area):
         """To extend with various logic where needed."""
-        product_mrp_area = self.env["product.mrp.area"].search(
-            [("product_id", "=", product.id), ("mrp_area_id", "=", mrp_area.id)],
-            limit=1,
+        product_mrp_area = self._get_product_mrp_area_from_product_and_area(
+            product, mrp_area
         )
         if not product_mrp_area:
             return True
@@ -508,17 +714,14 @@ class MultiLevelMrp(models.TransientModel):
         )
         init_counter = 0
         for mrp_area in mrp_areas:
-            for product_mrp_area in product_mrp_areas.filtered(
+            to_init = product_mrp_areas.filtered(
                 lambda a: a.mrp_area_id == mrp_area
-            ):
-                if self._exclude_from_mrp(product_mrp_area.product_id, mrp_area):
-                    continue
-                init_counter += 1
-                log_msg = "MRP Init: {} - {} ".format(
-                    init_counter, product_mrp_area.display_name
-                )
-                logger.info(log_msg)
-                self._init_mrp_move(product_mrp_area)
+                and not self._exclude_from_mrp(a.product_id, mrp_area)
+            )
+            init_counter += len(to_init)
+            self._init_mrp_move(to_init)
+            log_msg = "MRP Init: {} - {} ".format(init_counter, mrp_area.display_name)
+            logger.info(log_msg)
         logger.info("End MRP initialisation")
 
     def _get_qty_to_order(self, product_mrp_area, date, move_qty, onhand):
@@ -723,27 +926,77 @@ class MultiLevelMrp(models.TransientModel):
         """Improve extensibility being able to exclude special moves."""
         return False
 
+    @api.model
+    def _mrp_calculation_product_mrp_area(self, product_mrp_area):
+        start = time.time()
+        if product_mrp_area.mrp_nbr_days == 0:
+            self._init_mrp_move_non_grouped_demand(product_mrp_area)
+        else:
+            self._init_mrp_move_grouped_demand(product_mrp_area)
+        timings = self.env.context.get("mrp_run_timings")
+        if timings is not None:
+            timings[product_mrp_area.id] = (
+                timings.get(product_mrp_area.id, 0.0) + time.time() - start
+            )
+
+    @api.model
+    def _use_llc_tier_calculation(self):
+        return str2bool(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_multi_level.llc_tier_calculation", "False")
+        )
+
+    @api.model
+    def _mrp_calculation_llc_tier(self, product_mrp_areas):
+        """Net a whole LLC tier of an area at once.
+
+        Moves, on-hand and supply methods of the tier are prefetched together
+        and the resulting planned orders and exploded demand are buffered and
+        created in one batch. Components always have a greater LLC than their
+        parents, so nothing created here is read back within the same tier.
+        """
+        product_mrp_areas.mapped("mrp_move_ids.mrp_qty")
+        product_mrp_areas.mapped("qty_available")
+        product_mrp_areas.mapped("supply_method")
+        tier_buffer = LlcTierBuffer()
+        this = self.with_context(mrp_llc_tier_buffer=tier_buffer)
+        for product_mrp_area in product_mrp_areas:
+            tier_buffer.product_mrp_areas[
+                (product_mrp_area.product_id.id, product_mrp_area.mrp_area_id.id)
+            ] = product_mrp_area
+        for product_mrp_area in product_mrp_areas:
+            this._mrp_calculation_product_mrp_area(product_mrp_area)
+        return tier_buffer.flush(self.env)
+
     @api.model
     def _mrp_calculation(self, mrp_lowest_llc, mrp_areas):
         logger.info("Start MRP calculation")
         product_mrp_area_obj = self.env["product.mrp.area"]
         counter = 0
+        llc_tier_calculation = self._use_llc_tier_calculation()
+        mrp_run = self._get_mrp_run()
         if not mrp_areas:
             mrp_areas = self.env["mrp.area"].search([])
         for mrp_area in mrp_areas:
             llc = 0
             while mrp_lowest_llc > llc:
-                product_mrp_areas = product_mrp_area_obj.search(
-                    [("product_id.llc", "=", llc), ("mrp_area_id", "=", mrp_area.id)]
-                )
-                llc += 1
+                with mrp_run._profile_phase("Calculation LLC %s" % llc):
+                    product_mrp_areas = product_mrp_area_obj.search(
+                        [
+                            ("product_id.llc", "=", llc),
+                            ("mrp_area_id", "=", mrp_area.id),
+                        ]
+                    )
+                    llc += 1
 
-                for product_mrp_area in product_mrp_areas:
-                    if product_mrp_area.mrp_nbr_days == 0:
-                        self._init_mrp_move_non_grouped_demand(product_mrp_area)
-                    else:
-                        self._init_mrp_move_grouped_demand(product_mrp_area)
-                    counter += 1
+                    if llc_tier_calculation:
+                        self._mrp_calculation_llc_tier(product_mrp_areas)
+                        counter += len(product_mrp_areas)
+                        continue
+                    for product_mrp_area in product_mrp_areas:
+                        self._mrp_calculation_product_mrp_area(product_mrp_area)
+                        counter += 1
 
             log_msg = "MRP Calculation LLC {} Finished - Nbr. products: {}".format(
                 llc - 1, counter
@@ -753,40 +1006,50 @@ class MultiLevelMrp(models.TransientModel):
         logger.info("Enb MRP calculation")
 
     @api.model
-    def _get_demand_groups(self, product_mrp_area):
+    def _get_demand_groups(self, product_mrp_areas):
         query = """
-            SELECT mrp_date, sum(mrp_qty)
+            SELECT product_mrp_area_id, mrp_date, sum(mrp_qty)
             FROM mrp_move
-            WHERE product_mrp_area_id = %(mrp_product)s
+            WHERE product_mrp_area_id IN %(mrp_products)s
             AND mrp_type = 'd'
-            GROUP BY mrp_date
+            GROUP BY product_mrp_area_id, mrp_date
         """
-        params = {"mrp_product": product_mrp_area.id}
+        params = {"mrp_products": tuple(product_mrp_areas.ids)}
         return query, params
 
     @api.model
-    def _get_supply_groups(self, product_mrp_area):
+    def _get_supply_groups(self, product_mrp_areas):
         query = """
-                SELECT mrp_date, sum(mrp_qty)
+                SELECT product_mrp_area_id, mrp_date, sum(mrp_qty)
                 FROM mrp_move
-                WHERE product_mrp_area_id = %(mrp_product)s
+                WHERE product_mrp_area_id IN %(mrp_products)s
                 AND mrp_type = 's'
-                GROUP BY mrp_date
+                GROUP BY product_mrp_area_id, mrp_date
             """
-        params = {"mrp_product": product_mrp_area.id}
+        params = {"mrp_products": tuple(product_mrp_areas.ids)}
         return query, params
 
     @api.model
-    def _get_planned_order_groups(self, product_mrp_area):
+    def _get_planned_order_groups(self, product_mrp_areas):
         query = """
-            SELECT due_date, sum(mrp_qty)
+            SELECT product_mrp_area_id, due_date, sum(mrp_qty)
             FROM mrp_planned_order
-            WHERE product_mrp_area_id = %(mrp_product)s
-            GROUP BY due_date
+            WHERE product_mrp_area_id IN %(mrp_products)s
+            GROUP BY product_mrp_area_id, due_date
         """
-        params = {"mrp_product": product_mrp_area.id}
+        params = {"mrp_products": tuple(product_mrp_areas.ids)}
         return query, params
 
+    @api.model
+    def _read_qty_by_date(self, query, params):
+        """Return the quantities of a grouping query by product MRP area and
+        date."""
+        self.env.cr.execute(query, params)
+        qty_by_date = defaultdict(dict)
+        for product_mrp_area_id, mrp_date, qty in self.env.cr.fetchall():
+            qty_by_date[product_mrp_area_id][mrp_date] = qty
+        return qty_by_date
+
     @api.model
     def _prepare_mrp_inventory_data(
         self,
@@ -815,63 +1078,64 @@ class MultiLevelMrp(models.TransientModel):
         return mrp_inventory_data, running_availability, on_hand_qty
 
     @api.model
-    def _init_mrp_inventory(self, product_mrp_area):
-        mrp_move_obj = self.env["mrp.move"]
-        planned_order_obj = self.env["mrp.planned.order"]
-        # Read Demand
-        demand_qty_by_date = {}
-        query, params = self._get_demand_groups(product_mrp_area)
-        self.env.cr.execute(query, params)
-        for mrp_date, qty in self.env.cr.fetchall():
-            demand_qty_by_date[mrp_date] = qty
-        # Read Supply
-        supply_qty_by_date = {}
-        query, params = self._get_supply_groups(product_mrp_area)
-        self.env.cr.execute(query, params)
-        for mrp_date, qty in self.env.cr.fetchall():
-            supply_qty_by_date[mrp_date] = qty
-        # Read planned orders:
-        planned_qty_by_date = {}
-        query, params = self._get_planned_order_groups(product_mrp_area)
-        self.env.cr.execute(query, params)
-        for mrp_date, qty in self.env.cr.fetchall():
-            planned_qty_by_date[mrp_date] = qty
-        # Dates
-        moves_dates = mrp_move_obj.search(
-            [("product_mrp_area_id", "=", product_mrp_area.id)], order="mrp_date"
-        ).mapped("mrp_date")
-        action_dates = planned_order_obj.search(
-            [("product_mrp_area_id", "=", product_mrp_area.id)], order="due_date"
-        ).mapped("due_date")
-        mrp_dates = set(moves_dates + action_dates)
-        on_hand_qty = product_mrp_area.qty_available
-        running_availability = on_hand_qty
+    def _init_mrp_inventory(self, product_mrp_areas):
+        """Build the time-phased inventory of the given product MRP areas.
+
+        Demand, supply and planned quantities are read with one query each
+        for all of them, and the inventory records are created at once,
+        already linked to the planned orders due on their date.
+        """
+        if not product_mrp_areas:
+            return self.env["mrp.inventory"]
+        self.env["mrp.move"].flush()
+        self.env["mrp.planned.order"].flush()
+        demand = self._read_qty_by_date(*self._get_demand_groups(product_mrp_areas))
+        supply = self._read_qty_by_date(*self._get_supply_groups(product_mrp_areas))
+        planned = self._read_qty_by_date(
+            *self._get_planned_order_groups(product_mrp_areas)
+        )
+        planned_orders = self.env["mrp.planned.order"].search_read(
+            [("product_mrp_area_id", "in", product_mrp_areas.ids)],
+            ["product_mrp_area_id", "due_date"],
+            load=False,
+        )
+        planned_order_ids = defaultdict(list)
+        for order in planned_orders:
+            key = (order["product_mrp_area_id"], order["due_date"])
+            planned_order_ids[key].append(order["id"])
         mrp_inventory_vals = []
-        for mdt in sorted(mrp_dates):
-            (
-                mrp_inventory_data,
-                running_availability,
-                on_hand_qty,
-            ) = self._prepare_mrp_inventory_data(
-                product_mrp_area,
-                mdt,
-                on_hand_qty,
-                running_availability,
-                demand_qty_by_date,
-                supply_qty_by_date,
-                planned_qty_by_date,
+        for product_mrp_area in product_mrp_areas:
+            demand_qty_by_date = demand[product_mrp_area.id]
+            supply_qty_by_date = supply[product_mrp_area.id]
+            planned_qty_by_date = planned[product_mrp_area.id]
+            mrp_dates = (
+                set(demand_qty_by_date)
+                | set(supply_qty_by_date)
+                | set(planned_qty_by_date)
             )
-            mrp_inventory_vals.append(mrp_inventory_data)
-        if mrp_inventory_vals:
-            mrp_invs = self.env["mrp.inventory"].create(mrp_inventory_vals)
-            planned_orders = planned_order_obj.search(
-                [("product_mrp_area_id", "=", product_mrp_area.id)]
-            )
-            # attach planned orders to inventory
-            for po in planned_orders:
-                invs = mrp_invs.filtered(lambda i: i.date == po.due_date)
-                if invs:
-                    po.mrp_inventory_id = invs[0]
+            on_hand_qty = product_mrp_area.qty_available
+            running_availability = on_hand_qty
+            for mdt in sorted(mrp_dates):
+                (
+                    mrp_inventory_data,
+                    running_availability,
+                    on_hand_qty,
+                ) = self._prepare_mrp_inventory_data(
+                    product_mrp_area,
+                    mdt,
+                    on_hand_qty,
+                    running_availability,
+                    demand_qty_by_date,
+                    supply_qty_by_date,
+                    planned_qty_by_date,
+                )
+                order_ids = planned_order_ids.get((product_mrp_area.id, mdt))
+                if order_ids:
+                    mrp_inventory_data["planned_order_ids"] = [
+                        (4, order_id) for order_id in order_ids
+                    ]
+                mrp_inventory_vals.append(mrp_inventory_data)
+        return self.env["mrp.inventory"].create(mrp_inventory_vals)
 
     @api.model
     def _mrp_final_process(self, mrp_areas):
@@ -880,28 +1144,229 @@ class MultiLevelMrp(models.TransientModel):
         if mrp_areas:
             domain += [("mrp_area_id", "in", mrp_areas.ids)]
         product_mrp_area_ids = self.env["product.mrp.area"].search(domain)
+        self._mrp_final_process_product_mrp_areas(product_mrp_area_ids)
+        logger.info("End MRP final process")
 
-        for product_mrp_area in product_mrp_area_ids:
-            # Build the time-phased inventory
-            # Condition "supply_method == phantom" is not added in _exclude_from_mrp
-            # because this function is also used to filter the explosion.
-            if (
-                self._exclude_from_mrp(
-                    product_mrp_area.product_id, product_mrp_area.mrp_area_id
-                )
-                or product_mrp_area.supply_method == "phantom"
-            ):
+    @api.model
+    def _mrp_final_process_product_mrp_areas(self, product_mrp_areas):
+        # Condition "supply_method == phantom" is not added in _exclude_from_mrp
+        # because this function is also used to filter the explosion.
+        product_mrp_areas = product_mrp_areas.filtered(
+            lambda r: r.supply_method != "phantom"
+            and not self._exclude_from_mrp(r.product_id, r.mrp_area_id)
+        )
+        # Build the time-phased inventory
+        for ids in split_every(MRP_INVENTORY_BATCH_SIZE, product_mrp_areas.ids):
+            self._init_mrp_inventory(self.env["product.mrp.area"].browse(ids))
+
+    @api.model
+    def _get_mrp_parallel_workers(self, mrp_areas):
+        """Number of worker crons running the MRP areas, 0 or 1 meaning that
+        the areas are run one after the other in the current transaction."""
+        workers = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_multi_level.parallel_workers", 0)
+            or 0
+        )
+        return min(workers, len(mrp_areas))
+
+    @api.model
+    def _mrp_run_area(self, mrp_area, mrp_lowest_llc):
+        """Run the phases that only depend on the given area."""
+        mrp_run = self._get_mrp_run()
+        with mrp_run._profile_phase("Initialisation"):
+            self._mrp_initialisation(mrp_area)
+        self._mrp_calculation(mrp_lowest_llc, mrp_area)
+        with mrp_run._profile_phase("Final Process"):
+            self._mrp_final_process(mrp_area)
+
+    @api.model
+    def _mrp_run_area_jobs(self, mrp_lowest_llc, mrp_areas, workers):
+        """Queue a job for every area, run by worker crons in their own
+        process and transaction once the current transaction is committed."""
+        jobs = (
+            self.env["mrp.run.area"]
+            .sudo()
+            .create(
+                [
+                    {
+                        "run_id": self._get_mrp_run().id,
+                        "mrp_area_id": mrp_area.id,
+                        "lowest_llc": mrp_lowest_llc,
+                    }
+                    for mrp_area in mrp_areas
+                ]
+            )
+        )
+        crons = jobs._get_worker_crons(workers)
+        if len(crons) < workers:
+            logger.warning(
+                "Only %s MRP area worker crons are active for %s workers",
+                len(crons),
+                workers,
+            )
+        for cron in crons:
+            cron._trigger()
+        return jobs
+
+    @api.model
+    def _get_exploded_demand(self, mrp_moves):
+        demand = {}
+        for move in mrp_moves:
+            key = (move.product_mrp_area_id.id, move.mrp_date)
+            demand[key] = demand.get(key, 0.0) + move.mrp_qty
+        return demand
+
+    @api.model
+    def _mrp_net_change_initialisation(self, product_mrp_areas):
+        """Rebuild the moves of the changed products, except the demand coming
+        from the explosion of their parents."""
+        with mute_logger("odoo.models.unlink"):
+            self.env["mrp.move"].search(
+                [
+                    ("product_mrp_area_id", "in", product_mrp_areas.ids),
+                    ("exploded_from_id", "=", False),
+                ]
+            ).unlink()
+        self._init_mrp_move(
+            product_mrp_areas.filtered(
+                lambda r: r.mrp_applicable
+                and not self._exclude_from_mrp(r.product_id, r.mrp_area_id)
+            )
+        )
+
+    @api.model
+    def _mrp_net_change_calculation(self, product_mrp_areas):
+        """Net again the given products of a same LLC.
+
+        Return the product MRP areas whose exploded demand changed.
+        """
+        mrp_move_obj = self.env["mrp.move"]
+        domain = [("exploded_from_id", "in", product_mrp_areas.ids)]
+        old_moves = mrp_move_obj.search(domain)
+        old_demand = self._get_exploded_demand(old_moves)
+        with mute_logger("odoo.models.unlink"):
+            old_moves.unlink()
+            self.env["mrp.inventory"].search(
+                [("product_mrp_area_id", "in", product_mrp_areas.ids)]
+            ).unlink()
+            self.env["mrp.planned.order"].search(
+                [
+                    ("product_mrp_area_id", "in", product_mrp_areas.ids),
+                    ("fixed", "=", False),
+                ]
+            ).unlink()
+        if self._use_llc_tier_calculation():
+            self._mrp_calculation_llc_tier(product_mrp_areas)
+        else:
+            for product_mrp_area in product_mrp_areas:
+                self._mrp_calculation_product_mrp_area(product_mrp_area)
+        new_demand = self._get_exploded_demand(mrp_move_obj.search(domain))
+        pd = self.env["decimal.precision"].precision_get("Product Unit of Measure")
+        changed_ids = {
+            key[0]
+            for key in set(old_demand) | set(new_demand)
+            if not float_is_zero(
+                old_demand.get(key, 0.0) - new_demand.get(key, 0.0),
+                precision_digits=pd,
+            )
+        }
+        return self.env["product.mrp.area"].browse(changed_ids)
+
+    @api.model
+    def _mrp_net_change(self, mrp_areas):
+        logger.info("Start MRP net change")
+        mrp_run = self._get_mrp_run()
+        with mrp_run._profile_phase("Low Level Codes"):
+            mrp_lowest_llc = self._low_level_code_calculation()
+        with mrp_run._profile_phase("MRP Applicable"):
+            self._calculate_mrp_applicable(mrp_areas)
+        if not mrp_areas:
+            mrp_areas = self.env["mrp.area"].search([])
+        to_compute = self.env["product.mrp.area"].search(
+            [("mrp_area_id", "in", mrp_areas.ids), ("mrp_net_change", "=", True)]
+        )
+        changed = to_compute
+        with mrp_run._profile_phase("Initialisation"):
+            self._mrp_net_change_initialisation(to_compute)
+        computed = self.env["product.mrp.area"]
+        for llc in range(mrp_lowest_llc):
+            product_mrp_areas = to_compute.filtered(
+                lambda r, llc=llc: r.product_id.llc == llc
+            )
+            if not product_mrp_areas:
                 continue
-            self._init_mrp_inventory(product_mrp_area)
-        logger.info("End MRP final process")
+            with mrp_run._profile_phase("Calculation LLC %s" % llc):
+                to_compute |= self._mrp_net_change_calculation(product_mrp_areas)
+            computed |= product_mrp_areas
+            log_msg = "MRP Net Change LLC {} Finished - Nbr. products: {}".format(
+                llc, len(product_mrp_areas)
+            )
+            logger.info(log_msg)
+        with mrp_run._profile_phase("Final Process"):
+            self._mrp_final_process_product_mrp_areas(computed)
+        changed.write({"mrp_net_change": False})
+        logger.info("End MRP net change")
+
+    @api.model
+    def _get_mrp_run(self):
+        return self.env["mrp.run"].sudo().browse(self.env.context.get("mrp_run_id"))
+
+    @api.model
+    def _mrp_regeneration(self, mrp_areas):
+        mrp_run = self._get_mrp_run()
+        with mrp_run._profile_phase("Cleanup"):
+            self._mrp_cleanup(mrp_areas)
+        with mrp_run._profile_phase("Low Level Codes"):
+            mrp_lowest_llc = self._low_level_code_calculation()
+        with mrp_run._profile_phase("MRP Applicable"):
+            self._calculate_mrp_applicable(mrp_areas)
+        all_mrp_areas = mrp_areas or self.env["mrp.area"].search([])
+        workers = self._get_mrp_parallel_workers(all_mrp_areas)
+        if workers > 1:
+            with mrp_run._profile_phase("Area Jobs"):
+                self._mrp_run_area_jobs(mrp_lowest_llc, all_mrp_areas, workers)
+        else:
+            with mrp_run._profile_phase("Initialisation"):
+                self._mrp_initialisation(mrp_areas)
+            self._mrp_calculation(mrp_lowest_llc, mrp_areas)
+            with mrp_run._profile_phase("Final Process"):
+                self._mrp_final_process(mrp_areas)
+            self._mrp_clear_net_change(all_mrp_areas)
+
+    @api.model
+    def _mrp_clear_net_change(self, mrp_areas):
+        """The products of the areas are up to date after a full run."""
+        self.env["product.mrp.area"].search(
+            [("mrp_area_id", "in", mrp_areas.ids), ("mrp_net_change", "=", True)]
+        ).write({"mrp_net_change": False})
 
     def run_mrp_multi_level(self):
-        self._mrp_cleanup(self.mrp_area_ids)
-        mrp_lowest_llc = self._low_level_code_calculation()
-        self._calculate_mrp_applicable(self.mrp_area_ids)
-        self._mrp_initialisation(self.mrp_area_ids)
-        self._mrp_calculation(mrp_lowest_llc, self.mrp_area_ids)
-        self._mrp_final_process(self.mrp_area_ids)
+        # Set the net change flags queued in this transaction
+        self.env["product.product"]._mrp_flush_net_change()
+        mrp_run = (
+            self.env["mrp.run"]
+            .sudo()
+            .create(
+                {
+                    "date_start": fields.Datetime.now(),
+                    "user_id": self.env.uid,
+                    "mrp_area_ids": [(6, 0, self.mrp_area_ids.ids)],
+                    "net_change": self.net_change,
+                }
+            )
+        )
+        timings = {}
+        self = self.with_context(
+            mrp_supply_rule_cache={}, mrp_run_id=mrp_run.id, mrp_run_timings=timings
+        )
+        with mrp_run._profile_run():
+            if self.net_change:
+                self._mrp_net_change(self.mrp_area_ids)
+            else:
+                self._mrp_regeneration(self.mrp_area_ids)
+        mrp_run._save_product_timings(timings)
         # Open MRP inventory screen to show result if manually run:
         # Done as sudo to allow non-admin users to read the action.
         xmlid = "mrp_multi_level.mrp_inventory_action"
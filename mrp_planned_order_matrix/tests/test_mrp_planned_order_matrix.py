@@ -106,3 +106,37 @@ class TestMrpPlannedOrderMatrix(TestMrpMultiLevelCommon):
                 12,
                 "There should be 12 planned order records.",
             )
+
+    def test_02_mrp_planned_order_matrix_existing_orders(self):
+        """Existing fixed planned orders are loaded in their date range, and
+        updated or removed on validation."""
+        wiz = self.mrp_planned_order_matrix_wiz.create(
+            {
+                "date_start": "1943-01-01",
+                "date_end": "1943-12-31",
+                "date_range_type_id": self.drt_monthly.id,
+                "product_mrp_area_ids": [(6, 0, [self.product_mrp_area_1.id])],
+            }
+        )
+        sheet = self.env["mrp.planned.order.sheet"].browse(wiz.create_sheet()["res_id"])
+        sheet.line_ids.write({"product_qty": 1})
+        sheet.button_validate()
+        sheet = self.env["mrp.planned.order.sheet"].browse(wiz.create_sheet()["res_id"])
+        lines = sheet.line_ids.sorted(lambda line: line.date_range_id.date_start)
+        for line in lines:
+            self.assertEqual(line.product_qty, 1)
+            self.assertEqual(len(line.mrp_planned_order_ids), 1)
+            self.assertEqual(
+                line.mrp_planned_order_ids.due_date, line.date_range_id.date_start
+            )
+        removed_order = lines[0].mrp_planned_order_ids
+        updated_order = lines[1].mrp_planned_order_ids
+        lines[0].product_qty = 0
+        lines[1].product_qty = 2
+        sheet.button_validate()
+        self.assertFalse(removed_order.exists())
+        self.assertEqual(updated_order.mrp_qty, 2)
+        mrp_planned_orders = self.env["mrp.planned.order"].search(
+            [("product_mrp_area_id", "=", self.product_mrp_area_1.id)]
+        )
+        self.assertEqual(len(mrp_planned_orders), 11)
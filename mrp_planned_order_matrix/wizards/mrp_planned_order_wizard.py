@@ -1,6 +1,8 @@
 # Copyright 2020-21 ForgeFlow S.L. (https://www.forgeflow.com)
 # - Jordi Ballester Alomar <jordi.ballester@forgeflow.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from bisect import bisect_right
+from collections import defaultdict
 from datetime import timedelta
 from itertools import zip_longest
 
@@ -87,23 +89,13 @@ class MprPlannedOrderSheet(models.TransientModel):
         ranges = self._get_ranges()
         if not ranges:
             raise UserError(_("There are no date ranges created."))
+        order_ids = self._get_planned_order_ids_by_cell(ranges)
         lines = []
         for rec in self.product_mrp_area_ids:
             for d_range in ranges:
-                items = self.env["mrp.planned.order"].search(
-                    [
-                        ("product_mrp_area_id", "=", rec.id),
-                        ("due_date", ">=", d_range.date_start),
-                        ("due_date", "<", d_range.date_end),
-                        ("fixed", "=", True),
-                    ]
-                )
-                if items:
-                    uom_qty = sum(items.mapped("mrp_qty"))
-                    item_ids = items.ids
-                else:
-                    uom_qty = 0.0
-                    item_ids = []
+                item_ids = order_ids.get((rec.id, d_range.id), [])
+                items = self.env["mrp.planned.order"].browse(item_ids)
+                uom_qty = sum(items.mapped("mrp_qty"))
                 lines.append(
                     [
                         0,
@@ -136,6 +128,36 @@ class MprPlannedOrderSheet(models.TransientModel):
         ranges = self.env["date.range"].search(domain)
         return ranges
 
+    def _get_planned_order_ids_by_cell(self, ranges):
+        """Bucket the fixed planned orders of the sheet products into the
+        date ranges, with a single search.
+
+        :return: dict mapping (product MRP area id, date range id) to the
+            ids of the planned orders, in their default order
+        """
+        orders = self.env["mrp.planned.order"].search(
+            [
+                ("product_mrp_area_id", "in", self.product_mrp_area_ids.ids),
+                ("due_date", ">=", min(ranges.mapped("date_start"))),
+                ("due_date", "<", max(ranges.mapped("date_end"))),
+                ("fixed", "=", True),
+            ]
+        )
+        ranges = ranges.sorted(lambda r: (r.date_start, r.id))
+        starts = ranges.mapped("date_start")
+        allow_overlap = self.date_range_type_id.allow_overlap
+        order_ids = defaultdict(list)
+        for order in orders:
+            # Only the ranges starting before the due date can contain it
+            candidates = ranges[: bisect_right(starts, order.due_date)]
+            if not allow_overlap:
+                candidates = candidates[-1:]
+            for d_range in candidates:
+                if order.due_date < d_range.date_end:
+                    key = (order.product_mrp_area_id.id, d_range.id)
+                    order_ids[key].append(order.id)
+        return order_ids
+
     def _get_default_sheet_line(self, d_range, product_mrp, uom_qty, item_ids):
         name_y = "{} - {}".format(
             product_mrp.display_name, product_mrp.product_id.uom_id.name
@@ -175,6 +197,9 @@ class MprPlannedOrderSheet(models.TransientModel):
 
     def button_validate(self):
         res_ids = []
+        to_create = []
+        to_unlink = []
+        to_update = defaultdict(list)
         for line in self.line_ids:
             quantities = []
             qty_to_order = line.product_qty
@@ -187,11 +212,9 @@ class MprPlannedOrderSheet(models.TransientModel):
                 quantities, line.mrp_planned_order_ids
             ):
                 if not proposed:
-                    current.unlink()
+                    to_unlink.append(current.id)
                 elif not current:
-                    data = self._prepare_planned_order_data(line, proposed)
-                    item = self.env["mrp.planned.order"].create(data)
-                    res_ids.append(item.id)
+                    to_create.append(self._prepare_planned_order_data(line, proposed))
                 elif (
                     float_compare(
                         proposed, current.mrp_qty, precision_rounding=rounding
@@ -200,8 +223,13 @@ class MprPlannedOrderSheet(models.TransientModel):
                 ):
                     res_ids.append(current.id)
                 else:
-                    current.mrp_qty = proposed
+                    to_update[proposed].append(current.id)
                     res_ids.append(current.id)
+        planned_orders = self.env["mrp.planned.order"]
+        planned_orders.browse(to_unlink).unlink()
+        for qty, order_ids in to_update.items():
+            planned_orders.browse(order_ids).write({"mrp_qty": qty})
+        res_ids += planned_orders.create(to_create).ids
 
         res = {
             "domain": [("id", "in", res_ids)],
@@ -3,7 +3,7 @@
 
 {
     "name": "Production By-Product Cost Share",
-    "version": "14.0.1.0.0",
+    "version": "14.0.1.0.1",
     "category": "MRP",
     "author": "ForgeFlow, Odoo Community Association (OCA), Odoo S.A.",
     "website": "https://github.com/OCA/manufacture",
@@ -33,6 +33,21 @@ class MrpBom(models.Model):
                 )
         return res
 
+    def _get_unit_costs(self):
+        """Return the unit cost of the product of each BoM, in the product UoM
+        and net of the by-products cost share, as shown in the BoM structure
+        report. The sub-BoMs shared by these BoMs are priced only once."""
+        report = self.env["report.mrp.report_bom_structure"]._with_price_cache()
+        costs = {}
+        for bom in self:
+            product = bom.product_id or bom.product_tmpl_id.product_variant_id
+            price = report._get_price(bom, 1, product)
+            price -= report._get_byproducts_price(bom, price)
+            costs[bom.id] = bom.product_uom_id._compute_price(
+                price / bom.product_qty, product.uom_id
+            )
+        return costs
+
 
 class MrpByProduct(models.Model):
     _inherit = "mrp.bom.byproduct"
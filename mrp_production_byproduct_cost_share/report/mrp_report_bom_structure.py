@@ -1,10 +1,23 @@
 # Copyright 2023 ForgeFlow S.L. (https://www.forgeflow.com)
 # License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl-3.0).
 
+import functools
+
 from odoo import _, api, models
 from odoo.tools import float_round
 
 
+def with_price_cache(method):
+    """Run the report method with the ``bom_price_cache`` of the report
+    request, creating it on the first call."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return method(self._with_price_cache(), *args, **kwargs)
+
+    return wrapper
+
+
 class ReportBomStructure(models.AbstractModel):
     _inherit = "report.mrp.report_bom_structure"
 
@@ -21,6 +34,15 @@ class ReportBomStructure(models.AbstractModel):
             "mrp_production_byproduct_cost_share.report_mrp_byproduct_line"
         )._render({"data": values})
 
+    @api.model
+    def _with_price_cache(self):
+        """Share the prices of the sub-BoMs computed during a report request,
+        each (BoM, factor, product) is priced only once."""
+        if "bom_price_cache" in self.env.context:
+            return self
+        return self.with_context(bom_price_cache={})
+
+    @with_price_cache
     def _get_bom(
         self, bom_id=False, product_id=False, line_qty=False, line_id=False, level=False
     ):
@@ -39,6 +61,7 @@ class ReportBomStructure(models.AbstractModel):
         )
         return res
 
+    @with_price_cache
     def _get_bom_lines(self, bom, bom_quantity, product, line_id, level):
         components, total = super()._get_bom_lines(
             bom, bom_quantity, product, line_id, level
@@ -54,18 +77,20 @@ class ReportBomStructure(models.AbstractModel):
                     )
                     / line.child_bom_id.product_qty
                 )
+                # Already priced by super, read from the cache
                 sub_total = self._get_price(line.child_bom_id, factor, line.product_id)
-                byproduct_cost_share = sum(
-                    line.child_bom_id.byproduct_ids.mapped("cost_share")
-                )
-                if byproduct_cost_share:
-                    sub_total_byproducts = float_round(
-                        sub_total * byproduct_cost_share / 100,
-                        precision_rounding=0.0001,
-                    )
-                    total -= sub_total_byproducts
+                total -= self._get_byproducts_price(line.child_bom_id, sub_total)
         return components, total
 
+    def _get_byproducts_price(self, bom, price):
+        """Return the part of `price` going to the by-products of `bom`."""
+        byproduct_cost_share = sum(bom.byproduct_ids.mapped("cost_share"))
+        if not byproduct_cost_share:
+            return 0
+        return float_round(
+            price * byproduct_cost_share / 100, precision_rounding=0.0001
+        )
+
     def _get_byproducts_lines(self, bom, bom_quantity, level, total):
         byproducts = []
         byproduct_cost_portion = 0
@@ -98,7 +123,12 @@ class ReportBomStructure(models.AbstractModel):
             )
         return byproducts, byproduct_cost_portion
 
+    @with_price_cache
     def _get_price(self, bom, factor, product):
+        cache = self.env.context["bom_price_cache"]
+        key = (bom.id, factor, product.id)
+        if key in cache:
+            return cache[key]
         price = super()._get_price(bom, factor, product)
         for line in bom.bom_line_ids:
             if line._skip_bom_line(product):
@@ -110,20 +140,15 @@ class ReportBomStructure(models.AbstractModel):
                     )
                     / line.child_bom_id.product_qty
                 )
+                # Already priced by super, read from the cache
                 sub_price = self._get_price(line.child_bom_id, qty, line.product_id)
-                byproduct_cost_share = sum(
-                    line.child_bom_id.byproduct_ids.mapped("cost_share")
-                )
-                if byproduct_cost_share:
-                    sub_price_byproducts = float_round(
-                        sub_price * byproduct_cost_share / 100,
-                        precision_rounding=0.0001,
-                    )
-                    price -= sub_price_byproducts
+                price -= self._get_byproducts_price(line.child_bom_id, sub_price)
+        cache[key] = price
         return price
 
     # pylint: disable=W0102
     # flake8: noqa:B006
+    @with_price_cache
     def _get_pdf_line(
         self, bom_id, product_id=False, qty=1, child_bom_ids=[], unfolded=False
     ):
@@ -89,3 +89,35 @@ class TestProductionByProductCostShare(common.TransactionCase):
             15,
             "After computing price from BoM price should be 15",
         )
+
+    def test_02_report_and_unit_costs(self):
+        """Test the report price of a sub-BoM with by-products"""
+        product_d = self.env["product.product"].create(
+            {"name": "Product D", "type": "product"}
+        )
+        bom_d = self.MrpBom.create(
+            {
+                "product_tmpl_id": product_d.product_tmpl_id.id,
+                "product_qty": 2.0,
+                "type": "normal",
+                "product_uom_id": self.uom_unit_id,
+                "bom_line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product_a.id,
+                            "product_uom_id": self.uom_unit_id,
+                            "product_qty": 2,
+                        },
+                    )
+                ],
+            }
+        )
+        report = self.env["report.mrp.report_bom_structure"]
+        data = report._get_bom(bom_id=bom_d.id, product_id=product_d.id)
+        # 2 units of A, priced 100 each minus the 15% of the by-product
+        self.assertAlmostEqual(data["total"], 170)
+        costs = (bom_d | self.bom_byproduct)._get_unit_costs()
+        self.assertAlmostEqual(costs[self.bom_byproduct.id], 85)
+        self.assertAlmostEqual(costs[bom_d.id], 85)
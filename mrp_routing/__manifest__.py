@@ -2,7 +2,7 @@
 
 {
     "name": "MRP Routing",
-    "version": "14.0.1.0.1",
+    "version": "14.0.1.1.0",
     "category": "Manufacturing",
     "author": "ForgeFlow, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/manufacture",
@@ -14,6 +14,8 @@
     ],
     "data": [
         "data/sequence_data.xml",
+        "data/mrp_routing_cron.xml",
+        "data/system_parameter.xml",
         "security/ir.model.access.csv",
         "views/mrp_bom_view.xml",
         "views/mrp_routing_view.xml",
@@ -1,9 +1,17 @@
 # Copyright 2023 ForgeFlow S.L.
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
+import logging
+from collections import defaultdict
+
 from odoo import api, fields, models
+from odoo.tools import split_every
 
 from .mrp_routing_workcenter_template import FIELDS_TO_SYNC
 
+_logger = logging.getLogger(__name__)
+
+ROUTING_SYNC_BATCH_SIZE = 500
+
 
 class MrpBom(models.Model):
 
@@ -15,6 +23,13 @@ class MrpBom(models.Model):
         check_company=True,
         tracking=True,
     )
+    routing_sync_pending = fields.Boolean(
+        index=True,
+        copy=False,
+        readonly=True,
+        help="The operations of the BoM are waiting to be synced with the "
+        "operations of its routing, in background.",
+    )
 
     @api.onchange("routing_id")
     def onchange_routing_id(self):
@@ -36,3 +51,49 @@ class MrpBom(models.Model):
                 )
                 new_operations |= opeartion_model.new(operation_data)
             self.operation_ids = new_operations
+
+    def _sync_routing_operations(self):
+        """Create and remove the operations of the BoMs, so that they match
+        the operation templates of their routing.
+
+        The operations of all the BoMs are read at once, then the missing ones
+        are created and the other ones are removed in one batch each.
+        """
+        boms = self.filtered("routing_id")
+        routing_template_ids = {
+            routing.id: set(routing.operation_ids.ids) for routing in boms.routing_id
+        }
+        synced_template_ids = defaultdict(set)
+        to_unlink_ids = []
+        for operation in self.env["mrp.routing.workcenter"].search(
+            [("bom_id", "in", boms.ids)]
+        ):
+            bom = operation.bom_id
+            template_id = operation.template_id.id
+            if template_id in routing_template_ids[bom.routing_id.id]:
+                synced_template_ids[bom.id].add(template_id)
+            else:
+                to_unlink_ids.append(operation.id)
+        self.env["mrp.routing.workcenter"].browse(to_unlink_ids).unlink()
+        self.env["mrp.routing.workcenter.template"]._create_bom_operations(
+            [
+                (template, bom)
+                for bom in boms
+                for template in bom.routing_id.operation_ids
+                if template.id not in synced_template_ids[bom.id]
+            ]
+        )
+        self.filtered("routing_sync_pending").write({"routing_sync_pending": False})
+
+    @api.model
+    def _cron_sync_routing_operations(self, auto_commit=True):
+        """Sync the operations of the BoMs queued by their routing, committing
+        after each batch."""
+        boms = self.search([("routing_sync_pending", "=", True)])
+        done = 0
+        for bom_ids in split_every(ROUTING_SYNC_BATCH_SIZE, boms.ids):
+            self.browse(bom_ids)._sync_routing_operations()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            done += len(bom_ids)
+            _logger.info("Routing operations synced on %s/%s BoMs", done, len(boms))
@@ -33,6 +33,12 @@ class MrpRouting(models.Model):
         required=False,
         copy=False,
     )
+    sync_pending_count = fields.Integer(
+        compute="_compute_sync_pending_count",
+        string="BoMs Waiting for Sync",
+        help="Number of BoMs whose operations are still to be synced with "
+        "this routing in background.",
+    )
 
     @api.model
     def create(self, vals):
@@ -42,19 +48,32 @@ class MrpRouting(models.Model):
             )
         return super(MrpRouting, self).create(vals)
 
+    @api.model
+    def _get_sync_queue_threshold(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("mrp_routing.sync_queue_threshold", "0")
+        )
+
+    def _compute_sync_pending_count(self):
+        data = self.env["mrp.bom"].read_group(
+            [("routing_id", "in", self.ids), ("routing_sync_pending", "=", True)],
+            ["routing_id"],
+            ["routing_id"],
+        )
+        counts = {item["routing_id"][0]: item["routing_id_count"] for item in data}
+        for rec in self:
+            rec.sync_pending_count = counts.get(rec.id, 0)
+
     def write(self, values):
         res = super(MrpRouting, self).write(values)
         if "operation_ids" in values:
-            for rec in self:
-                for bom in rec.bom_ids:
-                    operations_not_synced = (
-                        rec.operation_ids - bom.operation_ids.mapped("template_id")
-                    )
-                    for operation in operations_not_synced:
-                        operation.create_operation_from_template(bom)
-                    operations_to_delete = bom.operation_ids.filtered(
-                        lambda x: x.template_id.id not in rec.operation_ids.ids
-                    )
-                    if operations_to_delete:
-                        operations_to_delete.unlink()
+            boms = self.bom_ids
+            threshold = self._get_sync_queue_threshold()
+            if threshold and len(boms) > threshold:
+                # Too many BoMs to sync them now, let the cron do it
+                boms.write({"routing_sync_pending": True})
+            else:
+                boms._sync_routing_operations()
         return res
@@ -85,48 +85,66 @@ class MrpRoutingWorkcenterTemplate(models.Model):
     )
     routing_ids = fields.Many2many(comodel_name="mrp.routing", string="Routings")
 
+    def _read_sync_values(self):
+        """Return the synced values of the templates, by template id."""
+        return {
+            data.pop("id"): data
+            for data in self.read(FIELDS_TO_SYNC, load="_classic_write")
+        }
+
+    def _prepare_bom_operation_values(self, bom, sync_values=None):
+        self.ensure_one()
+        if sync_values is None:
+            sync_values = self._read_sync_values()
+        operation_data = dict(sync_values[self.id])
+        operation_data.update(
+            {
+                "bom_id": bom.id,
+                "template_id": self.id,
+                "on_template_change": "sync",
+            }
+        )
+        return operation_data
+
     def create_operation_from_template(self, bom):
-        operation_model = self.env["mrp.routing.workcenter"]
-        for operation in self:
-            operation_data = operation.read(FIELDS_TO_SYNC, load="_classic_write")[0]
-            operation_data.update(
-                {
-                    "bom_id": bom.id,
-                    "template_id": operation.id,
-                    "on_template_change": "sync",
-                }
-            )
-            operation_model.create(operation_data)
+        return self._create_bom_operations([(operation, bom) for operation in self])
+
+    @api.model
+    def _create_bom_operations(self, template_boms):
+        """Create the operations of a list of (template, BoM) pairs at once."""
+        templates = self.browse({template.id for template, _bom in template_boms})
+        sync_values = templates._read_sync_values()
+        return self.env["mrp.routing.workcenter"].create(
+            [
+                template._prepare_bom_operation_values(bom, sync_values)
+                for template, bom in template_boms
+            ]
+        )
 
     @api.model_create_multi
     def create(self, values):
         recs = super(MrpRoutingWorkcenterTemplate, self).create(values)
-        for rec in self:
-            for bom in rec.mapped("routing_ids.bom_ids"):
-                rec.create_operation_from_template(bom)
+        self._create_bom_operations(
+            [(rec, bom) for rec in recs for bom in rec.routing_ids.bom_ids]
+        )
         return recs
 
     def unlink(self):
-        for rec in self:
-            synced_records = rec.operation_ids.filtered(
-                lambda x: x.on_template_change == "sync"
-            )
-            if synced_records:
-                synced_records.unlink()
+        self.operation_ids.filtered(lambda x: x.on_template_change == "sync").unlink()
         return super(MrpRoutingWorkcenterTemplate, self).unlink()
 
     def write(self, values):
         res = super(MrpRoutingWorkcenterTemplate, self).write(values)
-        current_field_changes = []
-        for field_name in FIELDS_TO_SYNC:
-            if field_name in values.keys():
-                current_field_changes.append(field_name)
-        if current_field_changes:
-            for rec in self.filtered(lambda x: x.operation_ids):
-                to_write_data = rec.read(current_field_changes)[0]
-                to_write = rec.operation_ids.filtered(
-                    lambda x: x.on_template_change == "sync"
-                )
-                if to_write:
-                    to_write.write(to_write_data)
+        to_write_data = {
+            field_name: values[field_name]
+            for field_name in FIELDS_TO_SYNC
+            if field_name in values
+        }
+        if to_write_data:
+            # All the templates got the same values, so do their operations
+            to_write = self.env["mrp.routing.workcenter"].search(
+                [("template_id", "in", self.ids), ("on_template_change", "=", "sync")]
+            )
+            if to_write:
+                to_write.write(to_write_data)
         return res
@@ -293,3 +293,41 @@ class TestRestrictLot(SavepointCase):
             self.operation_template_4.id,
             self.bom_2.operation_ids.mapped("template_id").ids,
         )
+
+    def test_05_sync_routing_changes_queued(self):
+        self.bom_1.routing_id = self.routing_1.id
+        self.bom_1.onchange_routing_id()
+        self.bom_2.routing_id = self.routing_1.id
+        self.bom_2.onchange_routing_id()
+        self.env["ir.config_parameter"].sudo().set_param(
+            "mrp_routing.sync_queue_threshold", "1"
+        )
+        self.routing_1.write({"operation_ids": [(3, self.operation_template_4.id)]})
+        boms = self.bom_1 + self.bom_2
+        self.assertTrue(all(boms.mapped("routing_sync_pending")))
+        self.assertEqual(self.routing_1.sync_pending_count, 2)
+        self.assertIn(self.operation_template_4, boms.operation_ids.template_id)
+        self.bom_obj._cron_sync_routing_operations(auto_commit=False)
+        self.assertFalse(any(boms.mapped("routing_sync_pending")))
+        self.routing_1.invalidate_cache(["sync_pending_count"])
+        self.assertEqual(self.routing_1.sync_pending_count, 0)
+        for bom in boms:
+            self.assertEqual(
+                bom.operation_ids.template_id, self.routing_1.operation_ids
+            )
+
+    def test_06_new_template_on_routing(self):
+        self.bom_1.routing_id = self.routing_1.id
+        self.bom_1.onchange_routing_id()
+        template = self.routing_workcenter_template_obj.create(
+            {
+                "workcenter_id": self.workcenter_1.id,
+                "name": "Operation 5",
+                "routing_ids": [(4, self.routing_1.id)],
+            }
+        )
+        operation = self.bom_1.operation_ids.filtered(
+            lambda x: x.template_id == template
+        )
+        self.assertEqual(operation.name, "Operation 5")
+        self.assertEqual(operation.on_template_change, "sync")
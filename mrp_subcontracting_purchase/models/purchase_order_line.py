@@ -6,36 +6,68 @@ class PurchaseOrderLine(models.Model):
 
     def _compute_qty_received(self):
         """Returns the quantity comes for moves"""
-        pol_obj = self.env["purchase.order.line"]
-        for line in self.filtered(
-            lambda l: l.qty_received_method == "stock_moves"
-            and l.move_ids.filtered(lambda m: m.state != "cancel")
-        ):
-            kit_bom = self.env["mrp.bom"]._bom_find(
-                product=line.product_id,
-                company_id=line.company_id.id,
-                bom_type="phantom",
-            )
-            if kit_bom:
-                pol_obj |= self._set_qty_received(kit_bom, line)
-        super(PurchaseOrderLine, self - pol_obj)._compute_qty_received()
+        lines = self.filtered(
+            lambda line: line.qty_received_method == "stock_moves"
+            and line.move_ids.filtered(lambda m: m.state != "cancel")
+        )
+        kit_boms = lines._get_kit_boms()
+        kit_lines = lines.filtered(lambda line: kit_boms.get(line.id))
+        kit_lines._set_kit_qty_received(kit_boms)
+        super(PurchaseOrderLine, self - kit_lines)._compute_qty_received()
+
+    def _get_kit_boms(self):
+        """Return the kit BoM of each line, by line id. The lines of the same
+        product and company share the result of ``mrp.bom._bom_find``."""
+        bom_model = self.env["mrp.bom"]
+        boms = {}
+        kit_boms = {}
+        for line in self.filtered("product_id"):
+            key = (line.product_id, line.company_id)
+            if key not in boms:
+                boms[key] = bom_model._bom_find(
+                    product=line.product_id,
+                    company_id=line.company_id.id,
+                    bom_type="phantom",
+                )
+            if boms[key]:
+                kit_boms[line.id] = boms[key]
+        return kit_boms
+
+    def _set_kit_qty_received(self, kit_boms):
+        """Set qty received of the kit lines, classifying the moves of all
+        the lines at once"""
+        incoming_move_ids = set()
+        outgoing_move_ids = set()
+        for move in self.move_ids:
+            if move.location_id.usage == "supplier":
+                if not move.origin_returned_move_id or move.to_refund:
+                    incoming_move_ids.add(move.id)
+            elif move.to_refund:
+                outgoing_move_ids.add(move.id)
+        filters = {
+            "incoming_moves": lambda m: m.id in incoming_move_ids,
+            "outgoing_moves": lambda m: m.id in outgoing_move_ids,
+        }
+        for line in self:
+            self._set_qty_received(kit_boms[line.id], line, filters=filters)
 
     @api.model
-    def _set_qty_received(self, kit_bom, line):
+    def _set_qty_received(self, kit_bom, line, filters=None):
         """Set qty received on the basis of the bom"""
         moves = line.move_ids.filtered(lambda m: m.state == "done" and not m.scrapped)
         order_qty = line.product_uom._compute_quantity(
             line.product_uom_qty, kit_bom.product_uom_id
         )
-        filters = {
-            "incoming_moves": lambda m: m.location_id.usage == "supplier"
-            and (
-                not m.origin_returned_move_id
-                or (m.origin_returned_move_id and m.to_refund)
-            ),
-            "outgoing_moves": lambda m: m.location_id.usage != "supplier"
-            and m.to_refund,
-        }
+        if filters is None:
+            filters = {
+                "incoming_moves": lambda m: m.location_id.usage == "supplier"
+                and (
+                    not m.origin_returned_move_id
+                    or (m.origin_returned_move_id and m.to_refund)
+                ),
+                "outgoing_moves": lambda m: m.location_id.usage != "supplier"
+                and m.to_refund,
+            }
         line.qty_received = moves._compute_kit_quantities(
             line.product_id, order_qty, kit_bom, filters
         )
@@ -1,5 +1,4 @@
 from collections import defaultdict
-from itertools import groupby
 
 from dateutil.relativedelta import relativedelta
 
@@ -24,8 +23,10 @@ class StockPicking(models.Model):
                 dates not valid, ...).
                 Go on the product form and complete the list of vendors."""
         )
-        for procurement, rule in procurements:
-            supplier = self._get_supplier(procurement)
+        suppliers = self._get_suppliers(
+            [procurement for procurement, _rule in procurements]
+        )
+        for (procurement, rule), supplier in zip(procurements, suppliers):
             if not supplier:
                 errors.append(
                     (procurement, message % (procurement.product_id.display_name))
@@ -54,9 +55,26 @@ class StockPicking(models.Model):
         return super()._prepare_purchase_order(company_id, origins, values)
 
     @api.model
-    def _get_supplier(self, procurement):
+    def _get_suppliers(self, procurements):
+        """Return the valid supplier of each procurement. The sellers of all
+        the products are read at once, and the same seller selection is only
+        done once."""
+        products = self.env["product.product"].browse(
+            {procurement.product_id.id for procurement in procurements}
+        )
+        products.mapped("seller_ids.name.active")
+        cache = {}
+        return [
+            self._get_supplier(procurement, cache=cache) for procurement in procurements
+        ]
+
+    @api.model
+    def _get_supplier(self, procurement, cache=None):
         """Return valid supplier"""
+        cache = {} if cache is None else cache
         supplier = False
+        product = procurement.product_id
+        company = procurement.company_id
         # Get the schedule date in order to find a valid seller
         procurement_date_planned = fields.Datetime.from_string(
             procurement.values["date_planned"]
@@ -69,27 +87,77 @@ class StockPicking(models.Model):
         ):
             supplier = procurement.values["orderpoint_id"].supplier_id
         else:
-            supplier = procurement.product_id.with_company(
-                procurement.company_id.id
-            )._select_seller(
-                partner_id=procurement.values.get("supplierinfo_name"),
-                quantity=procurement.product_qty,
-                date=procurement_date_planned.date(),
-                uom_id=procurement.product_uom,
+            key = (
+                product.id,
+                company.id,
+                procurement.values.get("supplierinfo_name"),
+                procurement.product_qty,
+                procurement_date_planned.date(),
+                procurement.product_uom.id,
             )
+            if key not in cache:
+                cache[key] = product.with_company(company.id)._select_seller(
+                    partner_id=procurement.values.get("supplierinfo_name"),
+                    quantity=procurement.product_qty,
+                    date=procurement_date_planned.date(),
+                    uom_id=procurement.product_uom,
+                )
+            supplier = cache[key]
         # Fall back on a supplier for which no price may be defined.
         # Not ideal, but better than blocking the user.
-        supplier = (
-            supplier
-            or procurement.product_id._prepare_sellers(False).filtered(
-                lambda s: not s.company_id or s.company_id == procurement.company_id
-            )[:1]
-        )
+        if not supplier:
+            key = (product.id, company.id)
+            if key not in cache:
+                cache[key] = product._prepare_sellers(False).filtered(
+                    lambda s: not s.company_id or s.company_id == company
+                )[:1]
+            supplier = cache[key]
         return supplier
 
+    @api.model
+    def _get_candidate_po_lines(self, orders):
+        """Return the lines of the orders that procurements can be merged
+        into, by order and product id, reading the lines of all the orders
+        at once."""
+        po_lines = (
+            self.env["purchase.order.line"]
+            .sudo()
+            .search([("order_id", "in", orders.ids), ("display_type", "=", False)])
+        )
+        line_ids = defaultdict(list)
+        for po_line in po_lines:
+            if po_line.product_uom == po_line.product_id.uom_po_id:
+                line_ids[po_line.order_id.id, po_line.product_id.id].append(po_line.id)
+        return {key: po_lines.browse(ids) for key, ids in line_ids.items()}
+
+    @api.model
+    def _merge_line_procurements(self, procurements):
+        """Merge the procurements matching the same PO line into a single one,
+        in the purchase unit of measure of the product"""
+        if len(procurements) == 1:
+            return procurements[0]
+        procurement = procurements[0]
+        uom = procurement.product_id.uom_po_id
+        move_dests = self.env["stock.move"]
+        values = dict(procurement.values)
+        for line_procurement in procurements:
+            move_dests |= line_procurement.values.get("move_dest_ids") or move_dests
+            if line_procurement.values.get("orderpoint_id"):
+                values["orderpoint_id"] = line_procurement.values["orderpoint_id"]
+        values["move_dest_ids"] = move_dests
+        return procurement._replace(
+            product_qty=sum(
+                p.product_uom._compute_quantity(p.product_qty, uom)
+                for p in procurements
+            ),
+            product_uom=uom,
+            values=values,
+        )
+
     @api.model
     def _create_po_not_exist(self, procurements_by_po_domain):
         pol_obj = self.env["purchase.order.line"]
+        orders_procurements = []
         for domain, procurements_rules in procurements_by_po_domain.items():
             # Get the procurements for the current domain.
             # Get the rules for the current domain. Their only use is to create
@@ -100,24 +168,64 @@ class StockPicking(models.Model):
             po = self._check_po_exists(domain, procurements, rules, company_id)
             procurements_to_merge = self._get_procurements_to_merge(procurements)
             procurements = self._merge_procurements(procurements_to_merge)
-            po_lines_by_product = {}
-            grouped_po_lines = groupby(
-                po.order_line.filtered(
-                    lambda l: not l.display_type
-                    and l.product_uom == l.product_id.uom_po_id
-                ).sorted(lambda l: l.product_id.id),
-                key=lambda l: l.product_id.id,
+            orders_procurements.append((po, company_id, procurements))
+        candidate_po_lines = self._get_candidate_po_lines(
+            self.env["purchase.order"].concat(
+                *[po for po, _c, _p in orders_procurements]
             )
-            for product, po_lines in grouped_po_lines:
-                po_lines_by_product[product] = pol_obj.concat(*list(po_lines))
-            po_line_values = []
+        )
+        po_line_values = []
+        for po, company_id, procurements in orders_procurements:
+            procurements_by_line = defaultdict(list)
+            date_order = po.date_order
             for procurement in procurements:
-                po_lines = po_lines_by_product.get(procurement.product_id.id, pol_obj)
+                po_lines = candidate_po_lines.get(
+                    (po.id, procurement.product_id.id), pol_obj
+                )
                 po_line = po_lines._find_candidate(*procurement)
-
                 if po_line:
-                    # If the procurement can be merge in an existing line. Directly
-                    # write the new values on it.
+                    # If the procurement can be merged in an existing line,
+                    # update it along with the other procurements of the line.
+                    procurements_by_line[po_line].append(procurement)
+                    continue
+                if (
+                    float_compare(
+                        procurement.product_qty,
+                        0,
+                        precision_rounding=procurement.product_uom.rounding,
+                    )
+                    <= 0
+                ):
+                    # If procurement contains negative quantity,
+                    # don't create a new line that would contain negative qty
+                    continue
+                # If it does not exist a PO line for current procurement.
+                # Generate the create values for it and add it to a list in
+                # order to create it in batch.
+                po_line_values.append(
+                    pol_obj._prepare_purchase_order_line_from_procurement(
+                        procurement.product_id,
+                        procurement.product_qty,
+                        procurement.product_uom,
+                        procurement.company_id,
+                        procurement.values,
+                        po,
+                    )
+                )
+                # Check if we need to advance the order date for the new line
+                date_planned = procurement.values["date_planned"]
+                order_date_planned = date_planned - relativedelta(
+                    days=procurement.values["supplier"].delay
+                )
+                if fields.Date.to_date(order_date_planned) < fields.Date.to_date(
+                    date_order
+                ):
+                    date_order = order_date_planned
+            po_vals = {}
+            if procurements_by_line:
+                po_vals["order_line"] = []
+                for po_line, line_procurements in procurements_by_line.items():
+                    procurement = self._merge_line_procurements(line_procurements)
                     vals = self._update_purchase_order_line(
                         procurement.product_id,
                         procurement.product_qty,
@@ -126,42 +234,12 @@ class StockPicking(models.Model):
                         procurement.values,
                         po_line,
                     )
-                    po_line.write(vals)
-                else:
-                    if (
-                        float_compare(
-                            procurement.product_qty,
-                            0,
-                            precision_rounding=procurement.product_uom.rounding,
-                        )
-                        <= 0
-                    ):
-                        # If procurement contains negative quantity,
-                        # don't create a new line that would contain negative qty
-                        continue
-                    # If it does not exist a PO line for current procurement.
-                    # Generate the create values for it and add it to a list in
-                    # order to create it in batch.
-                    po_line_values.append(
-                        pol_obj._prepare_purchase_order_line_from_procurement(
-                            procurement.product_id,
-                            procurement.product_qty,
-                            procurement.product_uom,
-                            procurement.company_id,
-                            procurement.values,
-                            po,
-                        )
-                    )
-                    # Check if we need to advance the order date for the new line
-                    date_planned = procurement.values["date_planned"]
-                    order_date_planned = date_planned - relativedelta(
-                        days=procurement.values["supplier"].delay
-                    )
-                    if fields.Date.to_date(order_date_planned) < fields.Date.to_date(
-                        po.date_order
-                    ):
-                        po.date_order = order_date_planned
-            pol_obj.sudo().create(po_line_values)
+                    po_vals["order_line"].append((1, po_line.id, vals))
+            if date_order != po.date_order:
+                po_vals["date_order"] = date_order
+            if po_vals:
+                po.write(po_vals)
+        pol_obj.sudo().create(po_line_values)
 
     @api.model
     def _check_po_exists(self, domain, procurements, rules, company_id):
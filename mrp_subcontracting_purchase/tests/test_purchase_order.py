@@ -1,3 +1,4 @@
+from odoo import fields
 from odoo.tests import Form
 
 from odoo.addons.mrp_subcontracting.tests.common import TestMrpSubcontractingCommon
@@ -540,3 +541,93 @@ class TestPurchaseOrder(TestMrpSubcontractingCommon):
         po.button_confirm()
         po.order_line._compute_qty_received()
         self.assertFalse(po.order_line.qty_received)
+
+    def test_run_buy_merge_procurements(self):
+        """Procurements of the same product are merged into one PO line,
+        including the ones run on an existing PO"""
+        vendor = self.env["res.partner"].create({"name": "Vendor"})
+        self.env["product.supplierinfo"].create(
+            {
+                "product_tmpl_id": self.comp2.product_tmpl_id.id,
+                "name": vendor.id,
+                "price": 10,
+            }
+        )
+        self.comp2.write(
+            {"route_ids": [(4, self.env.ref("purchase_stock.route_warehouse0_buy").id)]}
+        )
+        warehouse = self.env.ref("stock.warehouse0")
+        procurement_group = self.env["procurement.group"]
+
+        def procurement(qty):
+            return procurement_group.Procurement(
+                self.comp2,
+                qty,
+                self.comp2.uom_id,
+                warehouse.lot_stock_id,
+                "Test",
+                "TEST",
+                self.env.company,
+                {"warehouse_id": warehouse, "date_planned": fields.Datetime.now()},
+            )
+
+        procurement_group.run([procurement(1)])
+        po_line = self.env["purchase.order.line"].search(
+            [("product_id", "=", self.comp2.id), ("partner_id", "=", vendor.id)]
+        )
+        self.assertEqual(po_line.product_qty, 1)
+        procurement_group.run([procurement(2), procurement(3)])
+        po_lines = self.env["purchase.order.line"].search(
+            [("product_id", "=", self.comp2.id), ("partner_id", "=", vendor.id)]
+        )
+        self.assertEqual(po_lines, po_line)
+        self.assertEqual(po_line.product_qty, 6)
+        self.assertEqual(po_line.price_unit, 10)
+
+    def test_kit_qty_received(self):
+        """The kit BoM of each line is the one of _bom_find, and the received
+        quantities follow the kits"""
+        kit1, kit2, component = self.env["product.product"].create(
+            [
+                {"name": "Kit 1", "type": "consu"},
+                {"name": "Kit 2", "type": "consu"},
+                {"name": "Kit Component", "type": "product"},
+            ]
+        )
+        boms = self.env["mrp.bom"].create(
+            [
+                {
+                    "product_tmpl_id": kit.product_tmpl_id.id,
+                    "product_id": variant.id,
+                    "type": "phantom",
+                    "bom_line_ids": [
+                        (0, 0, {"product_id": component.id, "product_qty": qty})
+                    ],
+                }
+                for kit, variant, qty in [
+                    (kit1, False, 1),
+                    (kit1, kit1.id, 2),
+                    (kit2, False, 3),
+                ]
+            ]
+        )
+        po = Form(self.env["purchase.order"])
+        po.partner_id = self.subcontractor_partner1
+        for kit in kit1 + kit2:
+            with po.order_line.new() as po_line:
+                po_line.product_id = kit
+                po_line.product_qty = 2
+                po_line.price_unit = 10
+        po = po.save()
+        po.button_confirm()
+        line1, line2 = po.order_line
+        # The variant BoM of kit 1 prevails over its template BoM
+        self.assertEqual(
+            po.order_line._get_kit_boms(), {line1.id: boms[1], line2.id: boms[2]}
+        )
+        picking = po.picking_ids
+        for move in picking.move_lines:
+            move.quantity_done = move.product_uom_qty
+        picking._action_done()
+        self.assertEqual(line1.qty_received, 2)
+        self.assertEqual(line2.qty_received, 2)
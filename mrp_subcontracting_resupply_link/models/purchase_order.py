@@ -3,12 +3,14 @@
 
 from odoo import SUPERUSER_ID, _, api, fields, models
 
+RESUPPLY_MESSAGE_QUEUE = "mrp_subcontracting_resupply_link.resupply_message_post"
+
 
 class PurchaseOrder(models.Model):
     _inherit = "purchase.order"
 
     subcontracting_resupply_count = fields.Integer(
-        compute="_compute_subcontracting_resupply_ids",
+        compute="_compute_subcontracting_resupply_count",
         string="Resupply count",
         store=True,
     )
@@ -17,26 +19,15 @@ class PurchaseOrder(models.Model):
         column1="purchase_id",
         column2="picking_id",
         comodel_name="stock.picking",
-        compute="_compute_subcontracting_resupply_ids",
         string="Resupplys",
         copy=False,
-        store=True,
+        readonly=True,
     )
 
-    @api.depends("picking_ids")
-    def _compute_subcontracting_resupply_ids(self):
+    @api.depends("subcontracting_resupply_ids")
+    def _compute_subcontracting_resupply_count(self):
         for order in self:
-            pickings = False
-            order_pickings = order.picking_ids.filtered(
-                lambda x: x.state not in ("done", "cancel")
-            )
-            moves = order_pickings.move_lines.filtered(
-                lambda x: x.is_subcontract and x.move_orig_ids
-            )
-            if moves:
-                pickings = moves.mapped("move_orig_ids.production_id.picking_ids")
-            order.subcontracting_resupply_ids = pickings
-            order.subcontracting_resupply_count = len(pickings) if pickings else 0
+            order.subcontracting_resupply_count = len(order.subcontracting_resupply_ids)
 
     def button_confirm(self):
         _self = self.with_context(resupply_message_post=True)
@@ -44,12 +35,22 @@ class PurchaseOrder(models.Model):
 
     def _message_track_post_template(self, changes):
         """We need to override this function with the previously used context
-        so that the message appears after mail.tracking record (state = purchase)."""
+        so that the message appears after mail.tracking record (state = purchase).
+        The orders are queued, so that the messages of all the orders tracked
+        in the same flush are posted once, at commit."""
         res = super()._message_track_post_template(changes)
         if self.env.context.get("resupply_message_post") and changes == {"state"}:
-            self._resupply_message_post()
+            queue = self.env.cr.precommit.data.get(RESUPPLY_MESSAGE_QUEUE)
+            if queue is None:
+                queue = self.env.cr.precommit.data[RESUPPLY_MESSAGE_QUEUE] = set()
+                self.env.cr.precommit.add(self._resupply_message_post_queued)
+            queue.update(self.ids)
         return res
 
+    def _resupply_message_post_queued(self):
+        order_ids = self.env.cr.precommit.data.pop(RESUPPLY_MESSAGE_QUEUE, ())
+        self.browse(sorted(order_ids)).exists()._resupply_message_post()
+
     def _resupply_message_post(self):
         for order in self:
             for picking in order.subcontracting_resupply_ids:
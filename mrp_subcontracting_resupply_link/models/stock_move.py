@@ -0,0 +1,33 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html)
+
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    def _action_confirm(self, merge=True, merge_into=False):
+        moves = super()._action_confirm(merge=merge, merge_into=merge_into)
+        moves._link_subcontracting_resupply()
+        return moves
+
+    def _link_subcontracting_resupply(self):
+        """Link the purchase orders of the subcontracted moves to the resupply
+        pickings of the productions created for them, with one insert."""
+        links = set()
+        for move in self.filtered(lambda m: m.is_subcontract and m.purchase_line_id):
+            order = move.purchase_line_id.order_id
+            for picking in move.move_orig_ids.production_id.picking_ids:
+                links.add((order.id, picking.id))
+        if not links:
+            return
+        orders = self.env["purchase.order"].browse({link[0] for link in links})
+        orders.flush(["subcontracting_resupply_ids"])
+        self.env.cr.execute(
+            "INSERT INTO stock_picking_resupply (purchase_id, picking_id) VALUES "
+            + ", ".join(["%s"] * len(links))
+            + " ON CONFLICT DO NOTHING",
+            sorted(links),
+        )
+        orders.invalidate_cache(["subcontracting_resupply_ids"])
+        orders.modified(["subcontracting_resupply_ids"])
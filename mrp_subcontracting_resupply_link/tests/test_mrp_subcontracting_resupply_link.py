@@ -84,3 +84,29 @@ class TestMrpSubcontractingResupplyLink(TestMailCommon):
         new_messages = production.picking_ids.message_ids - picking_old_messages
         message = new_messages.filtered(lambda x: x.create_uid.id == SUPERUSER_ID)
         self.assertTrue(self.purchase_order.name in message.body)
+
+    def test_purchase_order_batch(self):
+        orders = self.purchase_order + self._create_purchase_order()
+        # The resupply messages are notes, notified to the note followers
+        follower = new_test_user(
+            self.env, login="test_follower", groups="purchase.group_purchase_user"
+        )
+        orders.message_subscribe(
+            partner_ids=follower.partner_id.ids,
+            subtype_ids=self.env.ref("mail.mt_note").ids,
+        )
+        orders.with_user(self.user).button_confirm()
+        old_messages = orders.message_ids
+        self.flush_tracking()
+        for order in orders:
+            production = order.order_line.move_ids.move_orig_ids.production_id
+            self.assertEqual(order.subcontracting_resupply_ids, production.picking_ids)
+            self.assertEqual(order.subcontracting_resupply_count, 1)
+            message = (order.message_ids - old_messages).filtered(
+                lambda x: x.create_uid.id == SUPERUSER_ID
+            )
+            self.assertTrue(production.picking_ids.name in message.body)
+            self.assertIn(follower.partner_id, message.notification_ids.res_partner_id)
+        # Linking the moves again does not duplicate the links
+        orders.order_line.move_ids._link_subcontracting_resupply()
+        self.assertEqual(orders.mapped("subcontracting_resupply_count"), [1, 1])
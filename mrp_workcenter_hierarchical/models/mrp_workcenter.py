@@ -36,42 +36,68 @@ class MrpWorkcenter(models.Model):
         store=True,
     )
 
+    hierarchy_capacity = fields.Float(
+        compute="_compute_hierarchy_load",
+        help="Capacity of the work center and of all its sub work centers.",
+    )
+    hierarchy_load = fields.Float(
+        compute="_compute_hierarchy_load",
+        string="Hierarchy Load (minutes)",
+        help="Expected duration of the open work orders of the work center "
+        "and of all its sub work centers.",
+    )
+
     def _get_parent_ids(self):
         self.ensure_one()
-        if self.parent_id:
-            ids = self.parent_id._get_parent_ids()
-            ids.append(self.parent_id.id)
-        else:
-            ids = []
-        return ids
+        return [int(x) for x in (self.parent_id.parent_path or "").split("/") if x]
 
-    @api.depends("parent_id.parent_id.parent_id.parent_id", "child_ids")
+    @api.depends("parent_id")
     def _compute_parent_level(self):
-        def get_next_level(parent_ids, workcenter):
-            return (
-                parent_ids
-                and parent_ids.pop(0)
-                or (workcenter.child_ids and workcenter.id or workcenter.parent_id.id)
-            )
-
+        """The levels are the ancestors of the work center, from the root,
+        except its direct parent."""
         for workcenter in self:
-            parent_ids = workcenter._get_parent_ids()
-            exclude_ids = [workcenter.id, workcenter.parent_id.id]
-            l_id = [False, False, False]
+            level_ids = workcenter._get_parent_ids()[:-1][:3]
+            level_ids += [False] * (3 - len(level_ids))
+            workcenter.parent_level_1_id = level_ids[0]
+            workcenter.parent_level_2_id = level_ids[1]
+            workcenter.parent_level_3_id = level_ids[2]
 
-            l_id[0] = get_next_level(parent_ids, workcenter)
-            workcenter.parent_level_1_id = (
-                l_id[0] if l_id[0] not in exclude_ids else False
+    def write(self, vals):
+        res = super().write(vals)
+        if "parent_id" in vals:
+            # The levels of the sub work centers depend on the moved parents
+            descendants = self.search(
+                [("id", "child_of", self.ids), ("id", "not in", self.ids)]
             )
-            exclude_ids.append(l_id[0])
+            for fname in (
+                "parent_level_1_id",
+                "parent_level_2_id",
+                "parent_level_3_id",
+            ):
+                self.env.add_to_compute(self._fields[fname], descendants)
+        return res
 
-            l_id[1] = get_next_level(parent_ids, workcenter)
-            workcenter.parent_level_2_id = (
-                l_id[1] if l_id[1] not in exclude_ids else False
-            )
-            exclude_ids.append(l_id[1])
-
-            l_id[2] = get_next_level(parent_ids, workcenter)
-            workcenter.parent_level_3_id = (
-                l_id[2] if l_id[2] not in exclude_ids else False
-            )
+    def _compute_hierarchy_load(self):
+        workcenters = self._origin
+        descendants = self.search([("id", "child_of", workcenters.ids)])
+        load_data = self.env["mrp.workorder"].read_group(
+            [
+                ("workcenter_id", "in", descendants.ids),
+                ("state", "not in", ("done", "cancel")),
+            ],
+            ["workcenter_id", "duration_expected"],
+            ["workcenter_id"],
+        )
+        loads = {
+            data["workcenter_id"][0]: data["duration_expected"] for data in load_data
+        }
+        capacity = dict.fromkeys(workcenters.ids, 0.0)
+        load = dict.fromkeys(workcenters.ids, 0.0)
+        for descendant in descendants:
+            for ancestor_id in descendant.parent_path.split("/")[:-1]:
+                if int(ancestor_id) in capacity:
+                    capacity[int(ancestor_id)] += descendant.capacity
+                    load[int(ancestor_id)] += loads.get(descendant.id, 0.0)
+        for workcenter in self:
+            workcenter.hierarchy_capacity = capacity.get(workcenter._origin.id, 0.0)
+            workcenter.hierarchy_load = load.get(workcenter._origin.id, 0.0)
@@ -16,3 +16,26 @@ class ComputeParentLevel(TransactionCase):
         assert workcenter.parent_level_3_id == get_record("workc_123")
         assert workcenter.parent_level_2_id == get_record("workc_1234")
         assert workcenter.parent_level_1_id == get_record("workc_12345")
+
+    def test_move_parent_workcenter(self):
+        def get_record(string):
+            return self.env.ref("mrp_workcenter_hierarchical.%s" % string)
+
+        root = self.env["mrp.workcenter"].create({"name": "root"})
+        get_record("workc_123").write({"parent_id": root.id})
+        workcenter = get_record("workc_1")
+        assert workcenter.parent_level_1_id == root
+        assert workcenter.parent_level_2_id == get_record("workc_123")
+        assert not workcenter.parent_level_3_id
+
+    def test_hierarchy_capacity(self):
+        def get_record(string):
+            return self.env.ref("mrp_workcenter_hierarchical.%s" % string)
+
+        (get_record("workc_12") + get_record("workc_1")).write({"capacity": 2})
+        workcenters = get_record("workc_123") + get_record("workc_12")
+        workcenters.invalidate_cache(["hierarchy_capacity"])
+        assert get_record("workc_123").hierarchy_capacity == 5
+        assert get_record("workc_12").hierarchy_capacity == 4
+        assert get_record("workc_1").hierarchy_capacity == 2
+        assert get_record("workc_1").hierarchy_load == 0
@@ -4,7 +4,7 @@
 
 from odoo import api, fields, models
 
-from odoo.addons.quality_control_oca.models.qc_trigger_line import _filter_trigger_lines
+from odoo.addons.quality_control_oca.models.qc_trigger_line import TriggerLineIndex
 
 
 class MrpProduction(models.Model):
@@ -38,18 +38,14 @@ class MrpProduction(models.Model):
         )
         if new_done_moves:
             qc_trigger = self.env.ref("quality_control_mrp_oca.qc_trigger_mrp")
-        for move in new_done_moves:
-            trigger_lines = set()
-            for model in [
-                "qc.trigger.product_category_line",
-                "qc.trigger.product_template_line",
-                "qc.trigger.product_line",
-            ]:
-                trigger_lines = trigger_lines.union(
-                    self.env[model].get_trigger_line_for_product(
+            index = TriggerLineIndex(qc_trigger, new_done_moves.product_id)
+            inspection_model._make_inspections(
+                [
+                    (move, trigger_line)
+                    for move in new_done_moves
+                    for trigger_line in index.get_trigger_lines(
                         qc_trigger, move.product_id
                     )
-                )
-            for trigger_line in _filter_trigger_lines(trigger_lines):
-                inspection_model._make_inspection(move, trigger_line)
+                ]
+            )
         return res
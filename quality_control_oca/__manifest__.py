@@ -7,7 +7,7 @@
 
 {
     "name": "Quality Control OCA",
-    "version": "14.0.1.4.2",
+    "version": "14.0.1.5.1",
     "category": "Quality Control",
     "license": "AGPL-3",
     "summary": "Generic infrastructure for quality tests.",
@@ -21,6 +21,7 @@
         "wizard/qc_test_wizard_view.xml",
         "views/qc_menus.xml",
         "views/qc_inspection_view.xml",
+        "wizard/qc_inspection_result_import_view.xml",
         "views/qc_test_category_view.xml",
         "views/qc_test_view.xml",
         "views/qc_trigger_view.xml",
@@ -5,8 +5,12 @@
 # Copyright 2017 Simone Rubino - Agile Business Group
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import _, api, exceptions, fields, models
-from odoo.tools import formatLang
+from odoo.tools import formatLang, split_every
+
+RESULT_IMPORT_BATCH_SIZE = 1000
 
 
 class QcInspection(models.Model):
@@ -190,16 +194,36 @@ class QcInspection(models.Model):
             )
 
     def _make_inspection(self, object_ref, trigger_line):
-        """Overridable hook method for creating inspection from test.
+        """Create the inspection of an object from a test, through
+        ``_make_inspections``.
         :param object_ref: Object instance
         :param trigger_line: Trigger line instance
         :return: Inspection object
         """
-        inspection = self.create(
-            self._prepare_inspection_header(object_ref, trigger_line)
+        return self._make_inspections([(object_ref, trigger_line)])
+
+    def _make_inspections(self, object_trigger_lines):
+        """Overridable hook method for creating the inspections of several
+        objects from their tests. The headers are created at once, then the
+        lines of the test are set with ``set_test``.
+        :param object_trigger_lines: List of (object instance, trigger line)
+        :return: Inspection objects
+        """
+        inspections = self.create(
+            [
+                self._prepare_inspection_header(object_ref, trigger_line)
+                for object_ref, trigger_line in object_trigger_lines
+            ]
         )
-        inspection.set_test(trigger_line)
-        return inspection
+        inspections_by_line = {}
+        for inspection, (_object_ref, trigger_line) in zip(
+            inspections, object_trigger_lines
+        ):
+            inspections_by_line.setdefault(trigger_line, self.browse())
+            inspections_by_line[trigger_line] |= inspection
+        for trigger_line, line_inspections in inspections_by_line.items():
+            line_inspections.set_test(trigger_line)
+        return inspections
 
     def _prepare_inspection_header(self, object_ref, trigger_line):
         """Overridable hook method for preparing inspection header.
@@ -266,22 +290,27 @@ class QcInspectionLine(models.Model):
         "possible_ql_values",
     )
     def _compute_quality_test_check(self):
+        # Convert the values with one ratio per (UoM, test UoM) pair
+        ratios = {}
         for insp_line in self:
             if insp_line.question_type == "qualitative":
                 insp_line.success = insp_line.qualitative_value.ok
-            else:
-                if insp_line.uom_id.id == insp_line.test_uom_id.id:
-                    amount = insp_line.quantitative_value
-                else:
-                    amount = self.env["uom.uom"]._compute_quantity(
-                        insp_line.quantitative_value, insp_line.test_uom_id.id
+                continue
+            amount = insp_line.quantitative_value
+            if insp_line.uom_id and insp_line.uom_id != insp_line.test_uom_id:
+                key = (insp_line.uom_id, insp_line.test_uom_id)
+                if key not in ratios:
+                    ratios[key] = insp_line.uom_id._compute_quantity(
+                        1.0, insp_line.test_uom_id, round=False, raise_if_failure=False
                     )
-                insp_line.success = insp_line.max_value >= amount >= insp_line.min_value
+                amount *= ratios[key]
+            insp_line.success = insp_line.max_value >= amount >= insp_line.min_value
 
     @api.depends(
         "possible_ql_values", "min_value", "max_value", "test_uom_id", "question_type"
     )
     def _compute_valid_values(self):
+        show_uom = self.env.user.has_group("uom.group_uom")
         for insp_line in self:
             if insp_line.question_type == "qualitative":
                 insp_line.valid_values = ", ".join(
@@ -292,7 +321,7 @@ class QcInspectionLine(models.Model):
                     formatLang(self.env, insp_line.min_value),
                     formatLang(self.env, insp_line.max_value),
                 )
-                if self.env.ref("uom.group_uom") in self.env.user.groups_id:
+                if show_uom:
                     insp_line.valid_values += " %s" % insp_line.test_uom_id.name
 
     inspection_id = fields.Many2one(
@@ -360,3 +389,112 @@ class QcInspectionLine(models.Model):
     success = fields.Boolean(
         compute="_compute_quality_test_check", string="Success?", store=True
     )
+
+    @api.model
+    def _import_quantitative_values(self, results):
+        """Write the values of quantitative questions of many inspections.
+        :param results: List of dicts with the inspection number
+        ("inspection"), the question ("question"), the value ("value") and
+        optionally the name of its UoM ("uom").
+        :return: Inspection lines written
+        """
+        inspection_names = {str(result.get("inspection")) for result in results}
+        lines = self.search(
+            [
+                ("inspection_id.name", "in", list(inspection_names)),
+                ("question_type", "=", "quantitative"),
+            ]
+        )
+        lines_by_key = defaultdict(lambda: self.browse())
+        for line in lines:
+            lines_by_key[(line.inspection_id.name, line.name)] |= line
+        uom_names = {result["uom"] for result in results if result.get("uom")}
+        uoms_by_name = {
+            uom.name: uom
+            for uom in self.env["uom.uom"].search([("name", "in", list(uom_names))])
+        }
+        errors = []
+        rows_by_line = {}
+        line_ids_by_vals = defaultdict(list)
+        for row, result in enumerate(results, 1):
+            inspection_name = str(result.get("inspection"))
+            line = lines_by_key.get((inspection_name, result.get("question")))
+            if line and len(line) > 1:
+                errors.append(
+                    _(
+                        "Row %(row)s: inspection %(inspection)s has several "
+                        "quantitative questions %(question)s.",
+                        row=row,
+                        question=result.get("question"),
+                        inspection=inspection_name,
+                    )
+                )
+                continue
+            if not line:
+                errors.append(
+                    _(
+                        "Row %(row)s: no quantitative question %(question)s in "
+                        "inspection %(inspection)s.",
+                        row=row,
+                        question=result.get("question"),
+                        inspection=inspection_name,
+                    )
+                )
+                continue
+            if line.id in rows_by_line:
+                errors.append(
+                    _(
+                        "Row %(row)s: question %(question)s of inspection "
+                        "%(inspection)s is already in row %(other_row)s.",
+                        row=row,
+                        question=line.name,
+                        inspection=inspection_name,
+                        other_row=rows_by_line[line.id],
+                    )
+                )
+                continue
+            rows_by_line[line.id] = row
+            if line.inspection_id.state != "ready":
+                errors.append(
+                    _(
+                        "Row %(row)s: inspection %(inspection)s is not ready.",
+                        row=row,
+                        inspection=inspection_name,
+                    )
+                )
+                continue
+            try:
+                vals = {"quantitative_value": float(result.get("value"))}
+            except (TypeError, ValueError):
+                errors.append(
+                    _(
+                        "Row %(row)s: %(value)s is not a number.",
+                        row=row,
+                        value=result.get("value"),
+                    )
+                )
+                continue
+            if result.get("uom"):
+                uom = uoms_by_name.get(result["uom"])
+                if not uom or uom.category_id != line.test_uom_category:
+                    errors.append(
+                        _(
+                            "Row %(row)s: %(uom)s is not a valid unit of measure "
+                            "for question %(question)s.",
+                            row=row,
+                            uom=result["uom"],
+                            question=line.name,
+                        )
+                    )
+                    continue
+                vals["uom_id"] = uom.id
+            line_ids_by_vals[tuple(sorted(vals.items()))].append(line.id)
+        if errors:
+            raise exceptions.UserError("\n".join(errors))
+        # The lines with the same values are written at once, and the success
+        # of the lines and inspections is computed once per batch
+        for vals, line_ids in line_ids_by_vals.items():
+            for batch_ids in split_every(RESULT_IMPORT_BATCH_SIZE, line_ids):
+                self.browse(batch_ids).write(dict(vals))
+                self.flush()
+        return self.browse(list(rows_by_line))
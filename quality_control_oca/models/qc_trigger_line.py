@@ -5,19 +5,57 @@
 # Copyright 2017 Simone Rubino - Agile Business Group
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
+
+TRIGGER_LINE_MODELS = [
+    "qc.trigger.product_category_line",
+    "qc.trigger.product_template_line",
+    "qc.trigger.product_line",
+]
 
 
 def _filter_trigger_lines(trigger_lines):
     filtered_trigger_lines = []
-    unique_tests = []
+    unique_tests = set()
     for trigger_line in trigger_lines:
         if trigger_line.test not in unique_tests:
             filtered_trigger_lines.append(trigger_line)
-            unique_tests.append(trigger_line.test)
+            unique_tests.add(trigger_line.test)
     return filtered_trigger_lines
 
 
+class TriggerLineIndex:
+    """Trigger lines of some triggers for a batch of products.
+
+    Each trigger line model reads its lines once for all the products with
+    ``_get_trigger_index_lines``, and resolves the lines of a product with
+    ``_get_trigger_lines_from_index``. These are the hooks to override, as
+    ``get_trigger_line_for_product`` goes through them for a single product.
+    The lines of each (trigger, product, partner) are resolved only once.
+    """
+
+    def __init__(self, triggers, products):
+        self.line_models = [triggers.env[model] for model in TRIGGER_LINE_MODELS]
+        self.lines = {
+            line_model._name: line_model._get_trigger_index_lines(triggers, products)
+            for line_model in self.line_models
+        }
+        self.resolved = {}
+
+    def get_trigger_lines(self, trigger, product, partner=False):
+        """Return the trigger lines of the given product and trigger, with one
+        line per test."""
+        key = (trigger.id, product.id, partner and partner.commercial_partner_id.id)
+        if key not in self.resolved:
+            trigger_lines = []
+            for line_model in self.line_models:
+                trigger_lines += line_model._get_trigger_lines_from_index(
+                    self.lines[line_model._name], trigger, product, partner=partner
+                )
+            self.resolved[key] = _filter_trigger_lines(trigger_lines)
+        return self.resolved[key]
+
+
 class QcTriggerLine(models.AbstractModel):
     _name = "qc.trigger.line"
     _inherit = "mail.thread"
@@ -41,12 +79,67 @@ class QcTriggerLine(models.AbstractModel):
     )
 
     def get_trigger_line_for_product(self, trigger, product, partner=False):
-        """Overridable method for getting trigger_line associated to a product.
-        Each inherited model will complete this module to make the search by
-        product, template or category.
+        """Get the trigger lines associated to a product. They are resolved
+        with the same hooks as ``TriggerLineIndex``, where each inherited model
+        makes the search by product, template or category.
         :param trigger: Trigger instance.
         :param product: Product instance.
         :return: Set of trigger_lines that matches to the given product and
         trigger.
         """
-        return set()
+        lines = self._get_trigger_index_lines(trigger, product)
+        return set(
+            self._get_trigger_lines_from_index(lines, trigger, product, partner=partner)
+        )
+
+    @api.model
+    def _get_trigger_index_lines(self, triggers, products):
+        """Overridable hook searching the trigger lines of these triggers that
+        can apply to these products.
+        :return: Dict of lists of trigger lines, by (trigger id, index key).
+        """
+        lines = {}
+        if self._abstract:
+            return lines
+        domain = self._get_trigger_index_domain(triggers, products)
+        for trigger_line in self.search(domain):
+            key = (trigger_line.trigger.id, trigger_line._get_trigger_index_key())
+            lines.setdefault(key, []).append(trigger_line)
+        return lines
+
+    @api.model
+    def _get_trigger_lines_from_index(self, lines, trigger, product, partner=False):
+        """Overridable hook returning the trigger lines of the given product
+        and trigger, among the ones of ``_get_trigger_index_lines``."""
+        trigger_lines = []
+        for index_key in self._get_trigger_index_product_keys(product):
+            trigger_lines += self._filter_trigger_index_lines(
+                lines.get((trigger.id, index_key), []), partner=partner
+            )
+        return trigger_lines
+
+    @api.model
+    def _get_trigger_index_domain(self, triggers, products):
+        """Domain of the trigger lines of these triggers that can apply to
+        these products."""
+        return [("trigger", "in", triggers.ids)]
+
+    def _get_trigger_index_key(self):
+        """Id of the record (product, template...) the line applies to."""
+        return False
+
+    @api.model
+    def _get_trigger_index_product_keys(self, product):
+        """Keys of the trigger lines applying to the given product, by
+        priority."""
+        return []
+
+    @api.model
+    def _filter_trigger_index_lines(self, trigger_lines, partner=False):
+        return [
+            trigger_line
+            for trigger_line in trigger_lines
+            if not trigger_line.partners
+            or not partner
+            or partner.commercial_partner_id in trigger_line.partners
+        ]
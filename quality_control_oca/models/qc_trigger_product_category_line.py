@@ -5,7 +5,7 @@
 # Copyright 2017 Simone Rubino - Agile Business Group
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class QcTriggerProductCategoryLine(models.Model):
@@ -15,20 +15,24 @@ class QcTriggerProductCategoryLine(models.Model):
 
     product_category = fields.Many2one(comodel_name="product.category")
 
-    def get_trigger_line_for_product(self, trigger, product, partner=False):
-        trigger_lines = super().get_trigger_line_for_product(
-            trigger, product, partner=partner
-        )
-        category = product.categ_id
-        while category:
-            for trigger_line in category.qc_triggers.filtered(
-                lambda r: r.trigger == trigger
-                and (
-                    not r.partners
-                    or not partner
-                    or partner.commercial_partner_id in r.partners
-                )
-            ):
-                trigger_lines.add(trigger_line)
-            category = category.parent_id
-        return trigger_lines
+    @api.model
+    def _get_trigger_index_domain(self, triggers, products):
+        category_ids = {
+            int(category_id)
+            for category in products.categ_id
+            for category_id in (category.parent_path or "").split("/")[:-1]
+        }
+        return super()._get_trigger_index_domain(triggers, products) + [
+            ("product_category", "in", list(category_ids))
+        ]
+
+    def _get_trigger_index_key(self):
+        return self.product_category.id
+
+    @api.model
+    def _get_trigger_index_product_keys(self, product):
+        # The category of the product first, then its parents
+        parent_path = product.categ_id.parent_path or ""
+        return [
+            int(category_id) for category_id in reversed(parent_path.split("/")[:-1])
+        ]
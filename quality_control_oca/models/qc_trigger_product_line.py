@@ -5,7 +5,7 @@
 # Copyright 2017 Simone Rubino - Agile Business Group
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class QcTriggerProductLine(models.Model):
@@ -15,18 +15,16 @@ class QcTriggerProductLine(models.Model):
 
     product = fields.Many2one(comodel_name="product.product")
 
-    def get_trigger_line_for_product(self, trigger, product, partner=False):
-        trigger_lines = super().get_trigger_line_for_product(
-            trigger, product, partner=partner
-        )
-        for trigger_line in product.qc_triggers.filtered(
-            lambda r: r.trigger == trigger
-            and (
-                not r.partners
-                or not partner
-                or partner.commercial_partner_id in r.partners
-            )
-            and r.test.active
-        ):
-            trigger_lines.add(trigger_line)
-        return trigger_lines
+    @api.model
+    def _get_trigger_index_domain(self, triggers, products):
+        return super()._get_trigger_index_domain(triggers, products) + [
+            ("product", "in", products.ids),
+            ("test.active", "=", True),
+        ]
+
+    def _get_trigger_index_key(self):
+        return self.product.id
+
+    @api.model
+    def _get_trigger_index_product_keys(self, product):
+        return [product.id]
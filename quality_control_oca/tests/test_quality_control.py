@@ -5,10 +5,14 @@
 # Copyright 2017 Simone Rubino - Agile Business Group
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import base64
+import json
+from unittest.mock import patch
+
 from odoo import exceptions
 from odoo.tests.common import TransactionCase
 
-from ..models.qc_trigger_line import _filter_trigger_lines
+from ..models.qc_trigger_line import TriggerLineIndex, _filter_trigger_lines
 
 
 class TestQualityControl(TransactionCase):
@@ -182,6 +186,173 @@ class TestQualityControl(TransactionCase):
                         ),
                     )
 
+    def test_trigger_line_index(self):
+        test2 = self.test.copy()
+        self.product.write(
+            {
+                "qc_triggers": [
+                    (0, 0, {"trigger": self.qc_trigger.id, "test": self.test.id})
+                ],
+            }
+        )
+        self.product.categ_id.write(
+            {
+                "qc_triggers": [
+                    (0, 0, {"trigger": self.qc_trigger.id, "test": self.test.id}),
+                    (0, 0, {"trigger": self.qc_trigger.id, "test": test2.id}),
+                ],
+            }
+        )
+        product2 = self.product.copy()
+        index = TriggerLineIndex(self.qc_trigger, self.product | product2)
+        trigger_lines = index.get_trigger_lines(self.qc_trigger, self.product)
+        self.assertEqual(len(trigger_lines), 2)
+        self.assertEqual({line.test for line in trigger_lines}, {self.test, test2})
+        trigger_lines2 = index.get_trigger_lines(self.qc_trigger, product2)
+        self.assertEqual(len(trigger_lines2), 2)
+        inspections = self.inspection_model._make_inspections(
+            [(self.product, line) for line in trigger_lines]
+            + [(product2, line) for line in trigger_lines2]
+        )
+        self.assertEqual(len(inspections), 4)
+        self.assertEqual(inspections.mapped("product_id"), self.product | product2)
+        for inspection in inspections:
+            self.assertEqual(inspection.state, "ready")
+            self.assertEqual(
+                len(inspection.inspection_lines), len(inspection.test.test_lines)
+            )
+
+    def test_trigger_line_single_product(self):
+        partner = self.env["res.partner"].create({"name": "Test Partner"})
+        self.product.write(
+            {
+                "qc_triggers": [
+                    (
+                        0,
+                        0,
+                        {
+                            "trigger": self.qc_trigger.id,
+                            "test": self.test.id,
+                            "partners": [(6, 0, partner.ids)],
+                        },
+                    )
+                ],
+            }
+        )
+        line_model = self.env["qc.trigger.product_line"]
+        self.assertEqual(
+            line_model.get_trigger_line_for_product(
+                self.qc_trigger, self.product, partner=partner
+            ),
+            set(self.product.qc_triggers),
+        )
+        other_partner = self.env["res.partner"].create({"name": "Other Partner"})
+        self.assertFalse(
+            line_model.get_trigger_line_for_product(
+                self.qc_trigger, self.product, partner=other_partner
+            )
+        )
+        index = TriggerLineIndex(self.qc_trigger, self.product)
+        self.assertEqual(
+            index.get_trigger_lines(self.qc_trigger, self.product, partner=partner),
+            list(self.product.qc_triggers),
+        )
+        # The lines of the test are set by set_test
+        with patch.object(
+            type(self.inspection_model),
+            "set_test",
+            autospec=True,
+            side_effect=type(self.inspection_model).set_test,
+        ) as set_test:
+            inspection = self.inspection_model._make_inspection(
+                self.product, self.product.qc_triggers
+            )
+        set_test.assert_called_once_with(inspection, self.product.qc_triggers)
+        self.assertEqual(len(inspection.inspection_lines), len(self.test.test_lines))
+
+    def test_import_results(self):
+        line = self.inspection1.inspection_lines.filtered(
+            lambda x: x.test_line == self.qn_question
+        )
+        value = (self.qn_question.min_value + self.qn_question.max_value) / 2
+        csv_data = "inspection,question,value\n{},{},{}\n".format(
+            self.inspection1.name, self.qn_question.name, value
+        )
+        wizard = self.env["qc.inspection.result.import"].create(
+            {
+                "data_file": base64.b64encode(csv_data.encode()),
+                "filename": "results.csv",
+            }
+        )
+        action = wizard.action_import()
+        self.assertEqual(action["domain"], [("id", "in", self.inspection1.ids)])
+        self.assertEqual(line.quantitative_value, value)
+        self.assertTrue(line.success)
+        json_data = json.dumps(
+            [
+                {
+                    "inspection": self.inspection1.name,
+                    "question": self.qn_question.name,
+                    "value": self.qn_question.max_value + 1,
+                }
+            ]
+        )
+        wizard = self.env["qc.inspection.result.import"].create(
+            {
+                "data_file": base64.b64encode(json_data.encode()),
+                "filename": "results.json",
+            }
+        )
+        wizard.action_import()
+        self.assertFalse(line.success)
+        self.assertFalse(self.inspection1.success)
+        with self.assertRaises(exceptions.UserError):
+            self.env["qc.inspection.line"]._import_quantitative_values(
+                [{"inspection": "wrong", "question": "wrong", "value": 1}]
+            )
+
+    def test_import_results_grouped(self):
+        line_model = self.env["qc.inspection.line"]
+        inspection2 = self.inspection_model.create(
+            {
+                "name": "Test Inspection 2",
+                "test": self.test.id,
+                "inspection_lines": self.inspection_model._prepare_inspection_lines(
+                    self.test
+                ),
+            }
+        )
+        inspection2.action_todo()
+        inspections = self.inspection1 | inspection2
+        lines = inspections.inspection_lines.filtered(
+            lambda x: x.test_line == self.qn_question
+        )
+        self.assertEqual(len(lines), 2)
+        value = (self.qn_question.min_value + self.qn_question.max_value) / 2
+        results = [
+            {"inspection": name, "question": self.qn_question.name, "value": value}
+            for name in inspections.mapped("name")
+        ]
+        write = type(line_model).write
+        written = []
+
+        def tracked_write(records, vals):
+            written.append(records)
+            return write(records, vals)
+
+        with patch.object(type(line_model), "write", tracked_write):
+            imported = line_model._import_quantitative_values(results)
+        self.assertEqual(imported, lines)
+        self.assertEqual(written, [lines])
+        self.assertEqual(lines.mapped("quantitative_value"), [value, value])
+        # A line cannot be imported twice
+        with self.assertRaises(exceptions.UserError):
+            line_model._import_quantitative_values(results + results[:1])
+        # Nor a question name shared by several lines of an inspection
+        lines[0].copy({"inspection_id": self.inspection1.id})
+        with self.assertRaises(exceptions.UserError):
+            line_model._import_quantitative_values(results[:1])
+
     def test_qc_inspection_not_draft_unlink(self):
         with self.assertRaises(exceptions.UserError):
             self.inspection1.unlink()
@@ -0,0 +1,46 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import base64
+import csv
+import io
+import json
+
+from odoo import _, exceptions, fields, models
+
+
+class QcInspectionResultImport(models.TransientModel):
+    """This wizard imports the measured values of the quantitative questions
+    of many inspections, from a CSV or JSON file. Each row gives the
+    inspection number, the question, the value and optionally its unit of
+    measure.
+    """
+
+    _name = "qc.inspection.result.import"
+    _description = "Import inspection results"
+
+    data_file = fields.Binary(string="File", required=True)
+    filename = fields.Char()
+
+    def _read_results(self):
+        content = base64.b64decode(self.data_file).decode("utf-8-sig")
+        if (self.filename or "").lower().endswith(".json"):
+            results = json.loads(content)
+            if not isinstance(results, list) or not all(
+                isinstance(result, dict) for result in results
+            ):
+                raise ValueError(_("A list of objects is expected."))
+            return results
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def action_import(self):
+        self.ensure_one()
+        try:
+            results = self._read_results()
+        except (ValueError, csv.Error) as e:
+            raise exceptions.UserError(_("The file could not be read: %s") % e) from e
+        lines = self.env["qc.inspection.line"]._import_quantitative_values(results)
+        action = self.env["ir.actions.actions"]._for_xml_id(
+            "quality_control_oca.action_qc_inspection"
+        )
+        action["domain"] = [("id", "in", lines.inspection_id.ids)]
+        return action
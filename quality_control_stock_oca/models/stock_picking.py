@@ -5,7 +5,10 @@
 
 from odoo import api, fields, models
 
-from odoo.addons.quality_control_oca.models.qc_trigger_line import _filter_trigger_lines
+from odoo.addons.quality_control_oca.models.qc_trigger_line import (
+    TriggerLineIndex,
+    _filter_trigger_lines,
+)
 
 
 class StockPicking(models.Model):
@@ -58,27 +61,29 @@ class StockPicking(models.Model):
 
     def _action_done(self):
         res = super()._action_done()
-        inspection_model = self.env["qc.inspection"].sudo()
-        qc_trigger = (
+        qc_triggers = (
             self.env["qc.trigger"]
             .sudo()
-            .search([("picking_type_id", "=", self.picking_type_id.id)])
+            .search([("picking_type_id", "in", self.picking_type_id.ids)])
         )
-        for operation in self.move_lines:
-            trigger_lines = set()
-            for model in [
-                "qc.trigger.product_category_line",
-                "qc.trigger.product_template_line",
-                "qc.trigger.product_line",
-            ]:
-                partner = self.partner_id if qc_trigger.partner_selectable else False
-                trigger_lines = trigger_lines.union(
-                    self.env[model]
-                    .sudo()
-                    .get_trigger_line_for_product(
-                        qc_trigger, operation.product_id.sudo(), partner=partner
+        if not qc_triggers:
+            return res
+        index = TriggerLineIndex(qc_triggers, self.move_lines.product_id.sudo())
+        object_trigger_lines = []
+        for picking in self:
+            picking_triggers = qc_triggers.filtered(
+                lambda t: t.picking_type_id == picking.picking_type_id
+            )
+            for operation in picking.move_lines:
+                trigger_lines = []
+                for qc_trigger in picking_triggers:
+                    partner = (
+                        picking.partner_id if qc_trigger.partner_selectable else False
+                    )
+                    trigger_lines += index.get_trigger_lines(
+                        qc_trigger, operation.product_id, partner=partner
                     )
-                )
-            for trigger_line in _filter_trigger_lines(trigger_lines):
-                inspection_model._make_inspection(operation, trigger_line)
+                for trigger_line in _filter_trigger_lines(trigger_lines):
+                    object_trigger_lines.append((operation, trigger_line))
+        self.env["qc.inspection"].sudo()._make_inspections(object_trigger_lines)
         return res
@@ -3,7 +3,7 @@
 
 {
     "name": "Repair Picking",
-    "version": "14.0.1.0.1",
+    "version": "14.0.1.0.2",
     "author": "ForgeFlow, Odoo Community Association (OCA)",
     "category": "Repair",
     "website": "https://github.com/OCA/manufacture",
@@ -35,15 +35,26 @@ class RepairOrder(models.Model):
         return res
 
     def _action_launch_stock_rule(self, repair_lines):
+        """Run the procurements of the given lines, of one or several repairs,
+        at once."""
+        warehouses = {}
+        procurements = []
         for line in repair_lines:
-            self._run_procurement_repair(line)
+            repair = line.repair_id
+            if repair.location_id not in warehouses:
+                warehouses[repair.location_id] = repair.location_id.get_warehouse()
+            procurements.append(
+                repair._prepare_procurement_repair(
+                    line, warehouse=warehouses[repair.location_id]
+                )
+            )
+        if procurements:
+            self._run_procurements_repair(procurements)
         return True
 
-    def _run_procurement_repair(self, line):
-        procurements = []
+    @api.model
+    def _run_procurements_repair(self, procurements):
         errors = []
-        procurement = self._prepare_procurement_repair(line)
-        procurements.append(procurement)
         try:
             self.env["procurement.group"].run(procurements)
         except UserError as error:
@@ -53,8 +64,9 @@ class RepairOrder(models.Model):
         return True
 
     @api.model
-    def _get_procurement_data_repair(self, line):
-        warehouse = self.location_id.get_warehouse()
+    def _get_procurement_data_repair(self, line, warehouse=None):
+        if warehouse is None:
+            warehouse = self.location_id.get_warehouse()
         if not self.procurement_group_id:
             group_id = self.env["procurement.group"].create({"name": self.name})
             self.procurement_group_id = group_id
@@ -79,9 +91,10 @@ class RepairOrder(models.Model):
         return procurement_data
 
     @api.model
-    def _prepare_procurement_repair(self, line):
-        values = self._get_procurement_data_repair(line)
-        warehouse = self.location_id.get_warehouse()
+    def _prepare_procurement_repair(self, line, warehouse=None):
+        if warehouse is None:
+            warehouse = self.location_id.get_warehouse()
+        values = self._get_procurement_data_repair(line, warehouse=warehouse)
         location = (
             self.location_id
             if line.type == "add"
@@ -101,60 +114,73 @@ class RepairOrder(models.Model):
 
     def _update_stock_moves_and_picking_state(self):
         for repair in self:
+            location = repair.location_id
+            add_product_ids = set(
+                repair.operations.filtered(lambda op: op.type == "add").product_id.ids
+            )
+            remove_product_ids = set(
+                repair.operations.filtered(
+                    lambda op: op.type == "remove"
+                ).product_id.ids
+            )
+            # First repair move of each product consuming from, or returning
+            # to, the repair location.
+            consume_moves = {}
+            return_moves = {}
+            for move in repair.stock_move_ids:
+                product_id = move.product_id.id
+                if move.location_id == location and product_id in add_product_ids:
+                    consume_moves.setdefault(product_id, move)
+                if (
+                    move.location_dest_id == location
+                    and product_id in remove_product_ids
+                ):
+                    return_moves.setdefault(product_id, move)
             for picking in repair.picking_ids:
-                if picking.location_dest_id.id == self.location_id.id:
+                if picking.location_dest_id == location:
                     for move_line in picking.move_ids_without_package:
-                        stock_moves = repair.stock_move_ids.filtered(
-                            lambda m: m.product_id.id
-                            == repair.operations.filtered(
-                                lambda l: l.type == "add"
-                                and l.product_id.id == m.product_id.id
-                            ).product_id.id
-                            and m.location_id.id == self.location_id.id
-                        )
-                        if stock_moves:
-                            stock_moves[0].write(
+                        stock_move = consume_moves.get(move_line.product_id.id)
+                        if stock_move:
+                            stock_move.write(
                                 {
                                     "move_orig_ids": [(4, move_line.id)],
                                     "state": "waiting",
                                 }
                             )
-                if picking.location_id.id == self.location_id.id:
+                if picking.location_id == location:
                     for move_line in picking.move_ids_without_package:
-                        stock_moves = repair.stock_move_ids.filtered(
-                            lambda m: m.product_id.id
-                            == repair.operations.filtered(
-                                lambda l: l.type == "remove"
-                                and l.product_id.id == m.product_id.id
-                            ).product_id.id
-                            and m.location_dest_id.id == self.location_id.id
-                        )
-                        if stock_moves:
+                        stock_move = return_moves.get(move_line.product_id.id)
+                        if stock_move:
                             move_line.write(
                                 {
-                                    "move_orig_ids": [(4, stock_moves[0].id)],
+                                    "move_orig_ids": [(4, stock_move.id)],
                                     "state": "waiting",
                                 }
                             )
-                # We are using write here because
-                # the repair_stock_move module does not use stock rules.
-                # As a result, we manually link the stock moves
-                # and then recompute the state of the picking.
-                picking._compute_state()
+        # We are using write here because
+        # the repair_stock_move module does not use stock rules.
+        # As a result, we manually link the stock moves
+        # and then recompute the state of the picking.
+        self.picking_ids._compute_state()
 
     def action_repair_confirm(self):
         res = super().action_repair_confirm()
+        warehouses = {}
+        repair_line_ids = []
         for repair in self:
-            warehouse = repair.location_id.get_warehouse()
+            if repair.location_id not in warehouses:
+                warehouses[repair.location_id] = repair.location_id.get_warehouse()
+            warehouse = warehouses[repair.location_id]
             if warehouse.repair_steps in ["2_steps", "3_steps"]:
-                repair._action_launch_stock_rule(
-                    repair.operations.filtered(lambda l: l.type == "add"),
-                )
+                repair_line_ids += repair.operations.filtered(
+                    lambda op: op.type == "add"
+                ).ids
             if warehouse.repair_steps == "3_steps":
-                repair._action_launch_stock_rule(
-                    repair.operations.filtered(lambda l: l.type == "remove"),
-                )
-            repair._update_stock_moves_and_picking_state()
+                repair_line_ids += repair.operations.filtered(
+                    lambda op: op.type == "remove"
+                ).ids
+        self._action_launch_stock_rule(self.env["repair.line"].browse(repair_line_ids))
+        self._update_stock_moves_and_picking_state()
         return res
 
     @api.onchange("location_id")
@@ -198,8 +224,12 @@ class RepairLine(models.Model):
             else:
                 self.write({"location_dest_id": self.repair_id.location_id.id})
 
-    def create(self, vals):
-        line = super().create(vals)
-        if line.repair_id.state in ["confirmed", "under_repair", "ready"]:
-            line.repair_id._action_launch_stock_rule(line)
-        return line
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines_to_launch = lines.filtered(
+            lambda line: line.repair_id.state in ["confirmed", "under_repair", "ready"]
+        )
+        if lines_to_launch:
+            self.env["repair.order"]._action_launch_stock_rule(lines_to_launch)
+        return lines
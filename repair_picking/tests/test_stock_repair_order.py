@@ -137,6 +137,54 @@ class TestStockRepairOrder(common.SavepointCase):
         self.assertTrue(repair_order.picking_ids)
         self.assertEqual(len(repair_order.picking_ids), 1)
 
+    def test_2steps_repair_orders_batch(self):
+        self.warehouse.write(
+            {
+                "repair_steps": "2_steps",
+                "repair_location_id": self.repair_location.id,
+            }
+        )
+        self.product2.write(
+            {"route_ids": [(6, 0, [self.warehouse.repair_route_id.id])]}
+        )
+        repair_orders = self.repair_model
+        for qty in (1, 2):
+            repair_orders |= self.repair_model.create(
+                {
+                    "product_id": self.product1.id,
+                    "product_uom": self.product1.uom_id.id,
+                    "location_id": self.repair_location.id,
+                    "company_id": self.company.id,
+                    "operations": [
+                        (
+                            0,
+                            0,
+                            {
+                                "name": "Repair Line",
+                                "product_id": self.product2.id,
+                                "type": "add",
+                                "product_uom_qty": qty,
+                                "product_uom": self.product2.uom_id.id,
+                                "price_unit": 1,
+                                "location_id": self.repair_location.id,
+                                "location_dest_id": self.production_location.id,
+                            },
+                        )
+                    ],
+                }
+            )
+        repair_orders.action_repair_confirm()
+        for repair_order, qty in zip(repair_orders, (1, 2)):
+            repair_order._compute_picking_ids()
+            self.assertEqual(repair_order.state, "confirmed")
+            self.assertEqual(len(repair_order.picking_ids), 1)
+            picking_move = repair_order.picking_ids.move_ids_without_package
+            self.assertEqual(picking_move.product_uom_qty, qty)
+            repair_move = repair_order.stock_move_ids.filtered(
+                lambda m: m.product_id == self.product2
+            )
+            self.assertEqual(repair_move.move_orig_ids, picking_move)
+
     def test_3steps_repair_order_flow(self):
         self.warehouse.write(
             {
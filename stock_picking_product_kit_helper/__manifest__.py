@@ -3,7 +3,7 @@
 {
     "name": "Stock Picking Product Kit Helper",
     "summary": "Set quanity in picking line based on product kit quantity",
-    "version": "14.0.1.0.0",
+    "version": "14.0.1.0.1",
     "category": "Stock",
     "website": "https://github.com/OCA/manufacture",
     "author": "Ecosoft, Odoo Community Association (OCA)",
@@ -0,0 +1,50 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+
+from odoo import api, models
+
+
+class MrpBom(models.Model):
+    _inherit = "mrp.bom"
+
+    @api.model
+    def _explode_kit_quantities(self, kits):
+        """Explode product kits in memory, without creating any stock move.
+
+        :param kits: list of (product, quantity, uom, company) tuples
+        :return: list, in the same order as ``kits``, of dicts mapping each
+            component product to its quantity in the product UoM. A product
+            without kit BoM is returned as its own component.
+        """
+        boms = {}
+        result = []
+        for product, quantity, uom, company in kits:
+            key = (product.id, company.id)
+            if key not in boms:
+                boms[key] = self.sudo()._bom_find(
+                    product=product, company_id=company.id, bom_type="phantom"
+                )
+            bom = boms[key]
+            components = defaultdict(float)
+            if not bom:
+                components[product] += uom._compute_quantity(quantity, product.uom_id)
+                result.append(components)
+                continue
+            factor = (
+                uom._compute_quantity(quantity, bom.product_uom_id) / bom.product_qty
+            )
+            _boms, lines = bom.explode(
+                product, factor, picking_type=bom.picking_type_id
+            )
+            for bom_line, line_data in lines:
+                # Same components as the phantom moves of stock.move.action_explode
+                if bom_line.product_id.type not in ("product", "consu"):
+                    continue
+                components[
+                    bom_line.product_id
+                ] += bom_line.product_uom_id._compute_quantity(
+                    line_data["qty"], bom_line.product_id.uom_id
+                )
+            result.append(components)
+        return result
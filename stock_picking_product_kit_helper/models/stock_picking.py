@@ -1,6 +1,8 @@
 # Copyright 2019 Kitti U. - Ecosoft <kittiu@ecosoft.co.th>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 
@@ -68,8 +70,7 @@ class StockPicking(models.Model):
             raise ValidationError(
                 _("Product Kit Helper is not allowed on current state")
             )
-        for helper in self.product_kit_helper_ids:
-            helper.action_explode_helper()
+        self.product_kit_helper_ids._apply_kit_quantities()
 
 
 class StockPickingProductKitHelper(models.Model):
@@ -102,38 +103,46 @@ class StockPickingProductKitHelper(models.Model):
 
     def action_explode_helper(self):
         """Explodes product kit quantity to detailed product in stock move."""
-        self.ensure_one()
-        # Mock stock.move, in order to resue stock.move's action_explode
-        StockMove = self.env["stock.move"]
-        mock_loc = self.env["stock.location"].sudo().search([], limit=1)
-        mock_pt = self.env["stock.picking.type"].sudo().search([], limit=1)
-        mock_stock_move = StockMove.sudo().create(
-            {
-                "name": "/",
-                "product_id": self.product_id.id,
-                "product_uom": self.product_uom.id,
-                "product_uom_qty": self.product_uom_qty,
-                "picking_type_id": mock_pt.id,
-                "location_id": mock_loc.id,
-                "location_dest_id": mock_loc.id,
-            }
+        self._apply_kit_quantities()
+
+    def _apply_kit_quantities(self):
+        """Set the exploded quantities of the kits as done quantity of the
+        matching stock moves of the pickings."""
+        components = self.env["mrp.bom"]._explode_kit_quantities(
+            [
+                (
+                    helper.product_id,
+                    helper.product_uom_qty,
+                    helper.product_uom,
+                    helper.picking_id.company_id,
+                )
+                for helper in self
+            ]
         )
-        # Reuse explode function and assign quantity_done in stock.move
-        mock_processed_moves = mock_stock_move.action_explode()
-        for mock_move in mock_processed_moves:
-            stock_move = StockMove.search(
-                [
-                    ("picking_id", "=", self.picking_id.id),
-                    ("sale_line_id", "=", self.sale_line_id.id),
-                    ("product_id", "=", mock_move.product_id.id),
-                ]
-            )
-            if not stock_move:
-                continue
-            if len(stock_move) != 1:
-                raise ValidationError(
-                    _("No matching detailed product %s for product kit %s")
-                    % (mock_move.product_id.display_name, self.product_id.display_name)
+        moves = self.env["stock.move"].search(
+            [
+                ("picking_id", "in", self.picking_id.ids),
+                ("sale_line_id", "in", self.sale_line_id.ids),
+            ]
+        )
+        moves_by_key = defaultdict(lambda: self.env["stock.move"])
+        for move in moves:
+            key = (move.picking_id.id, move.sale_line_id.id, move.product_id.id)
+            moves_by_key[key] |= move
+        move_ids_by_qty = defaultdict(list)
+        for helper, quantities in zip(self, components):
+            for product, qty in quantities.items():
+                stock_move = moves_by_key.get(
+                    (helper.picking_id.id, helper.sale_line_id.id, product.id)
                 )
-            stock_move.write({"quantity_done": mock_move.product_uom_qty})
-        mock_processed_moves.sudo().unlink()
+                if not stock_move:
+                    continue
+                if len(stock_move) != 1:
+                    raise ValidationError(
+                        _("No matching detailed product %s for product kit %s")
+                        % (product.display_name, helper.product_id.display_name)
+                    )
+                qty = product.uom_id._compute_quantity(qty, stock_move.product_uom)
+                move_ids_by_qty[qty].append(stock_move.id)
+        for qty, move_ids in move_ids_by_qty.items():
+            moves.browse(move_ids).write({"quantity_done": qty})
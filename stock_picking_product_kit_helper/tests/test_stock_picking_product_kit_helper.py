@@ -68,3 +68,27 @@ class TestStockPickingProductKitHelper(common.TransactionCase):
         # After done state, block the helper
         with self.assertRaises(ValidationError):
             picking.action_product_kit_helper()
+
+    def test_01_explode_kit_quantities(self):
+        """Kits are exploded in memory, without creating any stock move"""
+        unit = self.env.ref("uom.product_uom_unit")
+        dozen = self.env.ref("uom.product_uom_dozen")
+        company = self.env.company
+        move_count = self.env["stock.move"].search_count([])
+        components = self.env["mrp.bom"]._explode_kit_quantities(
+            [
+                (self.table_kit, 2.0, unit, company),
+                (self.table_kit, 1.0, dozen, company),
+            ]
+        )
+        self.assertEqual(self.env["stock.move"].search_count([]), move_count)
+        self.assertEqual(
+            [
+                sorted((p.name, qty) for p, qty in quantities.items())
+                for quantities in components
+            ],
+            [
+                [("Bolt", 8.0), ("Wood Panel", 2.0)],
+                [("Bolt", 48.0), ("Wood Panel", 12.0)],
+            ],
+        )
@@ -1,6 +1,9 @@
 # Copyright 2021 Tecnativa - David Vidal
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+from collections import defaultdict
+
 from odoo import api, fields, models
+from odoo.tools import float_compare
 
 
 class StockMove(models.Model):
@@ -11,42 +14,47 @@ class StockMove(models.Model):
         compute_sudo=True,
     )
 
-    @api.depends("product_id.product_tmpl_id.allow_partial_kit_delivery", "state")
+    @api.depends(
+        "bom_line_id.bom_id.type",
+        "bom_line_id.bom_id.product_tmpl_id.allow_partial_kit_delivery",
+        "state",
+    )
     def _compute_allow_partial_kit_delivery(self):
         """Take it from the product only if it's a kit"""
-        self.write({"allow_partial_kit_delivery": True})
-        for move in self.filtered(
-            lambda x: x.product_id and x.state not in ["done", "cancel"]
-        ):
+        for move in self:
+            bom = move.bom_line_id.bom_id
             # If it isn't a kit it will always be True
-            if not move.bom_line_id or move.bom_line_id.bom_id.type != "phantom":
-                move.allow_partial_kit_delivery = True
-                continue
             move.allow_partial_kit_delivery = (
-                move.bom_line_id.bom_id.product_tmpl_id.allow_partial_kit_delivery
+                move.state in ["done", "cancel"]
+                or bom.type != "phantom"
+                or bom.product_tmpl_id.allow_partial_kit_delivery
+            )
+
+    def _get_kit_component_quantities(self):
+        """Aggregate the todo and done quantities of the moves, in the product
+        UoM, by (picking, kit BoM, product).
+
+        :return: dict mapping the keys to [quantity todo, quantity done]
+        """
+        quantities = defaultdict(lambda: [0.0, 0.0])
+        for move in self:
+            key = (move.picking_id.id, move.bom_line_id.bom_id.id, move.product_id.id)
+            quantity = quantities[key]
+            quantity[0] += move.product_uom._compute_quantity(
+                move.product_uom_qty, move.product_id.uom_id, rounding_method="HALF-UP"
+            )
+            quantity[1] += move.product_uom._compute_quantity(
+                move.quantity_done, move.product_id.uom_id, rounding_method="HALF-UP"
             )
+        return quantities
 
     def _check_backorder_moves(self):
         """Check if there are partial deliveries on any set of moves. The
         computing is done in the same way the main picking method does it"""
-        quantity_todo = {}
-        quantity_done = {}
-        for move in self:
-            quantity_todo.setdefault(move.product_id.id, 0)
-            quantity_done.setdefault(move.product_id.id, 0)
-            quantity_todo[move.product_id.id] += move.product_uom_qty
-            quantity_done[move.product_id.id] += move.quantity_done
-        for ops in self.mapped("move_line_ids").filtered(
-            lambda x: x.package_id and not x.product_id and not x.move_id
-        ):
-            for quant in ops.package_id.quant_ids:
-                quantity_done.setdefault(quant.product_id.id, 0)
-                quantity_done[quant.product_id.id] += quant.qty
-        for pack in self.mapped("move_line_ids").filtered(
-            lambda x: x.product_id and not x.move_id
-        ):
-            quantity_done.setdefault(pack.product_id.id, 0)
-            quantity_done[pack.product_id.id] += pack.product_uom_id._compute_quantity(
-                pack.qty_done, pack.product_id.uom_id
-            )
-        return any(quantity_done[x] < quantity_todo.get(x, 0) for x in quantity_done)
+        precision = self.env["decimal.precision"].precision_get(
+            "Product Unit of Measure"
+        )
+        return any(
+            float_compare(done, todo, precision_digits=precision) < 0
+            for todo, done in self._get_kit_component_quantities().values()
+        )
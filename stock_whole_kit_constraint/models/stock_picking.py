@@ -1,7 +1,10 @@
 # Copyright 2021 Tecnativa - David Vidal
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+from collections import defaultdict
+
 from odoo import _, models
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare, float_is_zero
 
 
 class StockPicking(models.Model):
@@ -13,17 +16,25 @@ class StockPicking(models.Model):
         moves = self.mapped("move_lines").filtered(
             lambda x: not x.allow_partial_kit_delivery and x.bom_line_id
         )
-        boms = moves.mapped("bom_line_id.bom_id")
-        for bom in boms:
-            bom_moves = moves.filtered(lambda x: x.bom_line_id.bom_id == bom)
+        precision = self.env["decimal.precision"].precision_get(
+            "Product Unit of Measure"
+        )
+        done_by_kit = defaultdict(float)
+        partial_kits = set()
+        quantities = moves._get_kit_component_quantities()
+        for (picking_id, bom_id, _product_id), (todo, done) in quantities.items():
+            done_by_kit[picking_id, bom_id] += done
+            if float_compare(done, todo, precision_digits=precision) < 0:
+                partial_kits.add((picking_id, bom_id))
+        for picking_id, bom_id in partial_kits:
             # We can put it in backorder if the whole kit goes
-            if not sum(bom_moves.mapped("quantity_done")):
+            if float_is_zero(
+                done_by_kit[picking_id, bom_id], precision_digits=precision
+            ):
                 continue
-            if bom_moves._check_backorder_moves():
-                raise ValidationError(
-                    _(
-                        "You can't make a partial delivery of components of the "
-                        "%s kit" % bom.product_tmpl_id.display_name
-                    )
-                )
+            bom = self.env["mrp.bom"].browse(bom_id)
+            raise ValidationError(
+                _("You can't make a partial delivery of components of the %s kit")
+                % bom.product_tmpl_id.display_name
+            )
         return super()._check_backorder()
@@ -143,3 +143,26 @@ class TestStockWholeKitConstraint(common.SavepointCase):
         ).write({"quantity_done": 3})
         self.customer_picking.button_validate()
         self.assertEqual("done", self.customer_picking.state)
+
+    def test_05_several_pickings(self):
+        """Kits are checked by picking when several of them are validated"""
+        picking_form = Form(self.env["stock.picking"])
+        picking_form.picking_type_id = self.env.ref("stock.picking_type_out")
+        picking_form.partner_id = self.customer
+        with picking_form.move_ids_without_package.new() as move:
+            move.product_id = self.product_kit_2
+            move.product_uom_qty = 3.0
+        other_picking = picking_form.save()
+        other_picking.action_confirm()
+        pickings = self.customer_picking + other_picking
+        pickings.move_lines.write({"quantity_done": 3})
+        # The whole kit goes in one picking, but not in the other
+        other_picking.move_lines[:1].write({"quantity_done": 1})
+        self.assertFalse(
+            any(other_picking.move_lines.mapped("allow_partial_kit_delivery"))
+        )
+        with self.assertRaises(ValidationError):
+            pickings.button_validate()
+        other_picking.move_lines.write({"quantity_done": 3})
+        pickings.button_validate()
+        self.assertEqual({"done"}, set(pickings.mapped("state")))